@@ -1,8 +1,13 @@
+import asyncio
+import base64
+import hashlib
 import json
+import os
 import re
 import socket
 import struct
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from urllib.parse import quote, unquote, urlparse
 
 
@@ -110,6 +115,90 @@ def _build_rtsp_url(host: str, port: int = 554, username: str = "", password: st
     return f"{scheme}://{auth}{host}:{port}{path}"
 
 
+_SUBSTREAM_PATHS = (
+    ("h264Preview_01_main", "h264Preview_01_sub"),
+    # The substream is H.264 even on H.265 main-stream models.
+    ("h265Preview_01_main", "h264Preview_01_sub"),
+    ("Preview_01_main", "Preview_01_sub"),
+    ("/mainStream", "/subStream"),
+)
+
+
+def _substream_url(rtsp_url: str) -> str | None:
+    """Derive the low-resolution Reolink substream URL from a main-stream URL."""
+    url = (rtsp_url or "").strip()
+    for main_path, sub_path in _SUBSTREAM_PATHS:
+        if main_path in url:
+            return url.replace(main_path, sub_path, 1)
+    return None
+
+
+def _is_substream_path(rtsp_url: str) -> bool:
+    """True for Reolink substream paths (``…Preview_01_sub``)."""
+    try:
+        return urlparse(rtsp_url or "").path.rstrip("/").lower().endswith("_sub")
+    except ValueError:
+        return False
+
+
+_REOLINK_STREAM_PATH = re.compile(r"/(?:h26[45])?Preview_(\d+)_(main|sub)$", re.IGNORECASE)
+_PROXY_STREAM_PATH = re.compile(r"/(main|sub)Stream$", re.IGNORECASE)
+
+
+def capture_source_key(camera: dict) -> str:
+    """Identity of the stream a camera entry decodes, independent of how it is reached.
+
+    A Reolink camera behind ReolinkProxy and the same camera opened natively
+    (``h264Preview_01_main``/``h265Preview_01_main``/``Preview_01_main``) map
+    to the same key; other URLs are compared by host, port and path after
+    :func:`_normalize_rtsp_url`, without credentials.
+    """
+    url = _normalize_rtsp_url((camera.get("url") or "").strip())
+    try:
+        u = urlparse(url)
+        host, port, path, query = (u.hostname or "").lower(), u.port or 554, u.path or "/", u.query
+    except Exception:
+        return url
+
+    proxy = camera.get("proxy") or {}
+    if proxy.get("type") == "reolinkproxy" and proxy.get("host"):
+        match = _PROXY_STREAM_PATH.search(path)
+        stream = match.group(1).lower() if match else str(proxy.get("stream") or "main")
+        return f"reolink://{str(proxy['host']).lower()}/01/{stream}"
+
+    match = _REOLINK_STREAM_PATH.search(path)
+    if match:
+        return f"reolink://{host}/{int(match.group(1)):02d}/{match.group(2).lower()}"
+
+    return f"{u.scheme}://{host}:{port}{path}" + (f"?{query}" if query else "")
+
+
+def camera_host(camera: dict) -> str:
+    """Address the camera is reached at (the Reolink host behind ReolinkProxy)."""
+    proxy = camera.get("proxy") or {}
+    if proxy.get("type") == "reolinkproxy" and proxy.get("host"):
+        return str(proxy["host"])
+    host, _port, _user, _pwd = _parse_rtsp_url((camera.get("url") or "").strip())
+    return host or ""
+
+
+def replace_camera_host(camera: dict, old_host: str, new_host: str) -> bool:
+    """Point a camera entry at a new address (e.g. after a DHCP change); keeps credentials and path."""
+    if not old_host or not new_host or camera_host(camera) != old_host:
+        return False
+    proxy = camera.get("proxy") or {}
+    if proxy.get("type") == "reolinkproxy" and proxy.get("host") == old_host:
+        proxy["host"] = new_host
+        return True
+    url = camera.get("url") or ""
+    pattern = r"^([a-z]+://(?:[^/]*@)?)" + re.escape(old_host) + r"(?=[:/?]|$)"
+    new_url = re.sub(pattern, lambda m: m.group(1) + new_host, url, count=1, flags=re.IGNORECASE)
+    if new_url == url:
+        return False
+    camera["url"] = new_url
+    return True
+
+
 def _reolinkproxy_camera_name(name: str) -> str:
     """Normalize camera name for ReolinkProxy stream path."""
     return (name or "Camera").strip().replace(" ", "_")
@@ -201,6 +290,435 @@ def _tcp_probe(host: str, port: int, timeout: float = 0.7) -> tuple[bool, str]:
         return False, "error"
 
 
+_RTSP_USER_AGENT = "WildCam"
+
+
+def _rtsp_request_uri(rtsp_url: str) -> str:
+    """Request URI of an RTSP URL (credentials removed)."""
+    u = urlparse(_normalize_rtsp_url(rtsp_url), allow_fragments=False)
+    query = f"?{u.query}" if u.query else ""
+    return f"{u.scheme}://{u.hostname}:{u.port or 554}{u.path or '/'}{query}"
+
+
+def _read_rtsp_response(sock, deadline: float) -> tuple[int, dict, bytes]:
+    """Read one RTSP response: (status, lower-case headers, body)."""
+    data = b""
+    while b"\r\n\r\n" not in data:
+        sock.settimeout(max(0.01, deadline - time.monotonic()))
+        chunk = sock.recv(4096)
+        if not chunk:
+            raise ConnectionError("connection closed")
+        data += chunk
+        if len(data) > 65536:
+            raise ValueError("RTSP header too large")
+    head, _sep, body = data.partition(b"\r\n\r\n")
+    lines = head.decode("utf-8", "replace").split("\r\n")
+    parts = lines[0].split(" ", 2)
+    if len(parts) < 2 or not parts[0].startswith("RTSP/"):
+        raise ValueError(f"no RTSP response: {lines[0][:40]!r}")
+    headers = {}
+    for line in lines[1:]:
+        name, sep, value = line.partition(":")
+        if sep:
+            # WWW-Authenticate can appear twice (Digest and Basic); keep both
+            key = name.strip().lower()
+            headers[key] = f"{headers[key]}\n{value.strip()}" if key in headers else value.strip()
+    length = int(headers.get("content-length", "0") or 0)
+    while len(body) < length:
+        sock.settimeout(max(0.01, deadline - time.monotonic()))
+        chunk = sock.recv(length - len(body))
+        if not chunk:
+            break
+        body += chunk
+    return int(parts[1]), headers, body[:length] if length else body
+
+
+def _rtsp_authorization(challenges: str, method: str, uri: str, username: str, password: str) -> str | None:
+    """Authorization header for a 401 challenge (Digest preferred, else Basic).
+
+    Digest follows RFC 2617 with MD5/MD5-sess and ``qop="auth"`` when the
+    server offers it (cnonce, nc=00000001); without qop the RFC 2069 form.
+    """
+    digest = None
+    for challenge in (challenges or "").split("\n"):
+        if challenge.lower().startswith("digest"):
+            digest = challenge
+            break
+    if digest:
+        params = {
+            name.lower(): quoted if quoted or not bare else bare
+            for name, quoted, bare in re.findall(r'(\w+)=(?:"([^"]*)"|([^\s,]*))', digest[6:])
+        }
+        realm, nonce = params.get("realm", ""), params.get("nonce", "")
+        algorithm = params.get("algorithm", "MD5")
+        if algorithm.upper() not in ("MD5", "MD5-SESS"):
+            return None
+        qop_options = [option.strip().lower() for option in params.get("qop", "").split(",") if option.strip()]
+        qop = "auth" if "auth" in qop_options else None
+        cnonce = os.urandom(8).hex()
+        nc = "00000001"
+
+        def md5(text):
+            return hashlib.md5(text.encode()).hexdigest()
+
+        ha1 = md5(f"{username}:{realm}:{password}")
+        if algorithm.upper() == "MD5-SESS":
+            ha1 = md5(f"{ha1}:{nonce}:{cnonce}")
+        ha2 = md5(f"{method}:{uri}")
+        if qop:
+            response = md5(f"{ha1}:{nonce}:{nc}:{cnonce}:{qop}:{ha2}")
+        else:
+            response = md5(f"{ha1}:{nonce}:{ha2}")
+        header = (
+            f'Digest username="{username}", realm="{realm}", nonce="{nonce}", '
+            f'uri="{uri}", response="{response}"'
+        )
+        if "algorithm" in params:
+            header += f", algorithm={algorithm}"
+        if "opaque" in params:
+            header += f', opaque="{params["opaque"]}"'
+        if qop:
+            header += f', qop={qop}, nc={nc}, cnonce="{cnonce}"'
+        return header
+    if "basic" in (challenges or "").lower():
+        token = base64.b64encode(f"{username}:{password}".encode()).decode()
+        return f"Basic {token}"
+    return None
+
+
+def _rtsp_exchange(sock, method: str, uri: str, cseq: int, deadline: float, headers: dict | None = None):
+    lines = [f"{method} {uri} RTSP/1.0", f"CSeq: {cseq}", f"User-Agent: {_RTSP_USER_AGENT}"]
+    lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    sock.sendall(("\r\n".join(lines) + "\r\n\r\n").encode())
+    return _read_rtsp_response(sock, deadline)
+
+
+def _rtsp_request(sock, method: str, uri: str, cseq: int, deadline: float,
+                  username: str = "", password: str = "", headers: dict | None = None):
+    """Request with one retry on 401 (Digest/Basic); returns (status, headers, body, next_cseq)."""
+    status, reply_headers, body = _rtsp_exchange(sock, method, uri, cseq, deadline, headers)
+    cseq += 1
+    if status == 401 and username:
+        authorization = _rtsp_authorization(reply_headers.get("www-authenticate", ""), method, uri, username, password)
+        if authorization:
+            status, reply_headers, body = _rtsp_exchange(
+                sock, method, uri, cseq, deadline, {**(headers or {}), "Authorization": authorization}
+            )
+            cseq += 1
+    return status, reply_headers, body, cseq
+
+
+class _BitReader:
+    """MSB-first bit reader for H.264/H.265 parameter sets (Exp-Golomb)."""
+
+    def __init__(self, data: bytes):
+        # Emulation-prevention bytes (00 00 03) entfernen
+        self.data = re.sub(b"\x00\x00\x03", b"\x00\x00", data)
+        self.pos = 0
+
+    def u(self, bits: int) -> int:
+        value = 0
+        for _ in range(bits):
+            byte = self.data[self.pos >> 3]
+            value = (value << 1) | ((byte >> (7 - (self.pos & 7))) & 1)
+            self.pos += 1
+        return value
+
+    def ue(self) -> int:
+        zeros = 0
+        while self.u(1) == 0:
+            zeros += 1
+            if zeros > 31:
+                raise ValueError("invalid Exp-Golomb code")
+        return (1 << zeros) - 1 + self.u(zeros)
+
+    def se(self) -> int:
+        value = self.ue()
+        return (value + 1) // 2 if value & 1 else -(value // 2)
+
+
+def _h264_sps_resolution(nal: bytes) -> tuple[int, int]:
+    """(width, height) from an H.264 SPS NAL unit (with header byte)."""
+    r = _BitReader(nal[1:])
+    profile_idc = r.u(8)
+    r.u(16)  # constraint flags, level_idc
+    r.ue()  # seq_parameter_set_id
+    chroma_format_idc = 1
+    if profile_idc in (100, 110, 122, 244, 44, 83, 86, 118, 128, 138, 139, 134, 135):
+        chroma_format_idc = r.ue()
+        if chroma_format_idc == 3:
+            r.u(1)  # separate_colour_plane_flag
+        r.ue()  # bit_depth_luma_minus8
+        r.ue()  # bit_depth_chroma_minus8
+        r.u(1)  # qpprime_y_zero_transform_bypass_flag
+        if r.u(1):  # seq_scaling_matrix_present_flag
+            for i in range(8 if chroma_format_idc != 3 else 12):
+                if r.u(1):
+                    last_scale = next_scale = 8
+                    for _ in range(16 if i < 6 else 64):
+                        if next_scale:
+                            next_scale = (last_scale + r.se() + 256) % 256
+                        last_scale = next_scale or last_scale
+    r.ue()  # log2_max_frame_num_minus4
+    pic_order_cnt_type = r.ue()
+    if pic_order_cnt_type == 0:
+        r.ue()
+    elif pic_order_cnt_type == 1:
+        r.u(1)
+        r.se()
+        r.se()
+        for _ in range(r.ue()):
+            r.se()
+    r.ue()  # max_num_ref_frames
+    r.u(1)  # gaps_in_frame_num_value_allowed_flag
+    width_mbs = r.ue() + 1
+    height_map_units = r.ue() + 1
+    frame_mbs_only = r.u(1)
+    if not frame_mbs_only:
+        r.u(1)  # mb_adaptive_frame_field_flag
+    r.u(1)  # direct_8x8_inference_flag
+    width = width_mbs * 16
+    height = (2 - frame_mbs_only) * height_map_units * 16
+    if r.u(1):  # frame_cropping_flag
+        left, right, top, bottom = r.ue(), r.ue(), r.ue(), r.ue()
+        crop_x = {1: 2, 2: 2, 3: 1}.get(chroma_format_idc, 1)
+        crop_y = {1: 2, 2: 1, 3: 1}.get(chroma_format_idc, 1) * (2 - frame_mbs_only)
+        width -= (left + right) * crop_x
+        height -= (top + bottom) * crop_y
+    return width, height
+
+
+def _h265_sps_resolution(nal: bytes) -> tuple[int, int]:
+    """(width, height) from an H.265 SPS NAL unit (with 2-byte header)."""
+    r = _BitReader(nal[2:])
+    r.u(4)  # sps_video_parameter_set_id
+    max_sub_layers_minus1 = r.u(3)
+    r.u(1)  # sps_temporal_id_nesting_flag
+    # profile_tier_level: general profile (88 bits) + general_level_idc
+    r.u(32)
+    r.u(32)
+    r.u(32)
+    sub_layers = [(r.u(1), r.u(1)) for _ in range(max_sub_layers_minus1)]
+    if max_sub_layers_minus1 > 0:
+        r.u(2 * (8 - max_sub_layers_minus1))
+    for profile_present, level_present in sub_layers:
+        if profile_present:
+            r.u(32)
+            r.u(32)
+            r.u(24)
+        if level_present:
+            r.u(8)
+    r.ue()  # sps_seq_parameter_set_id
+    chroma_format_idc = r.ue()
+    if chroma_format_idc == 3:
+        r.u(1)
+    width = r.ue()
+    height = r.ue()
+    if r.u(1):  # conformance_window_flag
+        left, right, top, bottom = r.ue(), r.ue(), r.ue(), r.ue()
+        sub_width = 2 if chroma_format_idc in (1, 2) else 1
+        sub_height = 2 if chroma_format_idc == 1 else 1
+        width -= sub_width * (left + right)
+        height -= sub_height * (top + bottom)
+    return width, height
+
+
+def parse_sdp(sdp) -> dict:
+    """Codec, resolution and frame rate of the first video stream in an SDP."""
+    text = sdp.decode("utf-8", "replace") if isinstance(sdp, bytes) else str(sdp or "")
+    info = {"codec": "", "width": 0, "height": 0, "fps": 0.0}
+    in_video = False
+    payload = ""
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("m="):
+            if in_video:
+                break
+            in_video = line.startswith("m=video")
+            fields = line.split()
+            payload = fields[3] if in_video and len(fields) > 3 else ""
+            continue
+        if not in_video or not line.startswith("a="):
+            continue
+        name, _sep, value = line[2:].partition(":")
+        if name == "rtpmap" and value.split(" ", 1)[0] == payload:
+            info["codec"] = value.split(" ", 1)[-1].split("/")[0].upper()
+        elif name == "framerate":
+            try:
+                info["fps"] = float(value)
+            except ValueError:
+                pass
+        elif name == "x-dimensions" and not info["width"]:
+            match = re.match(r"\s*(\d+)\s*,\s*(\d+)", value)
+            if match:
+                info["width"], info["height"] = int(match.group(1)), int(match.group(2))
+        elif name == "framesize" and not info["width"]:
+            match = re.match(r"\s*\S+\s+(\d+)-(\d+)", value)
+            if match:
+                info["width"], info["height"] = int(match.group(1)), int(match.group(2))
+        elif name == "fmtp" and value.split(" ", 1)[0] == payload:
+            params = dict(
+                part.strip().split("=", 1) for part in value.split(" ", 1)[-1].split(";") if "=" in part
+            )
+            try:
+                if "sprop-parameter-sets" in params:
+                    sps = base64.b64decode(params["sprop-parameter-sets"].split(",")[0])
+                    info["width"], info["height"] = _h264_sps_resolution(sps)
+                elif "sprop-sps" in params:
+                    info["width"], info["height"] = _h265_sps_resolution(base64.b64decode(params["sprop-sps"]))
+            except Exception:
+                pass
+    return info
+
+
+def rtsp_probe(rtsp_url: str, timeout: float = 2.0, options: bool = True, describe: bool = True) -> dict:
+    """Lightweight RTSP health check: OPTIONS and (authenticated) DESCRIBE.
+
+    Unlike a TCP connect it shows whether the server actually serves the
+    stream (Reolink accepts connections on 554 before the stream is ready),
+    and it costs one or two round trips instead of a VideoCapture open.
+    Returns a dict with ``reachable`` (TCP), ``rtsp`` (any RTSP answer),
+    ``ready`` (DESCRIBE 200, or OPTIONS 200 without DESCRIBE), ``status``,
+    ``server``, ``methods``, ``codec``, ``width``, ``height``, ``fps``,
+    ``sdp``, ``error`` and the timings ``connect_ms``, ``options_ms``,
+    ``describe_ms`` and ``total_ms``.
+    """
+    result = {
+        "reachable": False, "rtsp": False, "ready": False, "status": None,
+        "server": "", "methods": [], "codec": "", "width": 0, "height": 0, "fps": 0.0,
+        "sdp": b"", "error": "",
+        "connect_ms": None, "options_ms": None, "describe_ms": None, "total_ms": None,
+    }
+    started = time.monotonic()
+    deadline = started + timeout
+
+    def elapsed_ms(since):
+        return round((time.monotonic() - since) * 1000.0, 1)
+
+    host, port, username, password = _parse_rtsp_url(rtsp_url)
+    if not host or not (rtsp_url or "").lower().startswith("rtsp://"):
+        result["error"] = "invalid url"
+        return result
+    uri = _rtsp_request_uri(rtsp_url)
+    try:
+        sock = socket.create_connection((host, int(port or 554)), timeout=timeout)
+    except ConnectionRefusedError:
+        result["error"] = "refused"
+    except (socket.timeout, TimeoutError):
+        result["error"] = "timeout"
+    except OSError as e:
+        result["error"] = "unreachable" if getattr(e, "errno", None) in (101, 113) else "error"
+    else:
+        result["reachable"] = True
+        result["connect_ms"] = elapsed_ms(started)
+        try:
+            with sock:
+                cseq = 1
+                if options:
+                    step = time.monotonic()
+                    status, headers, _body, cseq = _rtsp_request(sock, "OPTIONS", uri, cseq, deadline, username, password)
+                    result.update(rtsp=True, status=status, options_ms=elapsed_ms(step))
+                    result["server"] = headers.get("server", "")
+                    result["methods"] = [m.strip() for m in headers.get("public", "").split(",") if m.strip()]
+                    result["ready"] = status == 200 and not describe
+                if describe:
+                    step = time.monotonic()
+                    status, headers, body, cseq = _rtsp_request(
+                        sock, "DESCRIBE", uri, cseq, deadline, username, password, {"Accept": "application/sdp"}
+                    )
+                    result.update(rtsp=True, status=status, describe_ms=elapsed_ms(step))
+                    result["server"] = result["server"] or headers.get("server", "")
+                    if status == 200:
+                        result["sdp"] = body
+                        result.update(parse_sdp(body))
+                        result["ready"] = True
+                if result["status"] != 200:
+                    result["error"] = f"RTSP {result['status']}"
+        except (socket.timeout, TimeoutError):
+            result["error"] = "timeout"
+        except Exception as e:
+            result["error"] = str(e) or "error"
+    result["total_ms"] = elapsed_ms(started)
+    return result
+
+
+def rtsp_describe(rtsp_url: str, timeout: float = 2.0) -> tuple[int | None, bytes]:
+    """Send an (authenticated) RTSP DESCRIBE; returns (status or None, SDP body).
+
+    Far cheaper than a VideoCapture open: one TCP round trip (two with
+    authentication) and no decoder. None means no RTSP answer at all.
+    """
+    result = rtsp_probe(rtsp_url, timeout=timeout, options=False)
+    return result["status"], result["sdp"]
+
+
+async def rtsp_answers(host: str, port: int, timeout: float = 0.5) -> bool:
+    """True if host:port answers an RTSP OPTIONS request (any status).
+
+    Stricter than a TCP connect: some firmware accepts connections on the
+    RTSP port while the streaming server is still starting.
+    """
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    try:
+        writer.write(
+            f"OPTIONS rtsp://{host}:{port}/ RTSP/1.0\r\nCSeq: 1\r\nUser-Agent: {_RTSP_USER_AGENT}\r\n\r\n".encode()
+        )
+        await writer.drain()
+        line = await asyncio.wait_for(reader.readline(), timeout)
+        return line.startswith(b"RTSP/")
+    except (OSError, asyncio.TimeoutError):
+        return False
+    finally:
+        writer.close()
+
+
+def find_working_rtsp_url(candidates, timeout: float = 2.0, grace: float = 0.25) -> tuple[str | None, bool]:
+    """DESCRIBE all candidate URLs in parallel; the first one (in order) answering 200 wins.
+
+    Returns as soon as a 200 is in and every earlier candidate has answered
+    (or ``grace`` seconds after the first 200), so paths a camera never
+    answers do not hold up the result. ``all_missing`` is True only when
+    every candidate answered 404; any other outcome (401, 503, no answer,
+    ...) leaves the check inconclusive.
+    """
+    candidates = list(dict.fromkeys(candidates))
+    if not candidates:
+        return None, False
+    pool = ThreadPoolExecutor(max_workers=len(candidates))
+    try:
+        index = {pool.submit(rtsp_describe, url, timeout): i for i, url in enumerate(candidates)}
+        pending = set(index)
+        statuses = {}
+        deadline = time.monotonic() + timeout + 0.5
+        first_ok_at = None
+        while pending:
+            now = time.monotonic()
+            remaining = deadline - now
+            if first_ok_at is not None:
+                remaining = min(remaining, first_ok_at + grace - now)
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                statuses[index[future]] = future.result()[0]
+            for i in range(len(candidates)):
+                if i not in statuses:
+                    break
+                if statuses[i] == 200:
+                    return candidates[i], False
+            if first_ok_at is None and 200 in statuses.values():
+                first_ok_at = time.monotonic()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    working = [i for i in sorted(statuses) if statuses[i] == 200]
+    if working:
+        return candidates[working[0]], False
+    return None, len(statuses) == len(candidates) and all(status == 404 for status in statuses.values())
+
+
 def _ws_discovery(timeout: float = 2.0) -> list[str]:
     """ONVIF/WS-Discovery (UDP 3702)."""
     msg = (
@@ -264,86 +782,155 @@ def _ssdp_discovery(timeout: float = 2.0) -> list[str]:
     return list(ips)
 
 
-def _udp_reolink_probe(ip: str, timeout: float = 2.0) -> list | dict | None:
-    """Sendet ein Reolink UDP Discovery Paket an eine spezifische oder Broadcast IP."""
-    ports = [9000, 10000, 2000]
-    
-    # Discovery JSON Payloads (GetDevInfo und Search)
+REOLINK_UDP_PORTS = (9000, 10000, 2000)
+BROADCAST_IP = "255.255.255.255"
+
+
+def _build_reolink_probe_packets() -> list[bytes]:
+    # Discovery JSON Payloads (GetDevInfo und Search), je Little- und Big-Endian Header
     payloads = [
         [{"cmd": "GetDevInfo", "action": 0, "param": {}}],
         {"cmd": "GetDevInfo", "action": 0, "param": {}},
         [{"cmd": "Search", "action": 0, "param": {}}],
-        {"cmd": "Search", "action": 0, "param": {}}
+        {"cmd": "Search", "action": 0, "param": {}},
     ]
-    
-    results = []
-    
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
-    sock.settimeout(timeout)
-    if ip == "255.255.255.255":
-        sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+    packets = []
+    for cmd_data in payloads:
+        data = json.dumps(cmd_data).encode("utf-8")
+        for endian in ("<", ">"):
+            packets.append(struct.pack(endian + "2sHHHII", b"BC", 0, 1, 0, len(data), 0) + data)
+    return packets
+
+
+_REOLINK_PROBE_PACKETS = _build_reolink_probe_packets()
+_REOLINK_WAKE_PACKET = b"\x00" * 32
+_BC_HEADER = struct.Struct("<2sHHHII")
+_BC_HEADER_BE = struct.Struct(">2sHHHII")
+
+
+def _reolink_json_body(data: bytes) -> bytes | None:
+    """JSON-Teil einer Reolink UDP-Antwort (nach dem 'BC'-Header) oder None."""
+    lowered = data.lower()
+    pos = lowered.find(b"bc")
+    while pos != -1:
+        # JSON beginnt spätestens 48 Bytes nach dem Header-Magic
+        window_end = min(pos + 48, len(data))
+        starts = [i for i in (data.find(b"[", pos + 2, window_end), data.find(b"{", pos + 2, window_end)) if i != -1]
+        if starts:
+            start = min(starts)
+            if start == pos + _BC_HEADER.size:
+                # Regulärer Header: Länge aus dem Header übernehmen, wenn sie passt
+                for header in (_BC_HEADER, _BC_HEADER_BE):
+                    body_len = header.unpack_from(data, pos)[4]
+                    if 0 < body_len <= len(data) - start:
+                        body = data[start:start + body_len]
+                        if body[-1:] in (b"]", b"}"):
+                            return body
+            end = data.rfind(b"]" if data[start] == 0x5B else b"}", start)
+            if end != -1:
+                return data[start:end + 1]
+        pos = lowered.find(b"bc", pos + 1)
+    return None
+
+
+def _parse_reolink_response(data: bytes) -> dict | None:
+    """Geräteinfo (DevInfo/SearchResult) aus einer Reolink UDP-Antwort."""
+    if len(data) < 16:
+        return None
+    body = _reolink_json_body(data)
+    if body is None:
+        return None
+    try:
+        res = json.loads(body.decode("utf-8", "ignore"))
+        # Wir suchen nach DevInfo oder Search-Response
+        val = res[0].get("value", {}) if isinstance(res, list) else res.get("value", {})
+        info = val.get("DevInfo") or val.get("SearchResult") or val
+    except Exception:
+        return None
+    if isinstance(info, dict) and (info.get("name") or info.get("serial") or info.get("mac")):
+        return info
+    return None
 
-    for port in ports:
-        for cmd_data in payloads:
-            data = json.dumps(cmd_data).encode('utf-8')
-            for endian in ['<', '>']:
-                header = struct.pack(endian + "2sHHHII", b"BC", 0, 1, 0, len(data), 0)
-                payload = header + data
-                try:
-                    # Weck-Schuss
-                    sock.sendto(b"\x00" * 32, (ip, port))
-                    sock.sendto(payload, (ip, port))
-                    
-                    while True:
-                        try:
-                            resp_data, addr = sock.recvfrom(4096)
-                        except socket.timeout:
-                            break
-                            
-                        if len(resp_data) >= 16:
-                            idx = -1
-                            for i in range(len(resp_data) - 1):
-                                if resp_data[i:i+2].lower() == b"bc":
-                                    for j in range(i+2, min(i+48, len(resp_data))):
-                                        if resp_data[j] in (ord('['), ord('{')):
-                                            idx = j
-                                            break
-                                    if idx != -1:
-                                        break
-                            
-                            if idx != -1:
-                                content = resp_data[idx:].decode('utf-8', 'ignore')
-                                if content.startswith('['):
-                                    end = content.rfind(']')
-                                else:
-                                    end = content.rfind('}')
-                                
-                                if end != -1:
-                                    try:
-                                        res = json.loads(content[:end+1])
-                                        info = None
-                                        # Wir suchen nach DevInfo oder Search-Response
-                                        val = res[0].get('value', {}) if isinstance(res, list) else res.get('value', {})
-                                        info = val.get('DevInfo') or val.get('SearchResult') or val
-                                        
-                                        if info and (info.get('name') or info.get('serial') or info.get('mac')):
-                                            info['remote_ip'] = addr[0]
-                                            if ip != "255.255.255.255":
-                                                sock.close()
-                                                return info
-                                            if info.get('remote_ip') not in [r.get('remote_ip') for r in results]:
-                                                results.append(info)
-                                    except Exception:
-                                        pass
-                        if ip != "255.255.255.255":
-                            break
-                except Exception:
-                    break
-            if ip != "255.255.255.255" and results:
+
+def udp_reolink_probe_many(ips, timeout: float = 2.0, ports=REOLINK_UDP_PORTS) -> dict[str, dict]:
+    """Probe many hosts (or the broadcast address) at once from one UDP socket.
+
+    Every payload variant goes out to every host:port up front; one receive
+    loop then collects answers until the deadline and sorts them by source
+    address. Probing takes one ``timeout`` regardless of the number of
+    targets and variants, and ends early once every unicast target answered.
+    Returns ``{remote_ip: info}``.
+    """
+    targets = [str(ip) for ip in ips if ip]
+    broadcast = BROADCAST_IP in targets
+    pending = set(targets) - {BROADCAST_IP}
+    results = {}
+    if not targets:
+        return results
+
+    sock = None
+    try:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        if broadcast:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        for ip in targets:
+            for port in ports:
+                for packet in (_REOLINK_WAKE_PACKET, *_REOLINK_PROBE_PACKETS):
+                    try:
+                        sock.sendto(packet, (ip, port))
+                    except OSError:
+                        pass
+
+        deadline = time.monotonic() + timeout
+        while broadcast or pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
                 break
-    
-    sock.close()
-    return results if ip == "255.255.255.255" else (results[0] if results else None)
+            sock.settimeout(remaining)
+            try:
+                resp_data, addr = sock.recvfrom(4096)
+            except socket.timeout:
+                break
+            except OSError:
+                # z.B. ICMP port unreachable eines Ziels unter Linux
+                continue
+            remote_ip = addr[0]
+            if remote_ip in results or not (broadcast or remote_ip in pending):
+                continue
+            info = _parse_reolink_response(resp_data)
+            if info:
+                info["remote_ip"] = remote_ip
+                results[remote_ip] = info
+                pending.discard(remote_ip)
+    except Exception:
+        pass
+    finally:
+        if sock is not None:
+            sock.close()
+    return results
+
+
+def _udp_reolink_probe(ip: str, timeout: float = 2.0) -> list | dict | None:
+    """Sendet ein Reolink UDP Discovery Paket an eine spezifische oder Broadcast IP."""
+    results = udp_reolink_probe_many([ip], timeout=timeout)
+    if ip == BROADCAST_IP:
+        return list(results.values())
+    return results.get(ip)
+
+
+REOLINK_WAKE_PORTS = (9000, 10000, 8000)
+
+
+def reolink_wake_packets(uid: str = "") -> list[bytes]:
+    """Pakete einer Weck-Runde: Null-Bytes für WLAN/PIR plus BC-Header (mit UID als GetDevInfo)."""
+    if uid:
+        # Gezielte Abfrage mit UID (Baichuan)
+        data = json.dumps([{"cmd": "GetDevInfo", "action": 0, "param": {}}]).encode('utf-8')
+        probe = struct.pack("<2sHHHII", b"BC", 0, 1, 0, len(data), 0) + data
+    else:
+        # Generischer Header
+        probe = struct.pack("<2sHHHII", b"BC", 0, 1, 0, 0, 0)
+    return [b"\x00" * 64, probe]
 
 
 def _udp_reolink_wake(ip: str, uid: str = ""):
@@ -352,27 +939,13 @@ def _udp_reolink_wake(ip: str, uid: str = ""):
         return
     sock = None
     try:
-        # Falls UID vorhanden, bauen wir ein echtes Abfrage-Paket
-        payload = b""
-        if uid:
-            msg = [{"cmd": "GetDevInfo", "action": 0, "param": {}}]
-            data = json.dumps(msg).encode('utf-8')
-            header = struct.pack("<2sHHHII", b"BC", 0, 1, 0, len(data), 0)
-            payload = header + data
-
+        packets = reolink_wake_packets(uid)
         sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         # Wir pingen alle relevanten Ports mehrfach
-        for port in [9000, 10000, 8000]:
+        for port in REOLINK_WAKE_PORTS:
             for _ in range(5):
-                # Null-Bytes zum "Aufwecken" des WLAN/PIR
-                sock.sendto(b"\x00" * 64, (ip, port))
-                if payload:
-                    # Gezielte Abfrage mit UID (Baichuan)
-                    sock.sendto(payload, (ip, port))
-                else:
-                    # Generischer Header
-                    h = struct.pack("<2sHHHII", b"BC", 0, 1, 0, 0, 0)
-                    sock.sendto(h, (ip, port))
+                for packet in packets:
+                    sock.sendto(packet, (ip, port))
                 time.sleep(0.02)
     except Exception:
         pass
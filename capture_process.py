@@ -0,0 +1,532 @@
+import itertools
+import multiprocessing
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+from PyQt6.QtCore import QThread, Qt, pyqtSignal
+
+import i18n
+from camera_utils import _normalize_rtsp_url
+from i18n import tr
+from metrics import CaptureMetrics
+from reconnect import DEFAULT_MAX_CONCURRENT_OPENS, shared_reconnect_scheduler
+from stream import DEFAULT_STREAM_CONFIG, CameraThread
+
+
+DEFAULT_RING_SLOTS = DEFAULT_STREAM_CONFIG["process_ring_slots"]
+# seq, height, width, channels
+_HEADER_FIELDS = 4
+# Seconds between state/metrics reports of a worker.
+_STATE_INTERVAL = 0.5
+# Longest wait for a ring's slot lock; a frame is dropped after that.
+_RING_LOCK_TIMEOUT = 0.5
+# CameraThread methods the GUI may call in the worker.
+_REMOTE_METHODS = {
+    "set_main_stream_demand",
+    "set_consumer_fps",
+    "start_recording",
+    "stop_recording",
+    "start_event_clip",
+}
+
+
+class SharedFrameRing:
+    """Frame slots in one shared-memory block, written by one process and read by another.
+
+    Each slot has a header (sequence number, height, width, channels) and
+    room for ``slot_bytes`` of uint8 pixels. Writer and reader copy a slot
+    while holding ``lock``, a process-shared semaphore: its acquire/release
+    are full memory barriers, so header and pixels are ordered on weakly
+    ordered CPUs (arm64) as well, where plain stores into shared memory may
+    become visible to the other process out of order. The reader checks the
+    sequence number under the lock and drops frames that were already
+    overwritten by the time the GUI got to them.
+    """
+
+    def __init__(self, slots: int, slot_bytes: int, name: str | None = None, lock=None):
+        header_bytes = slots * _HEADER_FIELDS * 8
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=header_bytes + slots * slot_bytes)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self._header = np.ndarray((slots, _HEADER_FIELDS), dtype=np.int64, buffer=self.shm.buf)
+        self._data = np.ndarray((slots, slot_bytes), dtype=np.uint8, buffer=self.shm.buf, offset=header_bytes)
+        if self.owner:
+            self._header[:] = 0
+        self._lock = lock
+        self._seq = 0
+
+    @classmethod
+    def attach(cls, name: str, slots: int, slot_bytes: int, lock=None) -> "SharedFrameRing":
+        return cls(slots, slot_bytes, name=name, lock=lock)
+
+    def _acquire(self) -> bool:
+        return self._lock is None or self._lock.acquire(timeout=_RING_LOCK_TIMEOUT)
+
+    def _release(self):
+        if self._lock is not None:
+            self._lock.release()
+
+    def write(self, frame: np.ndarray) -> tuple[int, int] | None:
+        """Copy ``frame`` into the next slot; returns (seq, slot), None if the lock timed out."""
+        if not self._acquire():
+            return None
+        try:
+            self._seq += 1
+            slot = self._seq % self.slots
+            header = self._header[slot]
+            header[0] = -1
+            self._data[slot, :frame.nbytes] = frame.reshape(-1)
+            header[1] = frame.shape[0]
+            header[2] = frame.shape[1]
+            header[3] = frame.shape[2] if frame.ndim == 3 else 0
+            header[0] = self._seq
+            return self._seq, slot
+        finally:
+            self._release()
+
+    def read(self, seq: int, slot: int) -> np.ndarray | None:
+        """Copy of frame ``seq`` from ``slot``, or None if it was overwritten meanwhile."""
+        if not self._acquire():
+            return None
+        try:
+            header = self._header[slot]
+            if header[0] != seq:
+                return None
+            height, width, channels = (int(value) for value in header[1:])
+            shape = (height, width, channels) if channels else (height, width)
+            size = height * width * max(1, channels)
+            if size <= 0 or size > self.slot_bytes:
+                return None
+            return self._data[slot, :size].reshape(shape).copy()
+        finally:
+            self._release()
+
+    def close(self, unlink: bool | None = None):
+        """Unmap the ring; the owner (or ``unlink=True``, e.g. for a crashed writer) also removes it."""
+        # Views first, sonst verweigert SharedMemory.close() das Schließen
+        self._header = self._data = None
+        try:
+            self.shm.close()
+            if self.owner if unlink is None else unlink:
+                self.shm.unlink()
+        except (BufferError, OSError):
+            pass
+
+
+class _RingMailbox:
+    """FrameMailbox stand-in in the worker: pixels go to a ring, a short note over the pipe."""
+
+    def __init__(self, send, slots: int, ring_locks: dict | None = None):
+        self._send = send
+        self._slots = max(2, int(slots))
+        self._ring_locks = ring_locks or {}
+        self._rings: dict[str, SharedFrameRing] = {}
+        self._lock = threading.Lock()
+
+    def put(self, key, frame):
+        _thread, kind = key
+        if frame.dtype != np.uint8:
+            return
+        with self._lock:
+            ring = self._rings.get(kind)
+            if ring is None or frame.nbytes > ring.slot_bytes:
+                # Größere Auflösung: neuer Ring, die GUI hängt sich per Nachricht um
+                if ring is not None:
+                    ring.close()
+                ring = SharedFrameRing(self._slots, frame.nbytes, lock=self._ring_locks.get(kind))
+                self._rings[kind] = ring
+                self._send(("ring", kind, ring.name, ring.slots, ring.slot_bytes))
+            written = ring.write(frame)
+        if written is not None:
+            self._send(("frame", kind, *written))
+
+    def close(self):
+        with self._lock:
+            for ring in self._rings.values():
+                ring.close()
+            self._rings.clear()
+
+
+def capture_worker_main(conn, camera_id, rtsp_url, uid, recording_config, substream_url, stream_config,
+                        language, open_slots=None, ring_locks=None):
+    """Entry point of a capture worker process: runs one CameraThread and talks to the GUI over ``conn``."""
+    i18n.set_language(language)
+    send_lock = threading.Lock()
+
+    def send(message):
+        with send_lock:
+            try:
+                conn.send(message)
+            except (OSError, ValueError):
+                pass
+
+    scheduler = shared_reconnect_scheduler()
+    scheduler.configure(stream_config)
+    if open_slots is not None:
+        scheduler.share_open_slots(open_slots)
+    mailbox = _RingMailbox(send, stream_config.get("process_ring_slots", DEFAULT_RING_SLOTS), ring_locks)
+    thread = CameraThread(
+        camera_id,
+        rtsp_url,
+        uid,
+        recording_config=recording_config,
+        substream_url=substream_url,
+        stream_config=stream_config,
+        mailbox=mailbox,
+        reconnect_scheduler=scheduler,
+    )
+    # Kein Qt-Eventloop im Worker: Signale direkt im sendenden Thread weiterreichen
+    direct = Qt.ConnectionType.DirectConnection
+    thread.connection_status.connect(lambda connected, _cid, message: send(("status", connected, message)), direct)
+    thread.rtsp_url_changed.connect(lambda old_url, new_url: send(("url", old_url, new_url)), direct)
+    thread.file_closed.connect(lambda _cid, filename: send(("file", filename)), direct)
+    thread.start()
+
+    last_state = 0.0
+    try:
+        while True:
+            now = time.monotonic()
+            if now - last_state >= _STATE_INTERVAL:
+                last_state = now
+                send(("state", thread.main_stream_active, thread.substream_active, thread.metrics.snapshot()))
+            try:
+                if not conn.poll(0.1):
+                    continue
+                message = conn.recv()
+            except (EOFError, OSError):
+                break  # GUI-Prozess weg
+            if message[0] == "stop":
+                break
+            if message[0] == "call":
+                call_id, method, args, kwargs = message[1:]
+                result = None
+                if method in _REMOTE_METHODS:
+                    try:
+                        result = getattr(thread, method)(*args, **kwargs)
+                    except Exception:
+                        result = None
+                if call_id is not None:
+                    send(("result", call_id, result))
+    finally:
+        thread.stop(timeout_ms=5000)
+        mailbox.close()
+        send(("stopped",))
+        conn.close()
+
+
+class _RemoteMetrics:
+    """Last CaptureMetrics snapshot reported by the worker (same ``snapshot()`` as CaptureMetrics)."""
+
+    def __init__(self):
+        self._snapshot = CaptureMetrics().snapshot()
+        self.worker_restarts = 0
+
+    def update(self, snapshot: dict):
+        self._snapshot = snapshot
+
+    def snapshot(self) -> dict:
+        return {**self._snapshot, "worker_restarts": self.worker_restarts}
+
+
+_open_slots = None
+_open_slots_lock = threading.Lock()
+
+
+def _shared_open_slots(context, stream_config: dict):
+    """Semaphore limiting RTSP opens across all worker processes (like max_concurrent_opens in-process)."""
+    global _open_slots
+    with _open_slots_lock:
+        if _open_slots is None:
+            try:
+                limit = max(1, int(stream_config.get("max_concurrent_opens", DEFAULT_MAX_CONCURRENT_OPENS)))
+            except (TypeError, ValueError):
+                limit = DEFAULT_MAX_CONCURRENT_OPENS
+            _open_slots = context.BoundedSemaphore(limit)
+        return _open_slots
+
+
+class ProcessCameraThread(QThread):
+    """CameraThread whose capture runs in a separate worker process.
+
+    The worker runs a normal CameraThread (decode, recording, event clips,
+    pre-event buffer) and publishes frames through SharedFrameRing slots;
+    status, file and URL notifications and method calls go over a pipe.
+    Calls with a result (start_recording, start_event_clip) never block the
+    GUI: their result is handed to a callback in the GUI thread.
+    This thread only copies frames out of shared memory and hands them to
+    the mailbox or the frame signals, so decoding does not compete with the
+    GUI for the GIL and a crashing decoder only takes down its worker,
+    which is restarted with backoff. Public interface as CameraThread.
+    """
+
+    frame_ready = pyqtSignal(np.ndarray, int)
+    substream_frame_ready = pyqtSignal(np.ndarray, int)
+    connection_status = pyqtSignal(bool, int, str)
+    rtsp_url_changed = pyqtSignal(str, str)
+    file_closed = pyqtSignal(int, str)
+    # (callback, result) of a remote call, delivered in the GUI thread.
+    call_finished = pyqtSignal(object, object)
+
+    MAX_UI_FPS = CameraThread.MAX_UI_FPS
+    SUBSTREAM_UI_FPS = CameraThread.SUBSTREAM_UI_FPS
+    STOP_TIMEOUT = 6.0
+    RESTART_DELAY = 2.0
+
+    def __init__(
+        self,
+        camera_id,
+        rtsp_url,
+        uid="",
+        recording_config=None,
+        substream_url=None,
+        stream_config=None,
+        mailbox=None,
+        reconnect_scheduler=None,
+    ):
+        super().__init__()
+        self.camera_id = camera_id
+        self.rtsp_url = _normalize_rtsp_url(rtsp_url)
+        self.uid = uid
+        self.recording_config = dict(recording_config or {})
+        self.substream_url = substream_url or None
+        self.stream_config = {**DEFAULT_STREAM_CONFIG, **(stream_config or {})}
+        self.mailbox = mailbox
+        self.metrics = _RemoteMetrics()
+        self.reconnect_scheduler = reconnect_scheduler or shared_reconnect_scheduler()
+        self.running = False
+        self._main_demand = set()
+        self._consumer_fps: dict[str, float] = {}
+        self._main_active = False
+        self._substream_active = False
+        self._rings: dict[str, SharedFrameRing] = {}
+        self._conn = None
+        self._send_lock = threading.Lock()
+        self._calls: dict[int, object] = {}
+        self._call_ids = itertools.count(1)
+        # Output path of the recording the GUI wants; restarted with a new worker.
+        self._recording_path = None
+        self._ring_locks: dict = {}
+        self.call_finished.connect(self._finish_call)
+
+    @property
+    def substream_active(self) -> bool:
+        return self._substream_active
+
+    @property
+    def main_stream_active(self) -> bool:
+        return self._main_active
+
+    def run(self):
+        self.running = True
+        failures = 0
+        while self.running:
+            started = time.monotonic()
+            exitcode = self._run_worker()
+            if not self.running:
+                break
+            # Worker beendet (z.B. Absturz in FFmpeg): nur diese Kamera neu starten
+            self.metrics.worker_restarts += 1
+            self.connection_status.emit(False, self.camera_id, tr("camera.status.worker_restarting", code=exitcode))
+            failures = 1 if time.monotonic() - started > 60 else failures + 1
+            delay = self.reconnect_scheduler.next_delay(failures, self.RESTART_DELAY)
+            self.reconnect_scheduler.wait(None, 0, delay, lambda: self.running)
+
+    def _run_worker(self):
+        context = multiprocessing.get_context("spawn")
+        conn, child_conn = context.Pipe()
+        # Process-shared locks must be handed over when the worker is spawned.
+        self._ring_locks = {kind: context.Lock() for kind in ("main", "sub")}
+        process = context.Process(
+            target=capture_worker_main,
+            args=(
+                child_conn,
+                self.camera_id,
+                self.rtsp_url,
+                self.uid,
+                self.recording_config,
+                self.substream_url,
+                self.stream_config,
+                i18n.CURRENT_LANG,
+                _shared_open_slots(context, self.stream_config),
+                self._ring_locks,
+            ),
+            name=f"capture-{self.camera_id}",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        with self._send_lock:
+            self._conn = conn
+        # Zustand der GUI-Seite in den (neuen) Worker übernehmen
+        for reason in list(self._main_demand):
+            self._send(("call", None, "set_main_stream_demand", (reason, True), {}))
+        for consumer, fps in list(self._consumer_fps.items()):
+            self._send(("call", None, "set_consumer_fps", (consumer, fps), {}))
+        if self._recording_path is not None:
+            # Die Aufnahme lief im abgestürzten Worker: im neuen fortsetzen
+            self._send(("call", None, "start_recording", (self._recording_path,), {}))
+
+        stop_deadline = None
+        stopped = False
+        try:
+            while True:
+                if not self.running and stop_deadline is None:
+                    self._send(("stop",))
+                    stop_deadline = time.monotonic() + self.STOP_TIMEOUT
+                if stop_deadline is not None and time.monotonic() > stop_deadline:
+                    break
+                try:
+                    if not conn.poll(0.1):
+                        if not process.is_alive():
+                            break
+                        continue
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    break
+                if message[0] == "stopped":
+                    stopped = True
+                    break
+                self._handle_message(message)
+        finally:
+            with self._send_lock:
+                self._conn = None
+            for call_id in list(self._calls):
+                callback = self._calls.pop(call_id, None)
+                if callback is not None:
+                    self.call_finished.emit(callback, None)
+            conn.close()
+            process.join(1.0)
+            if process.is_alive():
+                process.terminate()
+                process.join(1.0)
+            for ring in self._rings.values():
+                # Ein abgestürzter Worker konnte seine Ringe nicht mehr entfernen
+                ring.close(unlink=not stopped)
+            self._rings.clear()
+            self._main_active = self._substream_active = False
+        return process.exitcode
+
+    def _handle_message(self, message):
+        kind = message[0]
+        if kind == "frame":
+            _kind, stream, seq, slot = message
+            ring = self._rings.get(stream)
+            frame = ring.read(seq, slot) if ring is not None else None
+            if frame is not None:
+                self._deliver_frame(stream, frame)
+        elif kind == "ring":
+            _kind, stream, name, slots, slot_bytes = message
+            old_ring = self._rings.pop(stream, None)
+            if old_ring is not None:
+                old_ring.close()
+            try:
+                self._rings[stream] = SharedFrameRing.attach(name, slots, slot_bytes, self._ring_locks.get(stream))
+            except (OSError, ValueError):
+                pass
+        elif kind == "status":
+            self.connection_status.emit(message[1], self.camera_id, message[2])
+        elif kind == "url":
+            self.rtsp_url = message[2]
+            self.rtsp_url_changed.emit(message[1], message[2])
+        elif kind == "file":
+            self.file_closed.emit(self.camera_id, message[1])
+        elif kind == "state":
+            self._main_active, self._substream_active = bool(message[1]), bool(message[2])
+            self.metrics.update(message[3])
+        elif kind == "result":
+            callback = self._calls.pop(message[1], None)
+            if callback is not None:
+                self.call_finished.emit(callback, message[2])
+
+    def _deliver_frame(self, kind: str, frame):
+        mailbox = self.mailbox
+        if mailbox is not None:
+            mailbox.put((self, kind), frame)
+        elif kind == "sub":
+            self.substream_frame_ready.emit(frame, self.camera_id)
+        else:
+            self.frame_ready.emit(frame, self.camera_id)
+
+    def _send(self, message) -> bool:
+        with self._send_lock:
+            if self._conn is None:
+                return False
+            try:
+                self._conn.send(message)
+                return True
+            except (OSError, ValueError):
+                return False
+
+    def _call_async(self, method: str, args: tuple, kwargs: dict, callback=None):
+        """Run a CameraThread method in the worker; its result goes to ``callback`` later.
+
+        The callback runs in the GUI thread (None if the worker is gone).
+        """
+        if callback is None:
+            self._send(("call", None, method, args, kwargs))
+            return
+        call_id = next(self._call_ids)
+        self._calls[call_id] = callback
+        if not self._send(("call", call_id, method, args, kwargs)):
+            self._calls.pop(call_id, None)
+            self.call_finished.emit(callback, None)
+
+    def _finish_call(self, callback, result):
+        callback(result)
+
+    def set_main_stream_demand(self, reason: str, active: bool):
+        if active:
+            self._main_demand.add(reason)
+        else:
+            self._main_demand.discard(reason)
+        self._send(("call", None, "set_main_stream_demand", (reason, active), {}))
+
+    def set_consumer_fps(self, consumer: str, fps: float | None):
+        if fps is None:
+            self._consumer_fps.pop(consumer, None)
+        else:
+            self._consumer_fps[consumer] = max(0.0, float(fps))
+        self._send(("call", None, "set_consumer_fps", (consumer, fps), {}))
+
+    def start_recording(self, output_path, callback=None):
+        """Start recording in the worker; returns None, the filename goes to ``callback``."""
+        self._recording_path = output_path
+
+        def done(filename):
+            if not filename and self._recording_path == output_path:
+                self._recording_path = None
+            if callback is not None:
+                callback(filename)
+
+        self._call_async("start_recording", (output_path,), {}, done)
+        return None
+
+    def stop_recording(self):
+        self._recording_path = None
+        self._send(("call", None, "stop_recording", (), {}))
+
+    def start_event_clip(self, output_path, label: str, pre_seconds: float = 8.0, post_seconds: float = 20.0,
+                         max_seconds: float = 180.0, callback=None):
+        """Start an event clip in the worker; returns None, the filename goes to ``callback``."""
+        self._call_async(
+            "start_event_clip",
+            (output_path, label),
+            {"pre_seconds": pre_seconds, "post_seconds": post_seconds, "max_seconds": max_seconds},
+            callback,
+        )
+        return None
+
+    def request_stop(self):
+        """Signal the worker to stop (recordings are finalized in the worker)."""
+        self.running = False
+
+    def stop(self, timeout_ms=2000):
+        self.request_stop()
+        return self.wait(timeout_ms)
@@ -4,6 +4,10 @@ import os
 from camera_utils import normalize_reolinkproxy_camera
 from detection import DEFAULT_DETECTION_CONFIG
 from notifications import DEFAULT_EMAIL_CONFIG
+from recording import DEFAULT_RECORDING_CONFIG
+from retention import DEFAULT_RETENTION_CONFIG
+from stream import DEFAULT_STREAM_CONFIG
+from video_surface import normalize_video_surface
 
 
 CONFIG_PATH = "camera_config.json"
@@ -21,8 +25,12 @@ def config_payload(window) -> dict:
         "cameras": window.cameras,
         "recording_path": window.recording_path,
         "detection": detection_config,
+        "recording": window.recording_config,
+        "retention": window.retention_config,
+        "stream": window.stream_config,
         "email": window.email_config,
         "cameras_per_row": window.cameras_per_row,
+        "video_surface": window.video_surface,
         "next_camera_id": window.next_camera_id,
         "language": window.language,
         "order_custom": window._order_custom,
@@ -145,8 +153,12 @@ def load_config_data(path: str = CONFIG_PATH) -> tuple[dict | None, bool]:
         "recording_path": raw_config.get("recording_path", DEFAULT_RECORDING_PATH),
         "snapshot_path": snapshot_path_for(raw_config.get("recording_path", DEFAULT_RECORDING_PATH)),
         "detection": {**DEFAULT_DETECTION_CONFIG, **raw_config.get("detection", {})},
+        "recording": {**DEFAULT_RECORDING_CONFIG, **raw_config.get("recording", {})},
+        "retention": {**DEFAULT_RETENTION_CONFIG, **raw_config.get("retention", {})},
+        "stream": {**DEFAULT_STREAM_CONFIG, **raw_config.get("stream", {})},
         "email": {**DEFAULT_EMAIL_CONFIG, **raw_config.get("email", {})},
         "cameras_per_row": raw_config.get("cameras_per_row", 3),
+        "video_surface": normalize_video_surface(raw_config.get("video_surface", "label")),
         "next_camera_id": next_camera_id,
         "language": raw_config.get("language", "de"),
         "order_custom": order_custom,
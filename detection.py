@@ -8,6 +8,9 @@ from typing import Any
 import cv2
 from PyQt6.QtCore import QThread, pyqtSignal
 
+from detector_backends import EXPORT_BACKENDS, create_detector
+from motion import DEFAULT_MOTION_CONFIG, MotionGate
+
 
 KNOWN_YOLO_WEIGHTS = {
     "yolo11n.pt",
@@ -29,6 +32,11 @@ DEFAULT_DETECTION_CONFIG = {
     "confidence": 0.4,
     "device": "auto",
     "analysis_fps_per_camera": 3.0,
+    # Due cameras are analyzed together in one predict call.
+    "max_batch_size": 8,
+    "max_batch_delay_ms": 50,
+    # Motion pre-filter: skip the model while a scene is static.
+    **DEFAULT_MOTION_CONFIG,
     "stable_frames": 2,
     "cooldown_seconds": 180,
     "event_suppress_seconds": 30,
@@ -161,15 +169,21 @@ class DetectionWorker(QThread):
         self._stable_hits: dict[tuple[int, str], int] = {}
         self._last_event: dict[tuple[int, str], float] = {}
         self._last_camera_event: dict[int, float] = {}
-        self._model = None
+        self._detector = None
         self._names: dict[int, str] = {}
         self._device = "cpu"
+        self._motion_gate = MotionGate(merged, merged.get("motion_masks"))
+
+    def motion_stats(self) -> tuple[int, int]:
+        """Return (analyzed, skipped) frame counts of the motion gate."""
+        return self._motion_gate.passed, self._motion_gate.skipped
 
     def submit_frame(self, camera_id: int, camera_name: str, frame):
         if not self._running:
             return
         with self._lock:
-            self._latest_frames[int(camera_id)] = (camera_name, frame.copy(), time.monotonic())
+            # Frames from CameraThread are read-only and shared; no copy needed.
+            self._latest_frames[int(camera_id)] = (camera_name, frame, time.monotonic())
 
     def stop(self, timeout_ms: int = 3000) -> bool:
         self._running = False
@@ -186,28 +200,26 @@ class DetectionWorker(QThread):
             self._running = False
             return
 
-        self.status.emit(f"Objekterkennung aktiv ({self.config['model']}, {self._device})")
+        backend = self._detector.name if self._detector.name != "ultralytics" else self._device
+        self.status.emit(f"Objekterkennung aktiv ({self.config['model']}, {backend})")
         while self._running:
-            item = self._next_frame()
-            if item is None:
+            batch = self._next_batch()
+            if not batch:
                 self.msleep(50)
                 continue
 
-            camera_id, camera_name, frame = item
             try:
-                self._analyze_frame(camera_id, camera_name, frame)
+                self._analyze_batch(batch)
             except Exception as exc:
                 self.status.emit(f"Objekterkennung Fehler: {exc}")
                 self.msleep(500)
 
     def _load_model(self):
-        try:
-            from ultralytics import YOLO
-        except Exception as exc:
-            raise RuntimeError("Python-Paket 'ultralytics' ist nicht installiert") from exc
-
         requested_device = str(self.config.get("device", "auto")).strip().lower()
-        if requested_device == "auto":
+        if requested_device in EXPORT_BACKENDS:
+            # ONNX Runtime / OpenVINO run on the CPU without PyTorch.
+            self._device = "cpu"
+        elif requested_device == "auto":
             try:
                 import torch
 
@@ -220,16 +232,25 @@ class DetectionWorker(QThread):
         model_dir = self.config.get("model_dir") or default_model_dir(self.config.get("recording_path", "."))
         model_path = prepare_model_path(str(self.config.get("model", "yolo11n.pt")), model_dir)
         self.config["model"] = str(model_path)
-        self._model = YOLO(str(model_path))
-        self._names = dict(getattr(self._model, "names", {}) or {})
+        self._detector = create_detector(
+            model_path,
+            requested_device if requested_device in EXPORT_BACKENDS else self._device,
+            int(self.config.get("imgsz", 640)),
+            status=self.status.emit,
+        )
+        self._names = dict(self._detector.names)
 
-    def _next_frame(self):
+    def _min_interval(self) -> float:
+        return 1.0 / max(0.1, float(self.config.get("analysis_fps_per_camera", 3.0)))
+
+    def _take_due_frames(self, limit: int, exclude=()) -> list[tuple[int, str, Any]]:
         now = time.monotonic()
-        min_interval = 1.0 / max(0.1, float(self.config.get("analysis_fps_per_camera", 3.0)))
+        min_interval = self._min_interval()
+        due = []
 
         with self._lock:
             if not self._latest_frames:
-                return None
+                return due
             for camera_id, (_camera_name, _frame, frame_time) in list(self._latest_frames.items()):
                 if now - frame_time > 2.0:
                     self._latest_frames.pop(camera_id, None)
@@ -239,45 +260,87 @@ class DetectionWorker(QThread):
                 key=lambda item: self._last_analyzed.get(item[0], 0.0),
             )
             for camera_id, (camera_name, frame, _frame_time) in candidates:
+                if len(due) >= limit:
+                    break
+                if camera_id in exclude:
+                    continue
                 if now - self._last_analyzed.get(camera_id, 0.0) >= min_interval:
                     self._last_analyzed[camera_id] = now
-                    return camera_id, camera_name, frame
-        return None
+                    due.append((camera_id, camera_name, frame))
+        return due
 
-    def _analyze_frame(self, camera_id: int, camera_name: str, frame):
-        if self._model is None:
+    def _seconds_until_next_due(self, exclude) -> float | None:
+        now = time.monotonic()
+        min_interval = self._min_interval()
+        with self._lock:
+            waits = [
+                self._last_analyzed.get(camera_id, 0.0) + min_interval - now
+                for camera_id in self._latest_frames
+                if camera_id not in exclude
+            ]
+        return max(0.0, min(waits)) if waits else None
+
+    def _next_batch(self) -> list[tuple[int, str, Any]]:
+        """Collect due cameras; wait up to max_batch_delay_ms for more to become due."""
+        max_batch = max(1, int(self.config.get("max_batch_size", 8)))
+        max_delay = max(0.0, float(self.config.get("max_batch_delay_ms", 50))) / 1000.0
+        batch = self._gate(self._take_due_frames(max_batch))
+        if not batch:
+            return batch
+
+        deadline = time.monotonic() + max_delay
+        while self._running and len(batch) < max_batch:
+            taken = {item[0] for item in batch}
+            wait = self._seconds_until_next_due(taken)
+            if wait is None or time.monotonic() + wait > deadline:
+                break
+            if wait > 0:
+                time.sleep(wait)
+            batch += self._gate(self._take_due_frames(max_batch - len(batch), exclude=taken))
+        return batch
+
+    def _gate(self, items: list[tuple[int, str, Any]]) -> list[tuple[int, str, Any]]:
+        gated = []
+        for camera_id, camera_name, frame in items:
+            if self._motion_gate.check(camera_id, frame):
+                gated.append((camera_id, camera_name, frame))
+            else:
+                self._decay_stable_hits(camera_id)
+        return gated
+
+    def _analyze_batch(self, batch: list[tuple[int, str, Any]]):
+        if self._detector is None or not batch:
             return
 
-        wanted = set(self.config.get("classes") or [])
-        results = self._model.predict(
-            frame,
+        results = self._detector.detect(
+            [frame for _camera_id, _camera_name, frame in batch],
             imgsz=int(self.config.get("imgsz", 640)),
             conf=float(self.config.get("confidence", 0.4)),
-            device=self._device,
-            verbose=False,
         )
+        # One result per input image, in input order.
+        for (camera_id, camera_name, frame), raw in zip(batch, results):
+            self._handle_detections(camera_id, camera_name, frame, self._extract_detections(raw))
 
+    def _extract_detections(self, raw: list[tuple[int, float, list[int]]]) -> list[dict[str, Any]]:
+        wanted = set(self.config.get("classes") or [])
         detections = []
-        best_by_label: dict[str, dict[str, Any]] = {}
-        for result in results:
-            boxes = getattr(result, "boxes", None)
-            if boxes is None:
+        for cls_id, confidence, xyxy in raw:
+            label = str(self._names.get(cls_id, cls_id))
+            if wanted and label not in wanted:
                 continue
-            for box in boxes:
-                cls_id = int(box.cls[0])
-                label = str(self._names.get(cls_id, cls_id))
-                if wanted and label not in wanted:
-                    continue
-                confidence = float(box.conf[0])
-                xyxy = [int(v) for v in box.xyxy[0].tolist()]
-                item = {
-                    "label": label,
-                    "confidence": confidence,
-                    "box": xyxy,
-                }
-                detections.append(item)
-                if label not in best_by_label or confidence > best_by_label[label]["confidence"]:
-                    best_by_label[label] = item
+            detections.append({
+                "label": label,
+                "confidence": float(confidence),
+                "box": [int(v) for v in xyxy],
+            })
+        return detections
+
+    def _handle_detections(self, camera_id: int, camera_name: str, frame, detections: list[dict[str, Any]]):
+        best_by_label: dict[str, dict[str, Any]] = {}
+        for item in detections:
+            label = item["label"]
+            if label not in best_by_label or item["confidence"] > best_by_label[label]["confidence"]:
+                best_by_label[label] = item
 
         if not detections:
             self._decay_stable_hits(camera_id)
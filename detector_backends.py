@@ -0,0 +1,287 @@
+import ast
+import json
+import shutil
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+
+# Detection "device" values that select an exported-model runtime instead of PyTorch.
+EXPORT_BACKENDS = {
+    "onnx": ("onnx", False),
+    "openvino": ("openvino", False),
+    "openvino-int8": ("openvino", True),
+}
+
+
+class BackendError(RuntimeError):
+    pass
+
+
+def resolve_backend(device: str, model_path: str | Path) -> tuple[str, bool]:
+    """Return (backend, int8) for a detection device value and model path.
+
+    ``backend`` is "ultralytics", "onnx" or "openvino". An already exported
+    model (``.onnx`` file or ``*_openvino_model`` directory) selects its
+    runtime regardless of the device value.
+    """
+    path = Path(str(model_path))
+    if path.suffix.lower() == ".onnx":
+        return "onnx", False
+    if path.name.endswith("_openvino_model") or path.suffix.lower() == ".xml":
+        return "openvino", False
+    return EXPORT_BACKENDS.get(str(device or "").strip().lower(), ("ultralytics", False))
+
+
+def exported_model_path(pt_path: Path, backend: str, imgsz: int, int8: bool = False) -> Path:
+    suffix = "_int8" if int8 else ""
+    if backend == "onnx":
+        return pt_path.with_name(f"{pt_path.stem}_{imgsz}{suffix}.onnx")
+    return pt_path.with_name(f"{pt_path.stem}_{imgsz}{suffix}_openvino_model")
+
+
+def _names_sidecar(model_path: Path) -> Path:
+    return model_path.with_name(model_path.name + ".names.json")
+
+
+def export_model(pt_path: str | Path, backend: str, imgsz: int, int8: bool = False) -> Path:
+    """Export a YOLO .pt model once and cache it next to the weights.
+
+    Needs ``ultralytics`` only for the export itself; the cached model is
+    reused on later starts without importing PyTorch.
+    """
+    pt_path = Path(pt_path)
+    target = exported_model_path(pt_path, backend, imgsz, int8)
+    if target.exists() and _names_sidecar(target).exists():
+        return target
+
+    try:
+        from ultralytics import YOLO
+    except Exception as exc:
+        raise BackendError("Python-Paket 'ultralytics' wird für den Modell-Export benötigt") from exc
+
+    model = YOLO(str(pt_path))
+    names = {int(k): str(v) for k, v in dict(getattr(model, "names", {}) or {}).items()}
+    export_args = {"format": backend, "imgsz": int(imgsz), "dynamic": True}
+    if backend == "openvino" and int8:
+        export_args["int8"] = True
+    exported = Path(str(model.export(**export_args)))
+
+    if target.is_dir():
+        shutil.rmtree(target)
+    elif target.exists():
+        target.unlink()
+    shutil.move(str(exported), str(target))
+    _names_sidecar(target).write_text(json.dumps({"names": names, "imgsz": int(imgsz)}), encoding="utf-8")
+    return target
+
+
+def _load_names(model_path: Path, fallback_metadata: str | None = None) -> dict[int, str]:
+    sidecar = _names_sidecar(model_path)
+    try:
+        data = json.loads(sidecar.read_text(encoding="utf-8"))
+        return {int(k): str(v) for k, v in data.get("names", {}).items()}
+    except Exception:
+        pass
+    if fallback_metadata:
+        # Ultralytics stores the class names as a dict literal in the model metadata.
+        try:
+            return {int(k): str(v) for k, v in ast.literal_eval(fallback_metadata).items()}
+        except Exception:
+            pass
+    return {}
+
+
+def letterbox(frame, size: int) -> tuple[np.ndarray, float, tuple[int, int]]:
+    """Resize with unchanged aspect ratio and pad to size x size (gray 114)."""
+    height, width = frame.shape[:2]
+    scale = min(size / float(height), size / float(width))
+    new_w, new_h = int(round(width * scale)), int(round(height * scale))
+    pad_x, pad_y = (size - new_w) / 2.0, (size - new_h) / 2.0
+    canvas = np.full((size, size, 3), 114, dtype=np.uint8)
+    left, top = int(round(pad_x - 0.1)), int(round(pad_y - 0.1))
+    canvas[top:top + new_h, left:left + new_w] = cv2.resize(
+        frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR
+    )
+    return canvas, scale, (left, top)
+
+
+def _to_blob(images: list[np.ndarray]) -> np.ndarray:
+    # BGR uint8 HWC -> RGB float32 NCHW in 0..1
+    return cv2.dnn.blobFromImages(images, scalefactor=1.0 / 255.0, swapRB=True)
+
+
+def postprocess(output, scale: float, pad: tuple[int, int], frame_shape, conf: float, iou: float = 0.45):
+    """Decode one YOLOv8/11 output (4 + classes, anchors) to (cls_id, conf, xyxy)."""
+    predictions = np.asarray(output, dtype=np.float32)
+    if predictions.shape[0] < predictions.shape[1]:
+        predictions = predictions.T
+    boxes_cxcywh = predictions[:, :4]
+    class_scores = predictions[:, 4:]
+    class_ids = class_scores.argmax(axis=1)
+    scores = class_scores[np.arange(len(class_ids)), class_ids]
+    keep = scores >= conf
+    if not np.any(keep):
+        return []
+    boxes_cxcywh, scores, class_ids = boxes_cxcywh[keep], scores[keep], class_ids[keep]
+
+    cx, cy, w, h = boxes_cxcywh.T
+    left, top = pad
+    x1 = (cx - w / 2 - left) / scale
+    y1 = (cy - h / 2 - top) / scale
+    bw, bh = w / scale, h / scale
+    rects = np.stack([x1, y1, bw, bh], axis=1)
+    indices = cv2.dnn.NMSBoxesBatched(rects.tolist(), scores.tolist(), class_ids.tolist(), conf, iou)
+
+    frame_h, frame_w = frame_shape[:2]
+    detections = []
+    for index in np.array(indices).flatten():
+        x, y, rw, rh = rects[index]
+        xyxy = [
+            int(np.clip(x, 0, frame_w - 1)),
+            int(np.clip(y, 0, frame_h - 1)),
+            int(np.clip(x + rw, 0, frame_w - 1)),
+            int(np.clip(y + rh, 0, frame_h - 1)),
+        ]
+        detections.append((int(class_ids[index]), float(scores[index]), xyxy))
+    detections.sort(key=lambda item: item[1], reverse=True)
+    return detections
+
+
+class UltralyticsDetector:
+    name = "ultralytics"
+
+    def __init__(self, model_path: Path, device: str):
+        try:
+            from ultralytics import YOLO
+        except Exception as exc:
+            raise BackendError("Python-Paket 'ultralytics' ist nicht installiert") from exc
+        self.device = device
+        self.model = YOLO(str(model_path))
+        self.names = dict(getattr(self.model, "names", {}) or {})
+
+    def detect(self, frames: list, imgsz: int, conf: float) -> list[list[tuple[int, float, list[int]]]]:
+        results = self.model.predict(frames, imgsz=imgsz, conf=conf, device=self.device, verbose=False)
+        batch = []
+        for result in results:
+            detections = []
+            boxes = getattr(result, "boxes", None)
+            for box in boxes if boxes is not None else []:
+                detections.append((int(box.cls[0]), float(box.conf[0]), [int(v) for v in box.xyxy[0].tolist()]))
+            batch.append(detections)
+        return batch
+
+
+class _ExportedDetector(ABC):
+    """Shared letterbox/decode for exported YOLO models."""
+
+    fixed_size = None
+    dynamic_batch = True
+
+    @abstractmethod
+    def _run(self, blob: np.ndarray) -> np.ndarray:
+        """Run the model on an NCHW float blob and return the raw output."""
+
+    def detect(self, frames: list, imgsz: int, conf: float) -> list[list[tuple[int, float, list[int]]]]:
+        size = int(self.fixed_size or imgsz)
+        prepared = [letterbox(frame, size) for frame in frames]
+        images = [image for image, _scale, _pad in prepared]
+        if self.dynamic_batch:
+            outputs = list(self._run(_to_blob(images)))
+        else:
+            outputs = [self._run(_to_blob([image]))[0] for image in images]
+        return [
+            postprocess(output, scale, pad, frame.shape, conf)
+            for output, (_image, scale, pad), frame in zip(outputs, prepared, frames)
+        ]
+
+
+class OnnxDetector(_ExportedDetector):
+    name = "onnx"
+
+    def __init__(self, model_path: Path):
+        try:
+            import onnxruntime as ort
+        except Exception as exc:
+            raise BackendError("Python-Paket 'onnxruntime' ist nicht installiert") from exc
+        self.session = ort.InferenceSession(str(model_path), providers=["CPUExecutionProvider"])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        batch, _channels, height, _width = model_input.shape
+        self.dynamic_batch = not isinstance(batch, int)
+        self.fixed_size = height if isinstance(height, int) else None
+        metadata = self.session.get_modelmeta().custom_metadata_map.get("names")
+        self.names = _load_names(model_path, metadata)
+
+    def _run(self, blob):
+        return self.session.run(None, {self.input_name: blob})[0]
+
+
+class OpenVinoDetector(_ExportedDetector):
+    name = "openvino"
+
+    def __init__(self, model_path: Path):
+        try:
+            import openvino as ov
+        except Exception as exc:
+            raise BackendError("Python-Paket 'openvino' ist nicht installiert") from exc
+        xml_path = model_path
+        if model_path.is_dir():
+            candidates = sorted(model_path.glob("*.xml"))
+            if not candidates:
+                raise BackendError(f"Kein OpenVINO-Modell in {model_path}")
+            xml_path = candidates[0]
+        core = ov.Core()
+        model = core.read_model(str(xml_path))
+        shape = model.input(0).get_partial_shape()
+        self.dynamic_batch = shape[0].is_dynamic
+        self.fixed_size = None if shape[2].is_dynamic else shape[2].get_length()
+        self.compiled = core.compile_model(model, "CPU")
+        self.output = self.compiled.output(0)
+        self.names = _load_names(model_path) or _load_names(xml_path, self._metadata_names(model_path))
+
+    @staticmethod
+    def _metadata_names(model_path: Path) -> str | None:
+        metadata = (model_path if model_path.is_dir() else model_path.parent) / "metadata.yaml"
+        try:
+            import yaml
+
+            names = yaml.safe_load(metadata.read_text(encoding="utf-8")).get("names")
+            return repr(dict(names)) if names else None
+        except Exception:
+            return None
+
+    def _run(self, blob):
+        return self.compiled(blob)[self.output]
+
+
+def create_detector(model_path: str | Path, device: str, imgsz: int, status=None):
+    """Create the detector for a prepared model path and detection device value.
+
+    A ``.pt`` model with device "onnx"/"openvino"/"openvino-int8" is exported
+    once (cached next to the weights); INT8 falls back to FP32 if the
+    quantization dataset is not available.
+    """
+    model_path = Path(model_path)
+    backend, int8 = resolve_backend(device, model_path)
+    if backend == "ultralytics":
+        return UltralyticsDetector(model_path, device)
+
+    if model_path.suffix.lower() == ".pt":
+        if status is not None and not exported_model_path(model_path, backend, imgsz, int8).exists():
+            status(f"Exportiere Modell nach {backend}{' INT8' if int8 else ''} ...")
+        try:
+            model_path = export_model(model_path, backend, imgsz, int8)
+        except BackendError:
+            raise
+        except Exception:
+            if not int8:
+                raise
+            # INT8 calibration needs a dataset download; use FP32 instead.
+            model_path = export_model(model_path, backend, imgsz, False)
+
+    if backend == "onnx":
+        return OnnxDetector(model_path)
+    return OpenVinoDetector(model_path)
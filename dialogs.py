@@ -66,6 +66,12 @@ class CameraEditDialog(QDialog):
         self.uid_input.setPlaceholderText(tr("placeholder.uid"))
         uid_layout.addWidget(self.uid_input)
         layout.addLayout(uid_layout)
+
+        # Substream für Kacheln/Objekterkennung
+        self.substream_check = QCheckBox(tr("dialog.edit.substream"))
+        self.substream_check.setChecked(bool(self.camera_data.get('substream', False)))
+        self.substream_check.setToolTip(tr("dialog.edit.substream_tip"))
+        layout.addWidget(self.substream_check)
         
         # Hilfe-Text
         help_group = QGroupBox(tr("dialog.edit.help_group"))
@@ -189,6 +195,7 @@ class CameraEditDialog(QDialog):
         self.camera_data['name'] = self.name_input.text().strip()
         self.camera_data['url'] = self.url_input.text().strip()
         self.camera_data['uid'] = self.uid_input.text().strip()
+        self.camera_data['substream'] = self.substream_check.isChecked()
         return self.camera_data
 
 
@@ -201,6 +208,7 @@ class CameraDiscoveryDialog(QDialog):
         self.resize(700, 500)
         
         self.found_cameras = []
+        self.moved_cameras = []  # (uid/mac, alte IP, neue IP)
         self.discovery_thread = None
         
         self.init_ui()
@@ -247,6 +255,10 @@ class CameraDiscoveryDialog(QDialog):
         self.stop_btn.clicked.connect(self.stop_scan)
         self.stop_btn.setEnabled(False)
         scan_layout.addWidget(self.stop_btn)
+
+        self.full_scan_check = QCheckBox(tr("dialog.discovery.full_scan"))
+        self.full_scan_check.setToolTip(tr("dialog.discovery.full_scan_tip"))
+        scan_layout.addWidget(self.full_scan_check)
         
         scan_layout.addStretch()
         layout.addLayout(scan_layout)
@@ -322,11 +334,19 @@ class CameraDiscoveryDialog(QDialog):
         self.stop_btn.setEnabled(True)
         self.camera_table.setRowCount(0)
         self.found_cameras.clear()
+        self.moved_cameras.clear()
         self.progress_bar.setValue(0)
         
         # Discovery Thread starten
-        self.discovery_thread = CameraDiscoveryThread(network, username=username, password=password)
+        self.discovery_thread = CameraDiscoveryThread(
+            network,
+            username=username,
+            password=password,
+            full_scan=self.full_scan_check.isChecked(),
+        )
         self.discovery_thread.camera_found.connect(self.on_camera_found)
+        self.discovery_thread.camera_moved.connect(self.on_camera_moved)
+        self.discovery_thread.camera_missing.connect(self.on_camera_missing)
         self.discovery_thread.progress_update.connect(self.on_progress_update)
         self.discovery_thread.scan_complete.connect(self.on_scan_complete)
         self.discovery_thread.start()
@@ -341,8 +361,20 @@ class CameraDiscoveryDialog(QDialog):
         self.stop_btn.setEnabled(False)
         self.status_label.setText(tr("dialog.discovery.scan_cancelled", count=len(self.found_cameras)))
     
+    def _row_for_ip(self, ip):
+        for row, camera_info in enumerate(self.found_cameras):
+            if camera_info.get('ip') == ip:
+                return row
+        return -1
+
     def on_camera_found(self, camera_info):
-        """Kamera zur Tabelle hinzufügen"""
+        """Kamera zur Tabelle hinzufügen (bereits gelistete IPs werden aktualisiert)"""
+        row = self._row_for_ip(camera_info['ip'])
+        if row >= 0:
+            self.found_cameras[row] = camera_info
+            self._fill_row(row, camera_info)
+            return
+
         self.found_cameras.append(camera_info)
         
         row = self.camera_table.rowCount()
@@ -357,14 +389,32 @@ class CameraDiscoveryDialog(QDialog):
         checkbox_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
         checkbox_layout.setContentsMargins(0, 0, 0, 0)
         self.camera_table.setCellWidget(row, 0, checkbox_widget)
-        
-        # Daten
+        self._fill_row(row, camera_info)
+
+    def _fill_row(self, row, camera_info):
         self.camera_table.setItem(row, 1, QTableWidgetItem(camera_info['ip']))
         self.camera_table.setItem(row, 2, QTableWidgetItem(camera_info['name']))
         self.camera_table.setItem(row, 3, QTableWidgetItem(camera_info['model']))
         self.camera_table.setItem(row, 4, QTableWidgetItem(camera_info['manufacturer']))
         self.camera_table.setItem(row, 5, QTableWidgetItem(', '.join(map(str, camera_info['ports']))))
         self.camera_table.setItem(row, 6, QTableWidgetItem(camera_info.get('uid', '')))
+
+    def on_camera_moved(self, identity, old_ip, new_ip):
+        """Kamera hat per DHCP eine neue IP bekommen"""
+        self.moved_cameras.append((identity, old_ip, new_ip))
+        row = self._row_for_ip(old_ip)
+        if row >= 0 and self._row_for_ip(new_ip) < 0:
+            self.found_cameras[row] = dict(self.found_cameras[row], ip=new_ip)
+            self.camera_table.setItem(row, 1, QTableWidgetItem(new_ip))
+        elif row >= 0:
+            self.on_camera_missing(old_ip)
+
+    def on_camera_missing(self, ip):
+        """Bekannte Kamera antwortet nicht mehr"""
+        row = self._row_for_ip(ip)
+        if row >= 0:
+            self.found_cameras.pop(row)
+            self.camera_table.removeRow(row)
     
     def on_progress_update(self, progress, message):
         """Progress aktualisieren"""
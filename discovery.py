@@ -1,21 +1,225 @@
+import asyncio
 import ipaddress
-import socket
+import json
+import os
+import time
 
 import requests
 from PyQt6.QtCore import QThread, pyqtSignal
 from requests.auth import HTTPDigestAuth
 
-from camera_utils import _ssdp_discovery, _udp_reolink_probe, _ws_discovery
+from camera_utils import _ssdp_discovery, _udp_reolink_probe, _ws_discovery, rtsp_probe
 from i18n import tr
 
 
+# Simultaneous TCP connects; further limited by the open-file limit.
+SCAN_CONCURRENCY = 512
+# Connection attempts per second (0 = unlimited), to go easy on small routers.
+SCAN_CONNECTS_PER_SECOND = 2000.0
+
+DISCOVERY_CACHE_PATH = "discovery_cache.json"
+# Hosts, die so lange nicht gesehen wurden, fliegen aus dem Cache.
+DISCOVERY_CACHE_MAX_AGE_DAYS = 30
+# Danach wird das ganze Subnetz wieder gescannt statt nur bekannte Hosts.
+DISCOVERY_FULL_SCAN_HOURS = 24
+
+
+def _max_concurrency(requested: int) -> int:
+    try:
+        import resource
+
+        soft, _hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft > 0:
+            return max(8, min(requested, soft // 2))
+    except Exception:
+        pass
+    return max(8, requested)
+
+
+class _RateLimiter:
+    """Spaces out connection attempts to at most ``rate`` per second."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._next = 0.0
+
+    async def wait(self):
+        if not self.interval:
+            return
+        now = time.monotonic()
+        start = max(now, self._next)
+        self._next = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+async def _probe_port(ip: str, port: int, timeout: float, limiter: _RateLimiter) -> bool:
+    await limiter.wait()
+    try:
+        _reader, writer = await asyncio.wait_for(asyncio.open_connection(ip, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except Exception:
+        pass
+    return True
+
+
+async def scan_hosts(hosts, ports, on_host, timeout=0.5, concurrency=SCAN_CONCURRENCY,
+                     connects_per_second=SCAN_CONNECTS_PER_SECOND, should_stop=None):
+    """Probe many host:port pairs concurrently.
+
+    ``on_host(ip, open_ports)`` is awaited for every host as soon as all of
+    its ports are checked, so results stream in while the scan continues.
+    At most ``concurrency`` connects are in flight; hosts are taken from a
+    queue, so memory does not grow with the size of the network.
+    """
+    ports = list(ports)
+    concurrency = _max_concurrency(int(concurrency))
+    workers = max(1, concurrency // max(1, len(ports)))
+    limiter = _RateLimiter(connects_per_second)
+    host_iter = iter(hosts)
+
+    async def worker():
+        for ip in host_iter:
+            if should_stop is not None and should_stop():
+                return
+            ip = str(ip)
+            results = await asyncio.gather(*(_probe_port(ip, port, timeout, limiter) for port in ports))
+            await on_host(ip, [port for port, is_open in zip(ports, results) if is_open])
+
+    await asyncio.gather(*(worker() for _ in range(workers)))
+
+
+def _arp_mac(ip: str) -> str:
+    """MAC-Adresse aus der ARP-Tabelle (nur Linux, sonst leer)."""
+    try:
+        with open("/proc/net/arp", "r") as f:
+            next(f, None)
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 4 and parts[0] == ip and parts[3] != "00:00:00:00:00:00":
+                    return parts[3].lower()
+    except Exception:
+        pass
+    return ""
+
+
+class DiscoveryCache:
+    """Persistente Discovery-Ergebnisse (IP, UID/MAC, Ports, Modell, zuletzt gesehen).
+
+    Bekannte Kameras werden beim nächsten Scan sofort angezeigt und nur
+    noch verifiziert. Wechselt eine Kamera per DHCP die Adresse, wird sie
+    über UID oder MAC wiedererkannt.
+    """
+
+    FIELDS = ("ip", "name", "model", "manufacturer", "uid", "mac", "ports")
+
+    def __init__(self, path: str = DISCOVERY_CACHE_PATH):
+        self.path = path
+        self.hosts = {}
+        self.networks = {}
+
+    @classmethod
+    def load(cls, path: str = DISCOVERY_CACHE_PATH) -> "DiscoveryCache":
+        cache = cls(path)
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except Exception:
+            return cache
+        cutoff = time.time() - DISCOVERY_CACHE_MAX_AGE_DAYS * 86400
+        for ip, entry in (data.get("hosts") or {}).items():
+            try:
+                if float(entry.get("last_seen", 0)) >= cutoff:
+                    cache.hosts[str(ip)] = dict(entry, ip=str(ip))
+            except Exception:
+                pass
+        networks = data.get("networks") or {}
+        if isinstance(networks, dict):
+            cache.networks = {str(k): float(v) for k, v in networks.items() if isinstance(v, (int, float))}
+        return cache
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({"hosts": self.hosts, "networks": self.networks}, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            pass
+
+    def in_network(self, network) -> dict:
+        known = {}
+        for ip, entry in self.hosts.items():
+            try:
+                if ipaddress.ip_address(ip) in network:
+                    known[ip] = dict(entry)
+            except ValueError:
+                pass
+        return known
+
+    def get(self, ip: str) -> dict | None:
+        entry = self.hosts.get(ip)
+        return dict(entry) if entry else None
+
+    def find_identity(self, uid: str = "", mac: str = "", exclude_ip: str = "") -> str | None:
+        """IP eines anderen Eintrags mit derselben UID bzw. MAC."""
+        for ip, entry in self.hosts.items():
+            if ip == exclude_ip:
+                continue
+            if uid and entry.get("uid") == uid:
+                return ip
+            if mac and entry.get("mac") == mac:
+                return ip
+        return None
+
+    def update(self, info: dict) -> str | None:
+        """Eintrag speichern; liefert die alte IP, falls die Kamera umgezogen ist."""
+        ip = info.get("ip", "")
+        if not ip:
+            return None
+        previous = self.hosts.get(ip) or {}
+        if info.get("uid") and previous.get("uid") not in ("", None, info.get("uid")):
+            previous = {}  # anderes Gerät auf derselben IP
+        entry = {field: info.get(field) or previous.get(field, "") for field in self.FIELDS}
+        entry["ip"] = ip
+        entry["ports"] = sorted(int(port) for port in (info.get("ports") or previous.get("ports") or []))
+        entry["last_seen"] = time.time()
+        old_ip = self.find_identity(entry["uid"], entry["mac"], exclude_ip=ip)
+        if old_ip:
+            self.hosts.pop(old_ip, None)
+        self.hosts[ip] = entry
+        return old_ip
+
+    def touch(self, ip: str):
+        if ip in self.hosts:
+            self.hosts[ip]["last_seen"] = time.time()
+
+    def mark_network_scanned(self, network):
+        self.networks[str(network)] = time.time()
+
+    def needs_full_scan(self, network) -> bool:
+        last = self.networks.get(str(network), 0.0)
+        return time.time() - last >= DISCOVERY_FULL_SCAN_HOURS * 3600
+
+
+def _host_count(network) -> int:
+    # Ohne Netzwerk- und Broadcast-Adresse (außer /31 und /32)
+    return network.num_addresses - 2 if network.num_addresses > 2 else network.num_addresses
+
+
 class CameraDiscoveryThread(QThread):
     """Thread für automatische Kamera-Suche im Netzwerk"""
     camera_found = pyqtSignal(dict)  # {ip, name, model, ports, uid}
     progress_update = pyqtSignal(int, str)
     scan_complete = pyqtSignal(int)
+    camera_moved = pyqtSignal(str, str, str)  # uid/mac, alte IP, neue IP
+    camera_missing = pyqtSignal(str)  # bekannte IP, die nicht mehr antwortet
     
-    def __init__(self, network_range, ports=None, username="admin", password=""):
+    def __init__(self, network_range, ports=None, username="admin", password="", cache=None, full_scan=False):
         super().__init__()
         self.network_range = network_range
         self.ports = ports or [554, 8000, 80, 8554]  # Typische Reolink/RTSP Ports
@@ -23,13 +227,31 @@ class CameraDiscoveryThread(QThread):
         self.password = password
         self.running = False
         self.found_cameras = []
+        self.cache = cache if cache is not None else DiscoveryCache.load()
+        self.full_scan = bool(full_scan)
+        self._by_ip = {}
+        self._verified = set()
+        self._moved_from = set()
         
     def run(self):
         """Netzwerk nach Kameras durchsuchen"""
         self.running = True
         self.found_cameras = []
+        self._by_ip = {}
+        self._verified = set()
+        self._moved_from = set()
         
         try:
+            network = ipaddress.ip_network(self.network_range, strict=False)
+
+            # 0. Bekannte Kameras aus dem Cache sofort anzeigen
+            known = self.cache.in_network(network)
+            for info in known.values():
+                self._report(info, cached=True)
+            if known:
+                self.progress_update.emit(2, tr("scan.cached", count=len(known)))
+            full = self.full_scan or self.cache.needs_full_scan(network)
+
             # 1. Multi-Discovery (UDP Broadcasts)
             self.progress_update.emit(5, "Starte Netzwerk-Suche (UDP/WS/SSDP)...")
             
@@ -46,11 +268,12 @@ class CameraDiscoveryThread(QThread):
                         'name': info.get('name', 'Reolink Camera'),
                         'model': info.get('model', 'Unknown'),
                         'manufacturer': "Reolink",
-                        'uid': info.get('devNo', '') or info.get('serial', '')
+                        'uid': info.get('devNo', '') or info.get('serial', ''),
+                        'mac': str(info.get('mac', '') or '').lower(),
                     }
-                    if camera_info['ip'] not in [c['ip'] for c in self.found_cameras]:
-                        self.found_cameras.append(camera_info)
-                        self.camera_found.emit(camera_info)
+                    if camera_info['ip'] and camera_info['ip'] not in self._verified:
+                        self._verified.add(camera_info['ip'])
+                        self._report(camera_info)
 
             # ONVIF Discovery
             onvif_ips = _ws_discovery(timeout=1.0)
@@ -60,62 +283,87 @@ class CameraDiscoveryThread(QThread):
             ssdp_ips = _ssdp_discovery(timeout=1.0)
             discovery_ips.update(ssdp_ips)
 
-            # Wenn wir Kameras über Broadcast gefunden haben, prüfen wir diese zuerst
-            for dip in discovery_ips:
-                if dip not in [c['ip'] for c in self.found_cameras]:
-                    # Hole Details für diese IP
-                    c_info = self._get_camera_info(dip, [80, 8000, 554, 9000])
-                    if c_info:
-                        self.found_cameras.append(c_info)
-                        self.camera_found.emit(c_info)
+            # Broadcast-Treffer und paralleler Port-Scan, Treffer werden sofort gemeldet.
+            # Inkrementell werden nur bekannte Hosts verifiziert.
+            if full:
+                asyncio.run(self._scan_network(network.hosts(), _host_count(network), discovery_ips, known))
+            else:
+                hosts = [ipaddress.ip_address(ip) for ip in known]
+                asyncio.run(self._scan_network(hosts, len(hosts), discovery_ips, known))
+                if self._missing(known) and self.running:
+                    # Bekannte Kamera antwortet nicht: evtl. neue DHCP-Adresse, ganzes Netz prüfen
+                    rest = (ip for ip in network.hosts() if str(ip) not in known)
+                    asyncio.run(self._scan_network(rest, max(1, _host_count(network) - len(known)), (), known))
+                    full = True
 
-            network = ipaddress.ip_network(self.network_range, strict=False)
-            total_hosts = network.num_addresses - 2  # Ohne Netzwerk- und Broadcast-Adresse
-            checked = 0
-            
-            for ip in network.hosts():
-                if not self.running:
-                    break
-                
-                ip_str = str(ip)
-                checked += 1
-                self.progress_update.emit(int((checked / total_hosts) * 100), tr("scan.checking", ip=ip_str))
-                
-                # Schneller Port-Scan
-                open_ports = self._scan_ports(ip_str)
-                
-                if open_ports:
-                    # Versuche Kamera-Info abzurufen
-                    camera_info = self._get_camera_info(ip_str, open_ports)
-                    if camera_info:
-                        self.found_cameras.append(camera_info)
-                        self.camera_found.emit(camera_info)
-            
+            if self.running:
+                if full:
+                    self.cache.mark_network_scanned(network)
+                for ip in self._missing(known):
+                    self._by_ip.pop(ip, None)
+                    self.camera_missing.emit(ip)
+            self.cache.save()
+
+            self.found_cameras = list(self._by_ip.values())
             self.scan_complete.emit(len(self.found_cameras))
             
         except Exception as e:
             self.progress_update.emit(100, tr("scan.error", error=str(e)))
+
+    def _missing(self, known) -> list[str]:
+        return [ip for ip in known if ip not in self._verified and ip not in self._moved_from]
+
+    def _report(self, info, cached=False):
+        """Kamera melden und im Cache ablegen; umgezogene Kameras per UID/MAC erkennen."""
+        info = dict(info)
+        ip = info['ip']
+        if not cached:
+            if not info.get('mac'):
+                info['mac'] = _arp_mac(ip)
+            old_ip = self.cache.update(info)
+            if old_ip and old_ip != ip:
+                self._moved_from.add(old_ip)
+                self._by_ip.pop(old_ip, None)
+                self.camera_moved.emit(info.get('uid') or info.get('mac') or '', old_ip, ip)
+        self._by_ip[ip] = info
+        self.camera_found.emit(info)
     
-    def _scan_ports(self, ip, timeout=0.5):
-        """Schneller Port-Scan für bestimmte IP"""
-        open_ports = []
-        
-        for port in self.ports:
-            if not self.running:
-                break
-            
-            try:
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(timeout)
-                result = sock.connect_ex((ip, port))
-                sock.close()
-                
-                if result == 0:
-                    open_ports.append(port)
-            except Exception:
-                pass
-        
-        return open_ports
+    async def _scan_network(self, hosts, total_hosts, discovery_ips=(), known=None):
+        known = known or {}
+        total_hosts = max(1, total_hosts)
+        scan_ports = set(self.ports)
+        checked = 0
+        loop = asyncio.get_running_loop()
+        claimed = set(self._verified)
+
+        async def lookup(ip_str, ports):
+            if ip_str in claimed:
+                return
+            claimed.add(ip_str)
+            cached = known.get(ip_str)
+            if cached and set(cached.get('ports') or []) & scan_ports == set(ports):
+                # Bekannter Host mit unveränderten Ports: keine erneute HTTP/UDP-Abfrage
+                self._verified.add(ip_str)
+                self.cache.touch(ip_str)
+                return
+            # HTTP/UDP-Abfragen blockieren: im Thread-Pool, damit der Scan weiterläuft
+            camera_info = await loop.run_in_executor(None, self._get_camera_info, ip_str, ports)
+            if camera_info and self.running:
+                self._verified.add(ip_str)
+                self._report(camera_info)
+
+        async def on_host(ip_str, open_ports):
+            nonlocal checked
+            checked += 1
+            if checked % 8 == 0 or checked == total_hosts:
+                self.progress_update.emit(min(100, int((checked / total_hosts) * 100)), tr("scan.checking", ip=ip_str))
+            if open_ports:
+                await lookup(ip_str, open_ports)
+
+        await asyncio.gather(
+            *(lookup(ip, [80, 8000, 554, 9000]) for ip in discovery_ips if ip not in known),
+            scan_hosts(hosts, self.ports, on_host, should_stop=lambda: not self.running),
+        )
     
     def _get_camera_info(self, ip, ports):
         """Versuche Kamera-Informationen abzurufen"""
@@ -135,6 +383,7 @@ class CameraDiscoveryThread(QThread):
             camera_info['model'] = udp_info.get('model', camera_info['model'])
             camera_info['manufacturer'] = "Reolink"
             camera_info['uid'] = udp_info.get('devNo', '') or udp_info.get('serial', '')
+            camera_info['mac'] = str(udp_info.get('mac', '') or '').lower()
             return camera_info
 
         # 2. Versuche ONVIF/HTTP Zugriff
@@ -163,8 +412,17 @@ class CameraDiscoveryThread(QThread):
                         pass
         
         # Wenn HTTP nicht funktioniert, aber RTSP Port offen ist
-        if 554 in ports or 8554 in ports:
+        rtsp_ports = [port for port in (554, 8554) if port in ports]
+        if rtsp_ports:
             camera_info['manufacturer'] = tr("camera.meta.rtsp_camera")
+            # RTSP OPTIONS statt reinem Port-Check: bestätigt den RTSP-Server und liefert dessen Kennung
+            for port in rtsp_ports:
+                probe = rtsp_probe(f"rtsp://{ip}:{port}/", timeout=1.5, describe=False)
+                if probe["rtsp"]:
+                    if probe["server"]:
+                        camera_info['model'] = probe["server"]
+                        camera_info['rtsp_server'] = probe["server"]
+                    break
             return camera_info
         
         return None
@@ -0,0 +1,162 @@
+import sys
+import threading
+
+import cv2
+import numpy as np
+
+
+class FramePool:
+    """Reusable decode buffers for one camera, shared as read-only frames.
+
+    The capture thread decodes into a pooled buffer and publishes it with
+    ``writeable=False``; UI, detection, recording and the pre-event buffer
+    then all hold the same array instead of private copies. A buffer is
+    reused only when nobody else references it any more (numpy arrays are
+    reference counted, and views keep their base alive), otherwise the
+    decoder allocates a new one.
+
+    The reference count seen by ``sys.getrefcount`` depends on the
+    interpreter, so reuse is verified once with a probe pool; if a buffer
+    that is still referenced would be handed out, every frame gets a fresh
+    buffer instead.
+    """
+
+    # References held by the pool itself: the list, the loop variable and
+    # the getrefcount() argument.
+    _FREE_REFCOUNT = 3
+    # Result of _check_reuse(); None until the first pool is created.
+    _reuse_safe: bool | None = None
+
+    def __init__(self, size: int = 4):
+        if FramePool._reuse_safe is None:
+            FramePool._reuse_safe = self._check_reuse()
+        self.size = max(0, int(size)) if FramePool._reuse_safe else 0
+        self._buffers: list[np.ndarray] = []
+        self.reused = 0
+        self.allocated = 0
+
+    @classmethod
+    def _check_reuse(cls) -> bool:
+        """True if acquire() hands out exactly the buffers nobody else holds."""
+        if sys.implementation.name != "cpython":
+            return False
+        probe = cls.__new__(cls)
+        probe.size = 1
+        probe._buffers = []
+        probe.reused = probe.allocated = 0
+        frame = probe.publish(np.zeros((2, 2, 3), dtype=np.uint8))
+        view = frame[:1]
+        del frame
+        if probe.acquire() is not None:
+            return False
+        del view
+        frame = probe.acquire()
+        if frame is None:
+            return False
+        probe.publish(frame)
+        if probe.acquire() is not None:
+            return False
+        return True
+
+    def acquire(self) -> np.ndarray | None:
+        """Return a free buffer made writable again, or None to let the decoder allocate."""
+        for buffer in self._buffers:
+            if sys.getrefcount(buffer) <= self._FREE_REFCOUNT:
+                buffer.flags.writeable = True
+                return buffer
+        return None
+
+    def publish(self, frame: np.ndarray) -> np.ndarray:
+        """Freeze a decoded frame and adopt it into the pool if there is room."""
+        if frame is None:
+            return frame
+        if self._buffers and frame.shape != self._buffers[0].shape:
+            # Resolution changed: old buffers are released once their readers drop them.
+            self._buffers = []
+        if any(frame is buffer for buffer in self._buffers):
+            self.reused += 1
+        else:
+            self.allocated += 1
+            if len(self._buffers) < self.size and frame.flags.owndata:
+                self._buffers.append(frame)
+        frame.flags.writeable = False
+        return frame
+
+    def clear(self):
+        self._buffers = []
+
+
+class FrameMailbox:
+    """Latest-frame slots that capture threads overwrite and the GUI drains.
+
+    Instead of one queued Qt signal per frame, each producer key holds only
+    its newest frame; the GUI takes all slots on a display-refresh timer.
+    Frames that were replaced before the GUI got to them are dropped, so a
+    busy GUI thread never builds up a backlog and always paints the newest
+    frame.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._slots: dict = {}
+        self.delivered = 0
+        self.dropped = 0
+
+    def put(self, key, frame):
+        with self._lock:
+            if key in self._slots:
+                self.dropped += 1
+            self._slots[key] = frame
+
+    def take_all(self) -> dict:
+        with self._lock:
+            slots, self._slots = self._slots, {}
+        self.delivered += len(slots)
+        return slots
+
+    def discard(self, key):
+        with self._lock:
+            self._slots.pop(key, None)
+
+
+class LetterboxCanvas:
+    """Reusable RGB canvas for showing frames letterboxed in one label.
+
+    The canvas is reallocated only when the label size changes. Each frame is
+    resized straight into the centered region and converted to RGB in place;
+    the black borders are only cleared when that region moves. QPixmap.fromImage
+    copies the pixels, so the canvas can be reused for the next frame.
+    """
+
+    def __init__(self):
+        self._canvas: np.ndarray | None = None
+        self._rect: tuple[int, int, int, int] | None = None
+        self.allocations = 0
+
+    def render(self, frame_view: np.ndarray, display_w: int, display_h: int):
+        """Draw frame_view into the canvas; returns (canvas, (x, y, width, height))."""
+        crop_h, crop_w = frame_view.shape[:2]
+        scale = min(display_w / crop_w, display_h / crop_h)
+        new_w = max(1, min(display_w, int(crop_w * scale)))
+        new_h = max(1, min(display_h, int(crop_h * scale)))
+        x = (display_w - new_w) // 2
+        y = (display_h - new_h) // 2
+
+        canvas = self._canvas
+        if canvas is None or canvas.shape[:2] != (display_h, display_w):
+            canvas = self._canvas = np.zeros((display_h, display_w, 3), dtype=np.uint8)
+            self._rect = None
+            self.allocations += 1
+        rect = (x, y, new_w, new_h)
+        if rect != self._rect:
+            canvas.fill(0)
+            self._rect = rect
+
+        roi = canvas[y:y + new_h, x:x + new_w]
+        cv2.resize(frame_view, (new_w, new_h), dst=roi)
+        cv2.cvtColor(roi, cv2.COLOR_BGR2RGB, dst=roi)
+        return canvas, rect
+
+    def clear(self):
+        self._canvas = None
+        self._rect = None
@@ -1,3 +1,4 @@
+import multiprocessing
 import os
 import sys
 
@@ -67,4 +68,6 @@ def main():
 
 
 if __name__ == '__main__':
+    # Capture-Worker (stream.process_isolation) in gepackten Builds
+    multiprocessing.freeze_support()
     main()
@@ -7,7 +7,6 @@ os.environ['AV_LOG_FORCE_LEVEL'] = '-8'
 os.environ['OPENCV_FFMPEG_CAPTURE_OPTIONS'] = 'rtsp_transport;tcp|loglevel;quiet'
 
 import cv2
-import numpy as np
 import threading
 from PyQt6.QtWidgets import (
     QComboBox,
@@ -40,14 +39,24 @@ import time
 from camera_utils import (
     _build_rtsp_url,
     _is_battery_camera,
+    _is_substream_path,
+    _normalize_rtsp_url,
+    _substream_url,
+    capture_source_key,
     normalize_reolinkproxy_camera,
+    replace_camera_host,
 )
+from capture_process import ProcessCameraThread
 from config import DEFAULT_RECORDING_PATH, config_payload, load_config_data, save_config_data, snapshot_path_for
 from detection import DEFAULT_DETECTION_CONFIG, DetectionWorker, default_model_dir, prepare_model_path
 from dialogs import CameraDiscoveryDialog, CameraEditDialog
+from frames import FrameMailbox, LetterboxCanvas
 from i18n import set_language, tr
 from notifications import DEFAULT_EMAIL_CONFIG, send_detection_email
-from stream import CameraThread
+from reconnect import shared_reconnect_scheduler
+from recording import DEFAULT_RECORDING_CONFIG
+from retention import DEFAULT_RETENTION_CONFIG, RetentionManager
+from stream import DEFAULT_STREAM_CONFIG, CameraThread, CaptureMultiplexer
 from ui_resources import load_svg_icon
 from widgets import CameraListContainer, CameraWidget, PreviewLabel
 
@@ -65,6 +74,9 @@ class MainWindow(QMainWindow):
     email_test_finished = pyqtSignal(bool, str)
     model_test_finished = pyqtSignal(bool, str, str)
 
+    # Tiles scrolled out of the camera list still refresh slowly.
+    OFFSCREEN_TILE_FPS = 2.0
+
     def __init__(self):
         super().__init__()
         self.language = "de"
@@ -74,17 +86,24 @@ class MainWindow(QMainWindow):
         
         self.cameras = []
         self.camera_threads = {}  # Dict für parallele Thread-Verwaltung
+        self.capture_mux = CaptureMultiplexer()  # Kamera-Einträge derselben Quelle teilen einen Thread
+        self.frame_mailbox = FrameMailbox()  # neuester Frame je Thread, per Timer abgeholt
         self.camera_widgets = {}  # Dict für Widget-Zugriff
         self.recording_path = DEFAULT_RECORDING_PATH
         self.snapshot_path = snapshot_path_for(self.recording_path)
         self.event_path = os.path.join(self.recording_path, "events")
         self.detection_config = dict(DEFAULT_DETECTION_CONFIG)
+        self.recording_config = dict(DEFAULT_RECORDING_CONFIG)
         self.email_config = dict(DEFAULT_EMAIL_CONFIG)
+        self.retention_config = dict(DEFAULT_RETENTION_CONFIG)
+        self.stream_config = dict(DEFAULT_STREAM_CONFIG)
         self.detection_worker = None
+        self.retention_manager = None
         self._model_retry_delays = [30, 120, 300]
         self._model_retry_attempt = 0
         self._model_retry_scheduled = False
         self.cameras_per_row = 3  # Standard: 3 Kameras pro Reihe
+        self.video_surface = "label"  # "opengl": Grid-Kacheln per QOpenGLWidget skalieren
         self.next_camera_id = 1
         self.selected_camera_id = None
         self.selected_camera_ids = []  # Multi-Kamera-Auswahl
@@ -108,6 +127,7 @@ class MainWindow(QMainWindow):
         
         self.init_ui()
         self.load_config()
+        self._restart_retention_manager()
     
     def init_ui(self):
         """UI initialisieren"""
@@ -272,6 +292,7 @@ class MainWindow(QMainWindow):
         self.camera_list_container = CameraListContainer()
         self.camera_list_container.order_changed.connect(self._on_camera_order_changed)
         self.left_scroll.setWidget(self.camera_list_container)
+        self.left_scroll.verticalScrollBar().valueChanged.connect(lambda _value: self._sync_consumer_fps())
 
         splitter.addWidget(self.left_scroll)
 
@@ -303,6 +324,16 @@ class MainWindow(QMainWindow):
         self.status_timer.timeout.connect(self.update_status_display)
         self.status_timer.start(2000)  # Alle 2 Sekunden
 
+        # Frames aller Kameras einmal pro Bildwiederholung abholen (nur der neueste zählt)
+        self.frame_timer = QTimer()
+        self.frame_timer.timeout.connect(self._drain_frame_mailbox)
+        refresh_rate = 60.0
+        try:
+            refresh_rate = float(self.screen().refreshRate()) or refresh_rate
+        except Exception:
+            pass
+        self.frame_timer.start(int(1000 / max(30.0, min(120.0, refresh_rate))))
+
     def _create_detection_config_group(self):
         group = QGroupBox(tr("group.detection_config"))
         self.detection_group = group
@@ -324,6 +355,9 @@ class MainWindow(QMainWindow):
             (tr("detection.device.auto"), "auto"),
             (tr("detection.device.cuda"), "cuda:0"),
             (tr("detection.device.cpu"), "cpu"),
+            (tr("detection.device.onnx"), "onnx"),
+            (tr("detection.device.openvino"), "openvino"),
+            (tr("detection.device.openvino_int8"), "openvino-int8"),
         ):
             self.detection_device_combo.addItem(label, value)
         row1.addWidget(self.detection_device_label)
@@ -598,6 +632,11 @@ class MainWindow(QMainWindow):
         config = dict(self.detection_config)
         config["recording_path"] = self.recording_path
         config["model_dir"] = str(default_model_dir(self.recording_path))
+        config["motion_masks"] = {
+            int(camera["id"]): camera.get("motion_mask")
+            for camera in self.cameras
+            if camera.get("motion_mask")
+        }
         return config
 
     def test_detection_model(self):
@@ -802,20 +841,16 @@ class MainWindow(QMainWindow):
             label.clear_frame_display_rect()
             return
 
-        scale = min(display_w / crop_w, display_h / crop_h)
-        new_w = max(1, int(crop_w * scale))
-        new_h = max(1, int(crop_h * scale))
-
-        frame_resized = cv2.resize(frame_view, (new_w, new_h))
-        rgb_small = cv2.cvtColor(frame_resized, cv2.COLOR_BGR2RGB)
-        rgb_frame = np.zeros((display_h, display_w, 3), dtype=np.uint8)
-        x = (display_w - new_w) // 2
-        y = (display_h - new_h) // 2
-        rgb_frame[y:y + new_h, x:x + new_w] = rgb_small
+        # Vorallokierte Leinwand pro Label statt neuer Puffer für jeden Frame.
+        canvas = getattr(label, "render_canvas", None)
+        if canvas is None:
+            canvas = label.render_canvas = LetterboxCanvas()
+        rgb_frame, (x, y, new_w, new_h) = canvas.render(frame_view, display_w, display_h)
 
         h, w, ch = rgb_frame.shape
         bytes_per_line = ch * w
-        qt_image = QImage(rgb_frame.data, w, h, bytes_per_line, QImage.Format.Format_RGB888).copy()
+        # fromImage copies the pixels, so the canvas can be reused without QImage.copy().
+        qt_image = QImage(rgb_frame.data, w, h, bytes_per_line, QImage.Format.Format_RGB888)
         pixmap = QPixmap.fromImage(qt_image)
         pixmap.setDevicePixelRatio(1.0)
         label.setPixmap(pixmap)
@@ -833,7 +868,7 @@ class MainWindow(QMainWindow):
         model = camera.get('model', '')
         is_battery = _is_battery_camera(model, camera_name)
         
-        widget = CameraWidget(camera_id, camera_name, is_battery=is_battery)
+        widget = CameraWidget(camera_id, camera_name, is_battery=is_battery, video_surface=self.video_surface)
         widget.remove_btn.clicked.connect(lambda checked, cid=camera_id: self.remove_camera(cid))
         widget.edit_btn.clicked.connect(lambda checked, cid=camera_id: self.edit_camera(cid))
         widget.stream_toggled.connect(self.toggle_camera_stream)
@@ -862,7 +897,7 @@ class MainWindow(QMainWindow):
         thread = self.camera_threads.get(camera_id)
         if thread is None:
             return
-        self.toggle_camera_recording(thread, widget, checked)
+        self.toggle_camera_recording(camera_id, thread, widget, checked)
 
     def _allocate_camera_id(self) -> int:
         camera_id = self.next_camera_id
@@ -917,15 +952,58 @@ class MainWindow(QMainWindow):
 
     def _start_camera_thread(self, camera: dict) -> CameraThread:
         camera_id = camera['id']
-        thread = CameraThread(camera_id, camera['url'], camera.get('uid', ''))
-        thread.frame_ready.connect(lambda frame, cid=camera_id: self.update_camera_frame(frame, cid))
-        thread.connection_status.connect(lambda connected, cid, msg: self.update_camera_status(connected, cid, msg))
-        thread.start()
+        source_key = capture_source_key(camera)
+        thread = self.capture_mux.running_thread(source_key)
+        if thread is None:
+            substream_url = None
+            if camera.get('substream'):
+                substream_url = camera.get('substream_url') or _substream_url(camera['url'])
+            # Optional: Capture im eigenen Prozess (Frames per Shared Memory)
+            thread_class = ProcessCameraThread if self.stream_config.get("process_isolation") else CameraThread
+            thread = thread_class(
+                camera_id,
+                camera['url'],
+                camera.get('uid', ''),
+                recording_config=self.recording_config,
+                substream_url=substream_url,
+                stream_config=self.stream_config,
+                mailbox=self.frame_mailbox,
+            )
+            thread.file_closed.connect(self._on_media_file_closed)
+            thread.rtsp_url_changed.connect(self._on_stream_url_changed)
+            thread.start()
+        else:
+            # Gleiche Quelle läuft bereits (z.B. nativ und über ReolinkProxy): Decoder teilen.
+            widget = self.camera_widgets.get(camera_id)
+            if widget is not None and (thread.main_stream_active or thread.substream_active):
+                widget.update_status(True, tr("camera.status.connected"))
+
+        # Frames come through frame_mailbox. The emitted camera id is the one
+        # that started the thread; each view uses its own.
+        connections = [
+            (thread.connection_status, thread.connection_status.connect(
+                lambda connected, _cid, msg, cid=camera_id: self.update_camera_status(connected, cid, msg))),
+        ]
+        self.capture_mux.attach(camera_id, source_key, thread, connections)
         self.camera_threads[camera_id] = thread
+        self._sync_main_stream_demand()
         if camera_id in self.camera_widgets:
             self.camera_widgets[camera_id].set_stream_active(True)
         return thread
 
+    def _on_stream_url_changed(self, old_url: str, new_url: str):
+        """Funktionierenden Fallback-Pfad speichern, damit er beim nächsten Start zuerst versucht wird."""
+        if _is_substream_path(new_url):
+            # Nie einen Substream als Haupt-URL speichern (Aufnahme-Auflösung, Substream-Ableitung)
+            return
+        changed = False
+        for camera in self.cameras:
+            if camera.get('url') and _normalize_rtsp_url(camera['url']) == old_url:
+                camera['url'] = new_url
+                changed = True
+        if changed:
+            self.save_config()
+
     def _clear_big_preview_label(self, text: str = ""):
         self.big_preview_label.setPixmap(QPixmap())
         self.big_preview_label.clear_frame_display_rect()
@@ -942,7 +1020,10 @@ class MainWindow(QMainWindow):
         """Kamera-Suche Dialog anzeigen"""
         dialog = CameraDiscoveryDialog(self)
         
-        if dialog.exec() == QDialog.DialogCode.Accepted:
+        accepted = dialog.exec() == QDialog.DialogCode.Accepted
+        # Umgezogene Kameras (neue DHCP-Adresse) auch ohne Auswahl übernehmen
+        self._apply_discovered_moves(dialog.moved_cameras)
+        if accepted:
             selected_cameras = dialog.get_selected_cameras()
             
             if not selected_cameras:
@@ -991,6 +1072,26 @@ class MainWindow(QMainWindow):
                            "These cameras are battery-powered.")
                     )
     
+    def _apply_discovered_moves(self, moves):
+        """Konfigurierte Kameras auf die neue IP umstellen, die die Suche per UID/MAC erkannt hat."""
+        changed = False
+        for identity, old_ip, new_ip in moves:
+            for camera in self.cameras:
+                if camera.get('uid') and camera.get('uid') != identity:
+                    continue
+                if not replace_camera_host(camera, old_ip, new_ip):
+                    continue
+                changed = True
+                camera_id = camera['id']
+                self.statusBar().showMessage(
+                    tr("status.camera_moved", name=camera.get('name', camera_id), old_ip=old_ip, new_ip=new_ip)
+                )
+                thread = self.camera_threads.get(camera_id)
+                if thread is not None and thread.isRunning() and self._stop_camera_thread(camera_id):
+                    QTimer.singleShot(500, lambda cid=camera_id: self.start_single_stream(cid))
+        if changed:
+            self.save_config()
+
     def add_camera(self):
         """Kamera hinzufügen"""
         url = self.url_input.text().strip()
@@ -1044,9 +1145,7 @@ class MainWindow(QMainWindow):
             thread = self.camera_threads[camera_id]
             if thread.isRunning():
                 was_running = True
-                if thread.stop(timeout_ms=3000):
-                    del self.camera_threads[camera_id]
-                else:
+                if not self._stop_camera_thread(camera_id):
                     QMessageBox.warning(self, tr("dialog.title.error"), "Stream wird noch beendet. Bitte gleich erneut versuchen.")
                     return
         
@@ -1106,11 +1205,42 @@ class MainWindow(QMainWindow):
         self._start_camera_thread(camera)
         self.statusBar().showMessage(tr("status.stream_started", name=camera['name']))
 
+    def _stop_camera_thread(self, camera_id, timeout_ms=3000) -> bool:
+        """Stream einer Kamera beenden; geteilte Threads laufen für andere Kameras weiter."""
+        thread = self.camera_threads.get(camera_id)
+        if thread is None:
+            return True
+        if not self.capture_mux.shared(camera_id) and not thread.stop(timeout_ms=timeout_ms):
+            return False
+        siblings = [cid for cid in self.capture_mux.siblings(camera_id) if cid != camera_id]
+        if self.capture_mux.set_recording(camera_id, False) and siblings:
+            # Last entry that wanted the shared recording; the thread keeps running.
+            thread.stop_recording()
+        self._detach_camera_thread(camera_id)
+        del self.camera_threads[camera_id]
+        if siblings:
+            self._sync_recording_widgets(siblings[0])
+        thread.set_main_stream_demand(f"preview:{camera_id}", False)
+        for consumer in ("tile", "preview", "detection"):
+            thread.set_consumer_fps(f"{consumer}:{camera_id}", None)
+        return True
+
+    def _forget_stopped_camera_threads(self):
+        for camera_id, thread in list(self.camera_threads.items()):
+            if not thread.isRunning():
+                self._detach_camera_thread(camera_id)
+                del self.camera_threads[camera_id]
+
+    def _detach_camera_thread(self, camera_id):
+        """View vom Mux lösen; ohne weitere Views auch die liegengebliebenen Frames verwerfen."""
+        thread = self.capture_mux.detach(camera_id)
+        if thread is not None:
+            for kind in ("main", "sub"):
+                self.frame_mailbox.discard((thread, kind))
+
     def stop_single_stream(self, camera_id):
         if camera_id in self.camera_threads:
-            if self.camera_threads[camera_id].stop(timeout_ms=3000):
-                del self.camera_threads[camera_id]
-            else:
+            if not self._stop_camera_thread(camera_id):
                 self.statusBar().showMessage("Stream wird noch beendet...")
                 return
 
@@ -1158,9 +1288,7 @@ class MainWindow(QMainWindow):
 
         # Thread stoppen falls aktiv
         if camera_id in self.camera_threads:
-            if self.camera_threads[camera_id].stop(timeout_ms=3000):
-                del self.camera_threads[camera_id]
-            else:
+            if not self._stop_camera_thread(camera_id):
                 QMessageBox.warning(self, tr("dialog.title.error"), "Stream wird noch beendet. Bitte gleich erneut versuchen.")
                 return
         
@@ -1272,7 +1400,7 @@ class MainWindow(QMainWindow):
     
     def stop_all_streams(self):
         """Alle Streams stoppen"""
-        threads = list(self.camera_threads.values())
+        threads = list({id(thread): thread for thread in self.camera_threads.values()}.values())
         force_stop = bool(getattr(self, "_closing", False))
 
         for thread in threads:
@@ -1283,11 +1411,7 @@ class MainWindow(QMainWindow):
             remaining_ms = max(0, int((deadline - time.monotonic()) * 1000))
             if thread.isRunning():
                 thread.wait(remaining_ms)
-        self.camera_threads = {
-            camera_id: thread
-            for camera_id, thread in self.camera_threads.items()
-            if thread.isRunning()
-        }
+        self._forget_stopped_camera_threads()
         if self.camera_threads:
             self.statusBar().showMessage("Streams werden noch beendet...")
             return
@@ -1313,12 +1437,49 @@ class MainWindow(QMainWindow):
         self.update_status_display()
         self.statusBar().showMessage(tr("status.streams_stopped"))
     
+    def _drain_frame_mailbox(self):
+        slots = self.frame_mailbox.take_all()
+        if not slots:
+            return
+        views = {}
+        for camera_id, thread in self.camera_threads.items():
+            views.setdefault(thread, []).append(camera_id)
+        for (thread, kind), frame in slots.items():
+            for camera_id in views.get(thread, ()):
+                if kind == "sub":
+                    self.update_camera_substream_frame(frame, camera_id)
+                else:
+                    self.update_camera_frame(frame, camera_id)
+
     def update_camera_frame(self, frame, camera_id):
         """Frame einer Kamera aktualisieren"""
         widget = self.camera_widgets.get(camera_id)
+        thread = self.camera_threads.get(camera_id)
+        if thread is not None and thread.substream_active:
+            # Tile and detection come from the substream; keep the full frame for snapshots.
+            if widget is not None:
+                widget.last_frame = frame
+        else:
+            if widget is not None:
+                try:
+                    widget.update_frame(frame)
+                except RuntimeError:
+                    return
+
+            if self._detection_worker_is_running() and self._camera_detection_enabled(camera_id):
+                camera_name = widget.camera_name if widget is not None else str(camera_id)
+                self.detection_worker.submit_frame(camera_id, camera_name, frame)
+
+        self._update_previews_with_frame(frame, camera_id)
+
+    def update_camera_substream_frame(self, frame, camera_id):
+        """Substream-Frame: Kachel und Objekterkennung"""
+        widget = self.camera_widgets.get(camera_id)
+        thread = self.camera_threads.get(camera_id)
+        main_active = thread is not None and thread.main_stream_active
         if widget is not None:
             try:
-                widget.update_frame(frame)
+                widget.update_frame(frame, remember=not main_active)
             except RuntimeError:
                 return
 
@@ -1326,6 +1487,11 @@ class MainWindow(QMainWindow):
             camera_name = widget.camera_name if widget is not None else str(camera_id)
             self.detection_worker.submit_frame(camera_id, camera_name, frame)
 
+        if not main_active:
+            # Until the main stream is up, the big preview shows the substream.
+            self._update_previews_with_frame(frame, camera_id)
+
+    def _update_previews_with_frame(self, frame, camera_id):
         # Update big preview for single camera selection (old behavior)
         if self.selected_camera_id == camera_id and len(self.selected_camera_ids) == 0:
             self._update_big_preview_frame(frame)
@@ -1343,32 +1509,76 @@ class MainWindow(QMainWindow):
             except RuntimeError:
                 return
     
-    def toggle_camera_recording(self, thread, widget, checked):
-        """Aufnahme einer einzelnen Kamera umschalten"""
-        if checked:
-            filename = thread.start_recording(self.recording_path)
-            if filename:
+    def toggle_camera_recording(self, camera_id, thread, widget, checked):
+        """Aufnahme einer Kamera umschalten.
+
+        Einträge derselben Quelle teilen einen Thread und damit die Aufnahme:
+        sie startet mit dem ersten Eintrag, der sie will, und endet mit dem letzten.
+        """
+        if self.capture_mux.set_recording(camera_id, checked):
+            if checked:
+                # Mit Prozess-Isolation kommt der Dateiname später (Callback im GUI-Thread)
+                thread.start_recording(
+                    self.recording_path,
+                    callback=lambda filename, cid=camera_id: self._on_recording_started(cid, filename),
+                )
+            else:
+                thread.stop_recording()
+                self.statusBar().showMessage(tr("status.recording_stopped", name=widget.camera_name))
+        self._sync_recording_widgets(camera_id)
+
+    def _on_recording_started(self, camera_id, filename, announce=True):
+        """Ergebnis von start_recording; ohne Datei bleibt die geteilte Quelle ohne Aufnahme"""
+        if filename:
+            if announce:
                 self.statusBar().showMessage(tr("status.recording", name=os.path.basename(filename)))
-        else:
-            thread.stop_recording()
-            self.statusBar().showMessage(tr("status.recording_stopped", name=widget.camera_name))
+            return
+        for cid in self.capture_mux.siblings(camera_id):
+            self.capture_mux.set_recording(cid, False)
+            widget = self.camera_widgets.get(cid)
+            if widget is None:
+                continue
+            try:
+                widget.record_btn.setChecked(False)
+            except RuntimeError:
+                continue
+        self._sync_recording_widgets(camera_id)
+
+    def _sync_recording_widgets(self, camera_id):
+        """REC-Anzeige aller Einträge einer geteilten Quelle angleichen"""
+        recording = self.capture_mux.recording(camera_id)
+        for cid in self.capture_mux.siblings(camera_id):
+            widget = self.camera_widgets.get(cid)
+            if widget is None:
+                continue
+            try:
+                widget.set_recording(recording)
+            except RuntimeError:
+                continue
     
     def toggle_all_recording(self):
         """Alle Aufnahmen umschalten"""
         recording = self.record_all_btn.isChecked()
         
-        count = 0
+        threads = set()
         for camera_id, widget in self.camera_widgets.items():
             if widget.record_btn.isEnabled() and camera_id in self.camera_threads:
                 widget.record_btn.setChecked(recording)
-                widget.toggle_recording()
-                
                 thread = self.camera_threads[camera_id]
-                if recording:
-                    thread.start_recording(self.recording_path)
-                else:
-                    thread.stop_recording()
-                count += 1
+                # Geteilte Threads nur einmal starten/stoppen
+                if self.capture_mux.set_recording(camera_id, recording):
+                    if recording:
+                        thread.start_recording(
+                            self.recording_path,
+                            callback=lambda filename, cid=camera_id: self._on_recording_started(
+                                cid, filename, announce=False
+                            ),
+                        )
+                    else:
+                        thread.stop_recording()
+                self._sync_recording_widgets(camera_id)
+                threads.add(thread)
+        count = len(threads)
         
         if recording:
             self.record_all_btn.setText(tr("btn.record_all_stop"))
@@ -1383,12 +1593,118 @@ class MainWindow(QMainWindow):
             self.record_all_btn.setStyleSheet("")
             self.statusBar().showMessage(tr("status.recordings_stopped", count=count))
     
+    def _sync_main_stream_demand(self):
+        """Cameras shown in the big preview/multi-view need full-resolution frames."""
+        if self.selected_camera_ids:
+            previewed = set(self.selected_camera_ids)
+        else:
+            previewed = {self.selected_camera_id} if self.selected_camera_id is not None else set()
+        for camera_id, thread in self.camera_threads.items():
+            # Per camera id: several entries can share one thread.
+            thread.set_main_stream_demand(f"preview:{camera_id}", camera_id in previewed)
+        self._sync_consumer_fps(previewed)
+
+    def _window_shown(self) -> bool:
+        if not self.isVisible() or self.isMinimized():
+            return False
+        handle = self.windowHandle()
+        # Not exposed: fully covered or on another virtual desktop (where the platform reports it).
+        return handle is None or handle.isExposed()
+
+    def _sync_consumer_fps(self, previewed=None):
+        """Frame-Rate je Verbraucher anmelden: verborgene Kacheln brauchen kaum Frames."""
+        if previewed is None:
+            if self.selected_camera_ids:
+                previewed = set(self.selected_camera_ids)
+            else:
+                previewed = {self.selected_camera_id} if self.selected_camera_id is not None else set()
+        shown = self._window_shown()
+        preview_shown = shown and not self.big_preview_container.visibleRegion().isEmpty()
+        detection_fps = 0.0
+        if self._detection_worker_is_running():
+            # Twice the analysis rate so the worker always finds a fresh frame.
+            detection_fps = 2.0 * float(self.detection_config.get("analysis_fps_per_camera", 3.0) or 3.0)
+
+        for camera_id, thread in self.camera_threads.items():
+            widget = self.camera_widgets.get(camera_id)
+            tile_fps = 0.0
+            if shown and widget is not None and not widget.is_selected_for_view:
+                on_screen = not widget.video_label.visibleRegion().isEmpty()
+                tile_fps = CameraThread.MAX_UI_FPS if on_screen else self.OFFSCREEN_TILE_FPS
+            thread.set_consumer_fps(f"tile:{camera_id}", tile_fps)
+            thread.set_consumer_fps(
+                f"preview:{camera_id}",
+                CameraThread.MAX_UI_FPS if preview_shown and camera_id in previewed else 0.0,
+            )
+            thread.set_consumer_fps(
+                f"detection:{camera_id}",
+                detection_fps if self._camera_detection_enabled(camera_id) else 0.0,
+            )
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.Type.WindowStateChange:
+            self._sync_consumer_fps()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._sync_consumer_fps()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._sync_consumer_fps()
+
     def update_status_display(self):
         """Statusanzeige aktualisieren"""
         total = len(self.cameras)
-        active = len([t for t in self.camera_threads.values() if t.isRunning()])
+        active = len([cid for cid, t in self.camera_threads.items() if t.isRunning()])
         self.camera_count_label.setText(tr("label.camera_count", total=total, active=active))
+        self._sync_main_stream_demand()
+        self._update_camera_health()
+        if self._detection_worker_is_running():
+            analyzed, skipped = self.detection_worker.motion_stats()
+            if analyzed or skipped:
+                self.camera_count_label.setText(
+                    self.camera_count_label.text()
+                    + tr("label.motion_skipped", skipped=skipped, total=analyzed + skipped)
+                )
     
+    def _update_camera_health(self):
+        """Pipeline-Kennzahlen der laufenden Streams als Tooltip der Kamera-Kacheln."""
+        def fmt(value, digits=1):
+            return "-" if value is None else f"{value:.{digits}f}"
+
+        for camera_id, widget in self.camera_widgets.items():
+            thread = self.camera_threads.get(camera_id)
+            if thread is None or not thread.isRunning():
+                widget.info_label.setToolTip("")
+                continue
+            health = thread.metrics.snapshot()
+            tooltip = tr(
+                "camera.health",
+                decoded=fmt(health["decoded_fps"]),
+                emitted=fmt(health["emitted_fps"]),
+                p50=fmt(health["read_ms_p50"]),
+                p95=fmt(health["read_ms_p95"]),
+                p99=fmt(health["read_ms_p99"]),
+                failed=health["failed_reads"],
+                reconnects=health["reconnects"],
+                stalls=health["stalls"],
+                since=fmt(health["seconds_since_frame"]),
+                buffer=fmt(health["buffer_bytes"] / (1024 * 1024)),
+            )
+            stream = health["stream"]
+            if stream:
+                tooltip += "\n" + tr(
+                    "camera.health.stream",
+                    codec=stream["codec"] or "?",
+                    width=stream["width"] or "?",
+                    height=stream["height"] or "?",
+                    fps=fmt(stream["fps"] or None, 0),
+                    ready=fmt(stream["total_ms"], 0),
+                )
+            widget.info_label.setToolTip(tooltip)
+
     def select_recording_path(self):
         """Speicherort für Aufnahmen wählen"""
         path = QFileDialog.getExistingDirectory(self, tr("dialog.path.choose"), self.recording_path)
@@ -1399,8 +1715,32 @@ class MainWindow(QMainWindow):
             os.makedirs(self.snapshot_path, exist_ok=True)
             os.makedirs(self.event_path, exist_ok=True)
             self.save_config()
+            self._restart_retention_manager()
             self.statusBar().showMessage(tr("status.path", path=path))
 
+    def _restart_retention_manager(self):
+        manager = self.retention_manager
+        self.retention_manager = None
+        if manager is not None:
+            manager.stop(timeout_ms=3000)
+        if not self.retention_config.get("enabled"):
+            return
+        manager = RetentionManager(self.recording_path, self.retention_config, self)
+        manager.pruned.connect(self._on_retention_pruned)
+        manager.status.connect(self.statusBar().showMessage)
+        manager.start()
+        self.retention_manager = manager
+
+    def _note_media_file(self, path: str):
+        if self.retention_manager is not None:
+            self.retention_manager.note_file(path)
+
+    def _on_media_file_closed(self, camera_id: int, path: str):
+        self._note_media_file(path)
+
+    def _on_retention_pruned(self, count: int, size):
+        self.statusBar().showMessage(tr("status.retention_pruned", count=count, size=f"{size / (1024 * 1024):.0f}"))
+
     def toggle_camera_detection(self, camera_id: int, enabled: bool):
         camera = next((c for c in self.cameras if int(c.get("id", -1)) == int(camera_id)), None)
         if camera is None:
@@ -1482,24 +1822,11 @@ class MainWindow(QMainWindow):
 
         try:
             cv2.imwrite(snapshot_file, event.annotated_frame)
+            self._note_media_file(snapshot_file)
         except Exception as exc:
             self.statusBar().showMessage(tr("status.snapshot_error", error=exc))
             return
 
-        clip_file = None
-        thread = self.camera_threads.get(event.camera_id)
-        if thread is not None:
-            clip_seconds = min(180.0, max(1.0, float(self.detection_config.get("event_clip_seconds", 30))))
-            pre_seconds = min(clip_seconds - 1.0, max(0.0, float(self.detection_config.get("pre_event_seconds", 8))))
-            post_seconds = max(1.0, clip_seconds - pre_seconds)
-            clip_file = thread.start_event_clip(
-                self.event_path,
-                event.label,
-                pre_seconds=pre_seconds,
-                post_seconds=post_seconds,
-                max_seconds=clip_seconds,
-            )
-
         self.statusBar().showMessage(
             tr(
                 "status.detection_event",
@@ -1508,7 +1835,23 @@ class MainWindow(QMainWindow):
                 confidence=f"{event.confidence:.2f}",
             )
         )
-        self._send_detection_email_async(event, snapshot_file, clip_file)
+
+        thread = self.camera_threads.get(event.camera_id)
+        if thread is None:
+            self._send_detection_email_async(event, snapshot_file, None)
+            return
+        clip_seconds = min(180.0, max(1.0, float(self.detection_config.get("event_clip_seconds", 30))))
+        pre_seconds = min(clip_seconds - 1.0, max(0.0, float(self.detection_config.get("pre_event_seconds", 8))))
+        post_seconds = max(1.0, clip_seconds - pre_seconds)
+        # Die Mail geht raus, sobald der Clip-Name feststeht (Worker-Prozess antwortet asynchron).
+        thread.start_event_clip(
+            self.event_path,
+            event.label,
+            pre_seconds=pre_seconds,
+            post_seconds=post_seconds,
+            max_seconds=clip_seconds,
+            callback=lambda clip_file: self._send_detection_email_async(event, snapshot_file, clip_file),
+        )
 
     def _send_detection_email_async(self, event, snapshot_file: str, clip_file: str | None):
         if not self.email_config.get("enabled"):
@@ -1549,6 +1892,7 @@ class MainWindow(QMainWindow):
 
         try:
             cv2.imwrite(filename, widget.last_frame)
+            self._note_media_file(filename)
             self.statusBar().showMessage(tr("status.snapshot_saved", name=os.path.basename(filename)))
         except Exception as e:
             self.statusBar().showMessage(tr("status.snapshot_error", error=e))
@@ -1574,10 +1918,15 @@ class MainWindow(QMainWindow):
             self.snapshot_path = config.get('snapshot_path', snapshot_path_for(self.recording_path))
             self.event_path = os.path.join(self.recording_path, "events")
             self.detection_config = {**DEFAULT_DETECTION_CONFIG, **config.get('detection', {})}
+            self.recording_config = {**DEFAULT_RECORDING_CONFIG, **config.get('recording', {})}
             self.email_config = {**DEFAULT_EMAIL_CONFIG, **config.get('email', {})}
+            self.retention_config = {**DEFAULT_RETENTION_CONFIG, **config.get('retention', {})}
+            self.stream_config = {**DEFAULT_STREAM_CONFIG, **config.get('stream', {})}
+            shared_reconnect_scheduler().configure(self.stream_config)
             self._sync_detection_config_ui()
             self._sync_email_config_ui()
             self.cameras_per_row = config.get('cameras_per_row', 3)
+            self.video_surface = config.get('video_surface', 'label')
             self._restore_preview_camera_ids = config.get('preview_camera_ids', [])
             self.selected_camera_id = config.get('selected_camera_id')
             self._order_custom = bool(config.get('order_custom', False))
@@ -1609,10 +1958,15 @@ class MainWindow(QMainWindow):
     
     def closeEvent(self, event):
         """Beim Schließen alle Threads sauber beenden"""
-        running_threads = [t for t in self.camera_threads.values() if t.isRunning()]
+        running_threads = [
+            thread for thread in {id(t): t for t in self.camera_threads.values()}.values() if thread.isRunning()
+        ]
         if self.detection_worker is not None:
             self.detection_worker.stop(timeout_ms=3000)
             self.detection_worker = None
+        if self.retention_manager is not None:
+            self.retention_manager.stop(timeout_ms=3000)
+            self.retention_manager = None
         if not running_threads:
             event.accept()
             return
@@ -1630,11 +1984,7 @@ class MainWindow(QMainWindow):
         event.ignore()
 
     def _finish_close_when_streams_stopped(self):
-        self.camera_threads = {
-            camera_id: thread
-            for camera_id, thread in self.camera_threads.items()
-            if thread.isRunning()
-        }
+        self._forget_stopped_camera_threads()
         if self.camera_threads:
             elapsed = time.monotonic() - (self._shutdown_started_at or time.monotonic())
             message = f"Closing app. Please wait...\nStopping camera streams ({elapsed:.1f}s)"
@@ -1669,6 +2019,7 @@ class MainWindow(QMainWindow):
         self.selected_camera_id = camera_id
         self._sync_big_preview_crop_state(camera_id)
         self._apply_detection_visual_state()
+        self._sync_main_stream_demand()
 
         for cid, widget in self.camera_widgets.items():
             if cid == camera_id:
@@ -1874,6 +2225,7 @@ class MainWindow(QMainWindow):
         self._sync_big_preview_crop_state(self._get_active_big_preview_camera_id())
         
         self._rebuild_multi_view_layout()
+        self._sync_main_stream_demand()
         self.save_config()
         
         # Start streams for selected cameras
@@ -0,0 +1,114 @@
+import threading
+import time
+from collections import deque
+
+
+class CaptureMetrics:
+    """Counters and gauges of one camera's capture pipeline.
+
+    Updated by the capture thread for every read, delivery and reconnect;
+    :meth:`snapshot` can be called from any thread (e.g. the GUI). Rates
+    and read-latency percentiles cover the last ``WINDOW_SECONDS``.
+    """
+
+    WINDOW_SECONDS = 5.0
+    _SAMPLES = 512
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reads = deque(maxlen=self._SAMPLES)  # (timestamp, latency)
+        self._emits = deque(maxlen=self._SAMPLES)
+        self.frames_read = 0
+        self.frames_emitted = 0
+        self.failed_reads = 0
+        self.reconnects = 0
+        self.stalls = 0
+        self.buffer_bytes = 0
+        self.last_frame_at = None
+        self.connected_since = None
+        self.stream_info = None  # codec/resolution of the last RTSP probe
+
+    def record_read(self, latency: float, ok: bool, now: float | None = None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if ok:
+                self.frames_read += 1
+                self.last_frame_at = now
+                self._reads.append((now, latency))
+            else:
+                self.failed_reads += 1
+
+    def record_emit(self, now: float | None = None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self.frames_emitted += 1
+            self._emits.append(now)
+
+    def record_connected(self):
+        with self._lock:
+            self.connected_since = time.monotonic()
+            self.last_frame_at = None
+
+    def record_disconnected(self):
+        with self._lock:
+            self.connected_since = None
+
+    def record_reconnect(self):
+        with self._lock:
+            self.reconnects += 1
+
+    def record_probe(self, probe: dict):
+        with self._lock:
+            self.stream_info = {
+                key: probe.get(key) for key in ("codec", "width", "height", "fps", "server", "total_ms")
+            }
+
+    def record_stall(self):
+        with self._lock:
+            self.stalls += 1
+
+    def seconds_since_frame(self, now: float | None = None) -> float | None:
+        last = self.last_frame_at
+        if last is None:
+            return None
+        return (time.monotonic() if now is None else now) - last
+
+    @staticmethod
+    def _percentile(values: list[float], fraction: float) -> float | None:
+        if not values:
+            return None
+        return values[min(len(values) - 1, int(fraction * len(values)))]
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        since = now - self.WINDOW_SECONDS
+        with self._lock:
+            reads = [(ts, latency) for ts, latency in self._reads if ts >= since]
+            emits = [ts for ts in self._emits if ts >= since]
+            counters = {
+                "frames_read": self.frames_read,
+                "frames_emitted": self.frames_emitted,
+                "failed_reads": self.failed_reads,
+                "reconnects": self.reconnects,
+                "stalls": self.stalls,
+                "buffer_bytes": self.buffer_bytes,
+            }
+            connected = self.connected_since is not None
+            stream_info = dict(self.stream_info) if self.stream_info else None
+        window = min(self.WINDOW_SECONDS, max(1.0, now - reads[0][0])) if reads else 0.0
+        latencies = sorted(latency for _ts, latency in reads)
+        return {
+            **counters,
+            "connected": connected,
+            "decoded_fps": len(reads) / window if window > 0 else 0.0,
+            "emitted_fps": len(emits) / self.WINDOW_SECONDS,
+            "read_ms_p50": _ms(self._percentile(latencies, 0.50)),
+            "read_ms_p95": _ms(self._percentile(latencies, 0.95)),
+            "read_ms_p99": _ms(self._percentile(latencies, 0.99)),
+            "seconds_since_frame": self.seconds_since_frame(now),
+            "stream": stream_info,
+        }
+
+
+def _ms(seconds: float | None) -> float | None:
+    return None if seconds is None else seconds * 1000.0
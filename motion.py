@@ -0,0 +1,112 @@
+import time
+
+import cv2
+import numpy as np
+
+
+DEFAULT_MOTION_CONFIG = {
+    "motion_gate": True,
+    # Gray-level difference (0-255) for a pixel to count as changed.
+    "motion_pixel_threshold": 18,
+    # Fraction of the (unmasked) image that must change to run detection.
+    "motion_min_area": 0.003,
+    # Keep analyzing this long after the last motion (stable_frames needs several hits).
+    "motion_hold_seconds": 4.0,
+    "motion_downscale_width": 160,
+}
+
+
+class MotionGate:
+    """Cheap per-camera change detector in front of the object detector.
+
+    Frames are downscaled, converted to blurred grayscale and compared with a
+    slowly adapting background; only frames where enough pixels changed are
+    forwarded. ``masks`` maps camera ids to polygons (normalized 0..1
+    coordinates) whose area is ignored, e.g. swaying branches or a road.
+    """
+
+    def __init__(self, config: dict | None = None, masks: dict | None = None):
+        merged = dict(DEFAULT_MOTION_CONFIG)
+        if config:
+            merged.update({key: value for key, value in config.items() if key in DEFAULT_MOTION_CONFIG})
+        self.enabled = bool(merged["motion_gate"])
+        self.pixel_threshold = max(1, min(255, int(merged["motion_pixel_threshold"])))
+        self.min_area = max(0.0, float(merged["motion_min_area"]))
+        self.hold_seconds = max(0.0, float(merged["motion_hold_seconds"]))
+        self.width = max(32, int(merged["motion_downscale_width"]))
+        self._polygons = {int(camera_id): polygons for camera_id, polygons in (masks or {}).items() if polygons}
+        self._background: dict[int, np.ndarray] = {}
+        self._masks: dict[int, np.ndarray] = {}
+        self._last_motion: dict[int, float] = {}
+        self.passed = 0
+        self.skipped = 0
+
+    def _prepare(self, frame):
+        height, width = frame.shape[:2]
+        small_height = max(1, int(round(height * self.width / float(width))))
+        small = cv2.resize(frame, (self.width, small_height), interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(small, (5, 5), 0)
+
+    def _mask_for(self, camera_id: int, shape) -> np.ndarray | None:
+        polygons = self._polygons.get(camera_id)
+        if not polygons:
+            return None
+        mask = self._masks.get(camera_id)
+        if mask is not None and mask.shape == shape:
+            return mask
+        height, width = shape
+        mask = np.full(shape, 255, dtype=np.uint8)
+        for polygon in polygons:
+            try:
+                points = np.array(
+                    [[float(x) * (width - 1), float(y) * (height - 1)] for x, y in polygon],
+                    dtype=np.float32,
+                ).round().astype(np.int32)
+            except Exception:
+                continue
+            if len(points) >= 3:
+                cv2.fillPoly(mask, [points], 0)
+        self._masks[camera_id] = mask
+        return mask
+
+    def check(self, camera_id: int, frame, now: float | None = None) -> bool:
+        """Return True if the frame should go to the detector."""
+        if not self.enabled:
+            return True
+        now = time.monotonic() if now is None else now
+        camera_id = int(camera_id)
+        gray = self._prepare(frame)
+        background = self._background.get(camera_id)
+        if background is None or background.shape != gray.shape:
+            # First frame (or resolution change): analyze it and start the background.
+            self._background[camera_id] = gray.astype(np.float32)
+            self._last_motion[camera_id] = now
+            self.passed += 1
+            return True
+
+        diff = cv2.absdiff(gray, cv2.convertScaleAbs(background))
+        _ret, changed = cv2.threshold(diff, self.pixel_threshold, 255, cv2.THRESH_BINARY)
+        mask = self._mask_for(camera_id, gray.shape)
+        if mask is not None:
+            changed = cv2.bitwise_and(changed, mask)
+            area = max(1, cv2.countNonZero(mask))
+        else:
+            area = changed.size
+        ratio = cv2.countNonZero(changed) / float(area)
+        # Adapt slowly so lighting changes fade into the background.
+        cv2.accumulateWeighted(gray, background, 0.05)
+
+        if ratio >= self.min_area:
+            self._last_motion[camera_id] = now
+        if now - self._last_motion.get(camera_id, 0.0) <= self.hold_seconds:
+            self.passed += 1
+            return True
+        self.skipped += 1
+        return False
+
+    def forget(self, camera_id: int):
+        camera_id = int(camera_id)
+        self._background.pop(camera_id, None)
+        self._last_motion.pop(camera_id, None)
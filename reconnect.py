@@ -0,0 +1,163 @@
+import asyncio
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from camera_utils import rtsp_answers
+
+
+DEFAULT_MAX_CONCURRENT_OPENS = 4
+DEFAULT_RECONNECT_MAX_SECONDS = 30.0
+
+
+class ReconnectScheduler:
+    """Reconnect pacing shared by all CameraThreads.
+
+    * exponential backoff per camera (``base * 2**(failures-1)``, capped) with
+      random jitter, so cameras that dropped together do not retry in lockstep;
+    * at most ``max_concurrent_opens`` RTSP opens at a time across all
+      cameras (ReolinkProxy and small switches choke on bursts of opens);
+    * while a camera waits, its host:port gets an RTSP OPTIONS probe from
+      one background event loop and the wait ends early when the probe
+      flips from down to up (e.g. the switch or the proxy is back and its
+      RTSP server answers, not merely accepts connections).
+    """
+
+    JITTER = 0.3
+    PROBE_INTERVAL = 1.0
+    PROBE_TIMEOUT = 0.5
+
+    def __init__(self, max_concurrent_opens: int = DEFAULT_MAX_CONCURRENT_OPENS,
+                 max_delay: float = DEFAULT_RECONNECT_MAX_SECONDS, rng: random.Random | None = None):
+        self.max_concurrent_opens = max(1, int(max_concurrent_opens))
+        self.max_delay = max(1.0, float(max_delay))
+        self._rng = rng or random.Random()
+        self._open_cond = threading.Condition()
+        self._opening = 0
+        self._shared_slots = None
+        self._lock = threading.Lock()
+        self._watch: dict[tuple[str, int], dict] = {}
+        self._loop = None
+        self._thread = None
+        self.opens_waited = 0
+        self.early_retries = 0
+
+    def configure(self, stream_config: dict | None):
+        config = stream_config or {}
+        try:
+            self.max_concurrent_opens = max(1, int(config.get("max_concurrent_opens", self.max_concurrent_opens)))
+            self.max_delay = max(1.0, float(config.get("reconnect_max_seconds", self.max_delay)))
+        except (TypeError, ValueError):
+            pass
+        with self._open_cond:
+            self._open_cond.notify_all()
+
+    def share_open_slots(self, semaphore):
+        """Also hold ``semaphore`` during opens (limit across capture worker processes)."""
+        self._shared_slots = semaphore
+
+    def next_delay(self, failures: int, base: float) -> float:
+        """Backoff before retry number ``failures`` (1 = first retry)."""
+        exponent = min(max(0, int(failures) - 1), 16)
+        delay = min(self.max_delay, max(0.1, float(base)) * (2 ** exponent))
+        return delay * self._rng.uniform(1.0 - self.JITTER, 1.0 + self.JITTER)
+
+    @contextmanager
+    def open_slot(self, should_continue):
+        """Hold one of the global open slots; yields False if ``should_continue`` turned false first."""
+        acquired = False
+        with self._open_cond:
+            waited = False
+            while should_continue() and self._opening >= self.max_concurrent_opens:
+                waited = True
+                self._open_cond.wait(0.1)
+            if should_continue():
+                self._opening += 1
+                acquired = True
+                if waited:
+                    self.opens_waited += 1
+        shared = self._shared_slots if acquired else None
+        shared_held = False
+        if shared is not None:
+            while should_continue() and not shared_held:
+                shared_held = shared.acquire(timeout=0.1)
+        try:
+            yield acquired and (shared is None or shared_held)
+        finally:
+            if shared_held:
+                shared.release()
+            if acquired:
+                with self._open_cond:
+                    self._opening -= 1
+                    self._open_cond.notify()
+
+    def wait(self, host: str | None, port: int, delay: float, should_continue) -> bool:
+        """Sleep up to ``delay`` seconds; returns True if it ended early because host:port came up."""
+        deadline = time.monotonic() + max(0.0, delay)
+        if not host:
+            while should_continue() and time.monotonic() < deadline:
+                time.sleep(0.1)
+            return False
+
+        event = threading.Event()
+        key = (host, int(port or 554))
+        with self._lock:
+            entry = self._watch.setdefault(key, {"waiters": set(), "up": None})
+            entry["waiters"].add(event)
+            self._ensure_loop()
+        try:
+            while should_continue():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                if event.wait(min(0.1, remaining)):
+                    with self._lock:
+                        self.early_retries += 1
+                    return True
+            return False
+        finally:
+            with self._lock:
+                entry["waiters"].discard(event)
+                if not entry["waiters"]:
+                    self._watch.pop(key, None)
+
+    def _ensure_loop(self):
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._run_loop, daemon=True, name="ReconnectProbe")
+            self._thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_until_complete(self._probe_forever())
+
+    async def _probe_forever(self):
+        while True:
+            with self._lock:
+                keys = list(self._watch)
+            if keys:
+                results = await asyncio.gather(*(rtsp_answers(host, port, self.PROBE_TIMEOUT) for host, port in keys))
+                with self._lock:
+                    for key, is_up in zip(keys, results):
+                        entry = self._watch.get(key)
+                        if entry is None:
+                            continue
+                        if is_up and entry["up"] is False:
+                            for event in entry["waiters"]:
+                                event.set()
+                        entry["up"] = is_up
+            await asyncio.sleep(self.PROBE_INTERVAL)
+
+
+_shared_scheduler = None
+_shared_lock = threading.Lock()
+
+
+def shared_reconnect_scheduler() -> ReconnectScheduler:
+    """Process-wide scheduler used by all CameraThreads."""
+    global _shared_scheduler
+    with _shared_lock:
+        if _shared_scheduler is None:
+            _shared_scheduler = ReconnectScheduler()
+        return _shared_scheduler
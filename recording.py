@@ -0,0 +1,663 @@
+import bisect
+import json
+import os
+import queue
+import shutil
+import subprocess
+import threading
+import time
+from collections import deque
+
+import cv2
+
+
+DEFAULT_RECORDING_CONFIG = {
+    # "auto" remuxes with ffmpeg when available, "opencv" re-encodes to MJPG/AVI.
+    "engine": "auto",
+    "container": "mkv",
+    "ffmpeg_path": "ffmpeg",
+    # Continuous recordings roll over into files of this length (0 = one file).
+    "segment_seconds": 60,
+    # "jpeg" stores pre-event frames compressed, "raw" keeps full BGR copies.
+    "pre_event_buffer_mode": "jpeg",
+    "pre_event_buffer_mb": 96,
+    "pre_event_buffer_fps": 12.0,
+    "pre_event_jpeg_quality": 80,
+    # Live frames waiting for the event clip writer; more are dropped.
+    "clip_writer_queue": 48,
+}
+
+
+def find_ffmpeg(ffmpeg_path: str | None = "ffmpeg") -> str | None:
+    candidate = str(ffmpeg_path or "ffmpeg").strip()
+    found = shutil.which(candidate)
+    if found:
+        return found
+    expanded = os.path.expanduser(candidate)
+    if os.path.isfile(expanded) and os.access(expanded, os.X_OK):
+        return expanded
+    return None
+
+
+def find_ffprobe(ffmpeg_path: str | None = "ffmpeg") -> str | None:
+    """Locate ffprobe, preferring the one installed next to ffmpeg."""
+    ffmpeg = find_ffmpeg(ffmpeg_path)
+    if ffmpeg:
+        directory, name = os.path.split(ffmpeg)
+        sibling = os.path.join(directory, name.replace("ffmpeg", "ffprobe"))
+        if sibling != ffmpeg and os.path.isfile(sibling) and os.access(sibling, os.X_OK):
+            return sibling
+    return shutil.which("ffprobe")
+
+
+def resolve_recording_engine(config: dict | None) -> str:
+    """Return "passthrough" or "opencv" for the given recording config."""
+    merged = dict(DEFAULT_RECORDING_CONFIG)
+    if config:
+        merged.update(config)
+    engine = str(merged.get("engine", "auto")).strip().lower()
+    if engine == "opencv":
+        return "opencv"
+    if find_ffmpeg(merged.get("ffmpeg_path")):
+        return "passthrough"
+    return "opencv"
+
+
+class PassthroughRecorder:
+    """Remux the camera's H.264/H.265 packets to MKV/MP4 without re-encoding.
+
+    ffmpeg opens its own RTSP session and copies the packets (``-c copy``), so
+    recording costs almost no CPU compared to decoding and MJPG re-encoding.
+
+    With ``segment_seconds`` > 0 ffmpeg's segment muxer starts a new file at
+    the first keyframe after each interval. Every finished file is reported
+    to ``on_segment(filename, start_wall, end_wall)``.
+    """
+
+    def __init__(
+        self,
+        rtsp_url: str,
+        filename: str,
+        ffmpeg_path: str = "ffmpeg",
+        container: str = "mkv",
+        segment_seconds: float = 0.0,
+        on_segment=None,
+    ):
+        self.rtsp_url = rtsp_url
+        self.filename = filename
+        self.ffmpeg_path = ffmpeg_path
+        self.container = "mp4" if str(container).lower() == "mp4" else "mkv"
+        self.segment_seconds = max(0.0, float(segment_seconds or 0.0))
+        self.on_segment = on_segment
+        self.process = None
+        self.started_wall = 0.0
+        self._segment_list = None
+        self._watcher = None
+
+    def _output_args(self) -> tuple[list[str], str, str]:
+        """Return (codec args, muxer name, movflags) for the container."""
+        if self.container == "mp4":
+            # Fragmented MP4 stays playable if ffmpeg is killed; the camera's
+            # audio codec (often PCM/G.711) is not always allowed in MP4.
+            return ["-an", "-c", "copy"], "mp4", "+frag_keyframe+empty_moov+default_base_moof"
+        return ["-map", "0:a:0?", "-c", "copy"], "matroska", ""
+
+    def _command(self) -> list[str]:
+        command = [
+            self.ffmpeg_path,
+            "-hide_banner",
+            "-loglevel", "error",
+            "-rtsp_transport", "tcp",
+            "-fflags", "+genpts",
+            "-i", self.rtsp_url,
+            "-map", "0:v:0",
+        ]
+        codec_args, muxer, movflags = self._output_args()
+        command += codec_args
+        if self.segment_seconds > 0:
+            command += [
+                "-f", "segment",
+                "-segment_time", f"{self.segment_seconds:g}",
+                "-segment_format", muxer,
+                "-reset_timestamps", "1",
+                "-strftime", "1",
+                "-segment_list", self._segment_list,
+                "-segment_list_type", "csv",
+                "-segment_list_flags", "+live",
+            ]
+            if movflags:
+                command += ["-segment_format_options", f"movflags={movflags}"]
+        else:
+            if movflags:
+                command += ["-movflags", movflags]
+            command += ["-f", muxer]
+        command += ["-y", self.filename]
+        return command
+
+    def start(self) -> bool:
+        if self.segment_seconds > 0:
+            # The output name is a strftime pattern; keep the list name literal.
+            self._segment_list = os.path.join(
+                os.path.dirname(self.filename), f".segments_{os.getpid()}_{int(time.time() * 1000)}.csv"
+            )
+        self.started_wall = time.time()
+        try:
+            self.process = subprocess.Popen(
+                self._command(),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        except Exception:
+            self.process = None
+            return False
+        if self.on_segment is not None:
+            self._watcher = threading.Thread(
+                target=self._watch_segments,
+                args=(self.process,),
+                daemon=True,
+                name=f"SegmentWatcher-{os.path.basename(self.filename)}",
+            )
+            self._watcher.start()
+        return True
+
+    def _watch_segments(self, process):
+        """Report finished files; in segment mode by tailing ffmpeg's CSV list."""
+        if not self._segment_list:
+            process.wait()
+            self._report(self.filename, self.started_wall, time.time())
+            return
+
+        directory = os.path.dirname(self.filename)
+        offset = 0
+        while True:
+            finished = process.poll() is not None
+            try:
+                with open(self._segment_list, "r", encoding="utf-8") as f:
+                    f.seek(offset)
+                    while True:
+                        line = f.readline()
+                        if not line.endswith("\n"):
+                            break
+                        offset += len(line.encode("utf-8"))
+                        parts = line.strip().rsplit(",", 2)
+                        if len(parts) != 3:
+                            continue
+                        name, start, end = parts
+                        try:
+                            start_wall = self.started_wall + float(start)
+                            end_wall = self.started_wall + float(end)
+                        except ValueError:
+                            continue
+                        self._report(os.path.join(directory, os.path.basename(name)), start_wall, end_wall)
+            except OSError:
+                pass
+            if finished:
+                break
+            time.sleep(1.0)
+        try:
+            os.remove(self._segment_list)
+        except OSError:
+            pass
+
+    def _report(self, filename: str, start_wall: float, end_wall: float):
+        if not os.path.isfile(filename):
+            return
+        try:
+            self.on_segment(filename, start_wall, end_wall)
+        except Exception:
+            pass
+
+    def is_running(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def stop(self, wait: bool = False, timeout: float = 5.0):
+        """Ask ffmpeg to finish the file ("q" on stdin) and kill it on timeout."""
+        process = self.process
+        watcher = self._watcher
+        self.process = None
+        if process is None:
+            return
+        try:
+            if process.stdin:
+                process.stdin.write(b"q")
+                process.stdin.close()
+        except Exception:
+            pass
+
+        def finish():
+            try:
+                process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                process.terminate()
+                try:
+                    process.wait(timeout=2.0)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+            except Exception:
+                pass
+            if watcher is not None:
+                watcher.join(timeout=3.0)
+
+        if wait:
+            finish()
+        else:
+            threading.Thread(target=finish, daemon=True).start()
+
+
+class PreEventBuffer:
+    """Rolling frame buffer for event clips with a per-camera byte budget.
+
+    In ``jpeg`` mode frames are kept JPEG-compressed, which needs roughly a
+    tenth of the memory of raw BGR copies. Frames are dropped oldest-first
+    when they are older than ``seconds`` or the byte budget is exceeded.
+    """
+
+    def __init__(
+        self,
+        seconds: float = 12.0,
+        mode: str = "jpeg",
+        max_bytes: int = 96 * 1024 * 1024,
+        max_fps: float = 0.0,
+        jpeg_quality: int = 80,
+    ):
+        self.seconds = max(0.0, float(seconds))
+        self.mode = "raw" if str(mode).strip().lower() == "raw" else "jpeg"
+        self.max_bytes = max(1, int(max_bytes))
+        self.min_interval = 1.0 / float(max_fps) if max_fps and float(max_fps) > 0 else 0.0
+        self.jpeg_quality = min(100, max(10, int(jpeg_quality)))
+        self._lock = threading.Lock()
+        self._items = deque()  # (timestamp, payload, nbytes)
+        self._bytes = 0
+        self._last_append = 0.0
+
+    @classmethod
+    def from_config(cls, config: dict | None, seconds: float = 12.0) -> "PreEventBuffer":
+        merged = dict(DEFAULT_RECORDING_CONFIG)
+        if config:
+            merged.update(config)
+        return cls(
+            seconds=seconds,
+            mode=merged.get("pre_event_buffer_mode", "jpeg"),
+            max_bytes=int(float(merged.get("pre_event_buffer_mb", 96)) * 1024 * 1024),
+            max_fps=float(merged.get("pre_event_buffer_fps", 0.0) or 0.0),
+            jpeg_quality=int(merged.get("pre_event_jpeg_quality", 80)),
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def wants_frame(self, timestamp: float | None = None) -> bool:
+        """True if :meth:`append` would store a frame now (pre_event_buffer_fps)."""
+        if not self.min_interval:
+            return True
+        now = time.monotonic() if timestamp is None else float(timestamp)
+        return now - self._last_append >= self.min_interval
+
+    def append(self, frame, timestamp: float | None = None) -> bool:
+        now = time.monotonic() if timestamp is None else float(timestamp)
+        if self.min_interval and now - self._last_append < self.min_interval:
+            return False
+        self._last_append = now
+
+        if self.mode == "jpeg":
+            ok, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+            if not ok:
+                return False
+            payload = encoded
+        elif frame.flags.writeable:
+            payload = frame.copy()
+        else:
+            # Read-only frames from the capture pool are immutable; keep a reference.
+            payload = frame
+        nbytes = int(payload.nbytes)
+
+        with self._lock:
+            self._items.append((now, payload, nbytes))
+            self._bytes += nbytes
+            cutoff = now - self.seconds
+            # Always keep the newest frame, even if it alone exceeds the budget.
+            while len(self._items) > 1 and (self._items[0][0] < cutoff or self._bytes > self.max_bytes):
+                _ts, _payload, dropped = self._items.popleft()
+                self._bytes -= dropped
+        return True
+
+    def items_since(self, since: float) -> list[tuple[float, object]]:
+        """Return the stored (timestamp, payload) pairs without decoding them."""
+        with self._lock:
+            return [(ts, payload) for ts, payload, _nbytes in self._items if ts >= since]
+
+    def decode(self, payload):
+        if self.mode == "jpeg":
+            return cv2.imdecode(payload, cv2.IMREAD_COLOR)
+        return payload
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+
+class ClipWriter(threading.Thread):
+    """Writes one event clip (pre-event backlog plus live frames) on its own thread.
+
+    The capture loop only calls :meth:`submit`, which never blocks: when the
+    queue is full the frame is dropped instead of stalling the stream.
+    """
+
+    def __init__(
+        self,
+        writer,
+        filename: str,
+        fps: float,
+        size: tuple[int, int],
+        backlog: list[tuple[float, object]],
+        decode,
+        backlog_end: float,
+        started_at: float,
+        until: float,
+        queue_size: int = 48,
+        on_closed=None,
+    ):
+        super().__init__(daemon=True, name=f"ClipWriter-{os.path.basename(filename)}")
+        self._writer = writer
+        self.filename = filename
+        self.fps = float(fps)
+        self.size = size
+        self._backlog = backlog
+        self._backlog_end = backlog_end
+        self._decode = decode
+        self._queue = queue.Queue(maxsize=max(1, int(queue_size)))
+        self._closing = threading.Event()
+        self.started_at = started_at
+        self.until = until
+        self.dropped_frames = 0
+        self.on_closed = on_closed
+
+    def submit(self, frame) -> bool:
+        if self._closing.is_set():
+            return False
+        try:
+            self._queue.put_nowait(frame)
+            return True
+        except queue.Full:
+            self.dropped_frames += 1
+            return False
+
+    def extend(self, now: float, post_seconds: float, max_seconds: float):
+        max_until = self.started_at + max_seconds
+        self.until = min(max_until, max(self.until, now + post_seconds))
+
+    def close(self):
+        self._closing.set()
+
+    def _write(self, frame, repeats: int = 1):
+        width, height = self.size
+        if frame.shape[1] != width or frame.shape[0] != height:
+            frame = cv2.resize(frame, (width, height))
+        for _ in range(repeats):
+            self._writer.write(frame)
+
+    def _write_backlog(self):
+        # The buffer may be thinned out (pre_event_buffer_fps), so repeat
+        # frames to keep the pre-event part in real time.
+        for index, (frame_time, payload) in enumerate(self._backlog):
+            next_time = self._backlog[index + 1][0] if index + 1 < len(self._backlog) else self._backlog_end
+            frame = self._decode(payload)
+            if frame is None:
+                continue
+            self._write(frame, max(1, int(round((next_time - frame_time) * self.fps))))
+        self._backlog = []
+
+    def run(self):
+        try:
+            self._write_backlog()
+            while True:
+                try:
+                    frame = self._queue.get(timeout=0.2)
+                except queue.Empty:
+                    if self._closing.is_set():
+                        break
+                    continue
+                self._write(frame)
+        except Exception:
+            pass
+        finally:
+            try:
+                self._writer.release()
+            except Exception:
+                pass
+            if self.on_closed is not None:
+                try:
+                    self.on_closed(self.filename)
+                except Exception:
+                    pass
+
+
+def probe_keyframes(filename: str, ffprobe_path: str | None) -> list[dict]:
+    """Return [{"t": seconds, "pos": byte_offset}] for the video keyframes of a file."""
+    if not ffprobe_path:
+        return []
+    try:
+        result = subprocess.run(
+            [
+                ffprobe_path,
+                "-v", "error",
+                "-select_streams", "v:0",
+                "-show_entries", "packet=pts_time,pos,flags",
+                "-of", "json",
+                filename,
+            ],
+            capture_output=True,
+            timeout=60,
+        )
+        packets = json.loads(result.stdout.decode("utf-8", errors="replace") or "{}").get("packets", [])
+    except Exception:
+        return []
+
+    keyframes = []
+    for packet in packets:
+        if "K" not in str(packet.get("flags", "")):
+            continue
+        try:
+            t = round(float(packet["pts_time"]), 3)
+            pos = int(packet.get("pos", -1))
+        except (KeyError, TypeError, ValueError):
+            continue
+        keyframes.append({"t": t, "pos": pos})
+    keyframes.sort(key=lambda k: k["t"])
+    return keyframes
+
+
+def segment_index_path(recording_path: str, camera_id) -> str:
+    return os.path.join(recording_path, "index", f"camera_{camera_id}.jsonl")
+
+
+_index_locks: dict[str, threading.Lock] = {}
+_index_locks_guard = threading.Lock()
+
+
+def _segment_index_lock(path: str) -> threading.Lock:
+    """One lock per index file, shared by writers and compaction."""
+    with _index_locks_guard:
+        return _index_locks.setdefault(os.path.abspath(path), threading.Lock())
+
+
+def compact_segment_index(recording_path: str, camera_id) -> int:
+    """Rewrite a camera's segment index without entries whose file is gone.
+
+    Called when a SegmentIndex is opened and by retention after it deleted
+    recordings. Returns the number of dropped lines.
+    """
+    path = segment_index_path(recording_path, camera_id)
+    directory = os.path.dirname(os.path.dirname(path))
+    with _segment_index_lock(path):
+        kept = []
+        dropped = 0
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        dropped += 1
+                        continue
+                    if os.path.isfile(os.path.join(directory, str(entry.get("file", "")))):
+                        kept.append(line if line.endswith("\n") else line + "\n")
+                    else:
+                        dropped += 1
+        except OSError:
+            return 0
+        if not dropped:
+            return 0
+        temp_path = path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.writelines(kept)
+            os.replace(temp_path, path)
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return 0
+        return dropped
+
+
+class SegmentIndex:
+    """Append-only per-camera index of recorded segments (JSON lines).
+
+    One line per finished file: start/end wall-clock time, size in bytes and
+    keyframe offsets, so playback/export can seek without scanning the files.
+    Probing and writing happen on a background thread, which first compacts
+    the file once so entries of deleted recordings do not pile up.
+    """
+
+    def __init__(self, recording_path: str, camera_id, ffprobe_path: str | None = None):
+        self.path = segment_index_path(recording_path, camera_id)
+        self.camera_id = camera_id
+        self.ffprobe_path = ffprobe_path
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._compacted = False
+
+    def add(self, filename: str, start_wall: float, end_wall: float, intra_only: bool = False, fps: float = 0.0):
+        """Queue a closed file for indexing. MJPG files set ``intra_only``."""
+        self._queue.put((filename, float(start_wall), float(end_wall), bool(intra_only), float(fps or 0.0)))
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, daemon=True, name=f"SegmentIndex-{self.camera_id}"
+                )
+                self._thread.start()
+
+    def _run(self):
+        if not self._compacted:
+            self._compacted = True
+            try:
+                compact_segment_index(os.path.dirname(os.path.dirname(self.path)), self.camera_id)
+            except Exception:
+                pass
+        while True:
+            try:
+                item = self._queue.get(timeout=5.0)
+            except queue.Empty:
+                with self._lock:
+                    if self._queue.empty():
+                        self._thread = None
+                        return
+                continue
+            try:
+                self._write_entry(*item)
+            except Exception:
+                pass
+            finally:
+                self._queue.task_done()
+
+    def _write_entry(self, filename, start_wall, end_wall, intra_only, fps):
+        try:
+            size = os.path.getsize(filename)
+        except OSError:
+            return
+        entry = {
+            "file": os.path.basename(filename),
+            "camera_id": self.camera_id,
+            "start": round(start_wall, 3),
+            "end": round(max(start_wall, end_wall), 3),
+            "bytes": size,
+        }
+        if intra_only:
+            # Every MJPG frame is a keyframe; seek by frame number instead.
+            entry["intra_only"] = True
+            entry["fps"] = fps
+        else:
+            entry["keyframes"] = probe_keyframes(filename, self.ffprobe_path)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with _segment_index_lock(self.path):
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    def flush(self, timeout: float = 10.0):
+        """Wait until queued entries are written (best effort)."""
+        end = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < end:
+            time.sleep(0.05)
+
+
+def load_segment_index(recording_path: str, camera_id) -> list[dict]:
+    """Read a camera's segment index, sorted by start time.
+
+    Entries whose file is gone (e.g. removed by retention) and a truncated
+    last line after a crash are skipped.
+    """
+    path = segment_index_path(recording_path, camera_id)
+    directory = os.path.dirname(os.path.dirname(path))
+    entries = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if os.path.isfile(os.path.join(directory, str(entry.get("file", "")))):
+                    entries.append(entry)
+    except OSError:
+        return []
+    entries.sort(key=lambda e: e.get("start", 0.0))
+    return entries
+
+
+def find_segment(entries: list[dict], wall_time: float) -> tuple[dict | None, float]:
+    """Return (entry, offset_seconds) of the segment covering ``wall_time``.
+
+    Falls back to the next segment after a gap; (None, 0.0) past the end.
+    """
+    starts = [e.get("start", 0.0) for e in entries]
+    index = bisect.bisect_right(starts, wall_time) - 1
+    if index >= 0 and wall_time <= entries[index].get("end", 0.0):
+        return entries[index], wall_time - entries[index]["start"]
+    if index + 1 < len(entries):
+        return entries[index + 1], 0.0
+    return None, 0.0
+
+
+def seek_keyframe(entry: dict, offset: float) -> dict:
+    """Return the last keyframe at or before ``offset`` seconds into a segment.
+
+    The result has ``t`` (seconds) and either ``pos`` (byte offset, -1 if
+    unknown) or ``frame`` (frame number for intra-only MJPG files).
+    """
+    offset = max(0.0, float(offset))
+    if entry.get("intra_only"):
+        fps = float(entry.get("fps") or 25.0)
+        frame = int(offset * fps)
+        return {"t": frame / fps, "frame": frame}
+    keyframes = entry.get("keyframes") or []
+    times = [k["t"] for k in keyframes]
+    index = bisect.bisect_right(times, offset) - 1
+    if index < 0:
+        return {"t": 0.0, "pos": -1}
+    return dict(keyframes[index])
@@ -0,0 +1,284 @@
+import heapq
+import os
+import queue
+import re
+import shutil
+import time
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from i18n import tr
+from recording import compact_segment_index
+
+
+DEFAULT_RETENTION_CONFIG = {
+    # Off by default: the manager deletes files below recording_path.
+    "enabled": False,
+    # 0 disables a limit. Events/snapshots are kept longer than continuous recordings.
+    "recordings_max_gb": 0.0,
+    "recordings_max_days": 14.0,
+    "events_max_gb": 0.0,
+    "events_max_days": 60.0,
+    "snapshots_max_gb": 0.0,
+    "snapshots_max_days": 60.0,
+    # Global limits; continuous recordings are deleted first, events last.
+    "max_total_gb": 0.0,
+    "min_free_gb": 5.0,
+    "check_interval_seconds": 60,
+    # Full rescan to pick up files changed outside the app (0 = only at start).
+    "rescan_hours": 24.0,
+}
+
+RETENTION_CATEGORIES = ("recordings", "snapshots", "events")
+MEDIA_EXTENSIONS = (".avi", ".mkv", ".mp4", ".jpg", ".jpeg", ".png")
+# Files younger than this are assumed to be still written when scanning.
+_ACTIVE_FILE_SECONDS = 120.0
+_GB = 1024 ** 3
+# Continuous recordings are named camera_<id>_<YYYYmmdd>_<HHMMSS>.<ext>.
+_RECORDING_NAME = re.compile(r"^camera_(.+)_\d{8}_\d{6}\.\w+$")
+
+
+def recording_camera_id(path: str) -> str | None:
+    """Camera id of a continuous-recording file name (or None)."""
+    match = _RECORDING_NAME.match(os.path.basename(path))
+    return match.group(1) if match else None
+
+
+def classify_media_file(recording_path: str, path: str) -> str | None:
+    """Return the retention category of a file below recording_path (or None)."""
+    if not path.lower().endswith(MEDIA_EXTENSIONS):
+        return None
+    try:
+        relative = os.path.relpath(os.path.abspath(path), os.path.abspath(recording_path))
+    except ValueError:
+        return None
+    parts = relative.split(os.sep)
+    if parts[0] == os.pardir:
+        return None
+    if len(parts) == 1:
+        return "recordings"
+    if parts[0] in ("events", "snapshots") and len(parts) == 2:
+        return parts[0]
+    # models/, index/ and anything else is never pruned; index/ is compacted
+    # when recordings are deleted and counted toward the recordings quota.
+    return None
+
+
+class _CategoryIndex:
+    """Files of one category as a min-heap by mtime plus running byte total."""
+
+    def __init__(self):
+        self.files: dict[str, tuple[float, int]] = {}
+        self.heap: list[tuple[float, str]] = []
+        self.total_bytes = 0
+
+    def add(self, path: str, mtime: float, size: int):
+        self.discard(path)
+        self.files[path] = (mtime, size)
+        self.total_bytes += size
+        heapq.heappush(self.heap, (mtime, path))
+
+    def discard(self, path: str):
+        entry = self.files.pop(path, None)
+        if entry is not None:
+            # The heap entry is dropped lazily in oldest().
+            self.total_bytes -= entry[1]
+
+    def oldest(self) -> tuple[str, float, int] | None:
+        while self.heap:
+            mtime, path = self.heap[0]
+            entry = self.files.get(path)
+            if entry is None or entry[0] != mtime:
+                heapq.heappop(self.heap)
+                continue
+            return path, entry[0], entry[1]
+        return None
+
+
+class RetentionManager(QThread):
+    """Background disk-quota enforcement for recordings, events and snapshots.
+
+    The directory tree is scanned once (and every ``rescan_hours``); new files
+    are added via :meth:`note_file` when their writer closes them, so quotas
+    are checked against an in-memory index instead of walking the disk.
+    Deleted recordings are dropped from their camera's segment index.
+    """
+
+    pruned = pyqtSignal(int, object)
+    status = pyqtSignal(str)
+
+    def __init__(self, recording_path: str, config: dict | None = None, parent=None):
+        super().__init__(parent)
+        merged = dict(DEFAULT_RETENTION_CONFIG)
+        if config:
+            merged.update(config)
+        self.config = merged
+        self.recording_path = recording_path
+        self._running = False
+        self._notes = queue.Queue()
+        self._index = {category: _CategoryIndex() for category in RETENTION_CATEGORIES}
+        self._last_scan = 0.0
+
+    def note_file(self, path: str):
+        """Register a finished file. Safe to call from any thread."""
+        if path:
+            self._notes.put(str(path))
+
+    def stop(self, timeout_ms: int = 3000) -> bool:
+        self._running = False
+        self._notes.put(None)
+        if self.isRunning():
+            return bool(self.wait(timeout_ms))
+        return True
+
+    def run(self):
+        self._running = True
+        interval = max(5.0, float(self.config.get("check_interval_seconds", 60) or 60))
+        rescan_seconds = max(0.0, float(self.config.get("rescan_hours", 0) or 0)) * 3600.0
+        next_check = 0.0
+        while self._running:
+            now = time.monotonic()
+            if not self._last_scan or (rescan_seconds and now - self._last_scan >= rescan_seconds):
+                self._scan()
+                next_check = 0.0
+            if time.monotonic() >= next_check:
+                try:
+                    self._enforce()
+                except Exception as exc:
+                    self.status.emit(tr("retention.error", error=str(exc)))
+                next_check = time.monotonic() + interval
+            try:
+                path = self._notes.get(timeout=max(0.1, min(1.0, next_check - time.monotonic())))
+            except queue.Empty:
+                continue
+            while path is not None:
+                self._add_path(path)
+                try:
+                    path = self._notes.get_nowait()
+                except queue.Empty:
+                    break
+
+    def _add_path(self, path: str) -> bool:
+        category = classify_media_file(self.recording_path, path)
+        if category is None:
+            return False
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        self._index[category].add(path, stat.st_mtime, stat.st_size)
+        return True
+
+    def _scan(self):
+        previous = self._index
+        self._index = {category: _CategoryIndex() for category in RETENTION_CATEGORIES}
+        cutoff = time.time() - _ACTIVE_FILE_SECONDS
+        for directory in (self.recording_path, os.path.join(self.recording_path, "events"),
+                          os.path.join(self.recording_path, "snapshots")):
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                if not self._running:
+                    return
+                try:
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                    stat = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                category = classify_media_file(self.recording_path, entry.path)
+                if category is None:
+                    continue
+                if stat.st_mtime > cutoff and entry.path not in previous[category].files:
+                    # Probably still being written; it is noted when closed.
+                    continue
+                self._index[category].add(entry.path, stat.st_mtime, stat.st_size)
+        self._last_scan = time.monotonic()
+
+    def _limit_bytes(self, key: str) -> int:
+        try:
+            return int(max(0.0, float(self.config.get(key, 0) or 0)) * _GB)
+        except (TypeError, ValueError):
+            return 0
+
+    def _segment_index_bytes(self) -> int:
+        total = 0
+        try:
+            entries = list(os.scandir(os.path.join(self.recording_path, "index")))
+        except OSError:
+            return 0
+        for entry in entries:
+            try:
+                if entry.is_file(follow_symlinks=False):
+                    total += entry.stat(follow_symlinks=False).st_size
+            except OSError:
+                continue
+        return total
+
+    def _enforce(self):
+        deleted_files = 0
+        deleted_bytes = 0
+        deleted_cameras = set()
+        now = time.time()
+        # The segment index belongs to the recordings but is never deleted.
+        index_bytes = self._segment_index_bytes()
+
+        def delete_oldest(category: str) -> bool:
+            nonlocal deleted_files, deleted_bytes
+            oldest = self._index[category].oldest()
+            if oldest is None:
+                return False
+            path, _mtime, size = oldest
+            self._index[category].discard(path)
+            try:
+                os.remove(path)
+            except OSError:
+                return True
+            deleted_files += 1
+            deleted_bytes += size
+            if category == "recordings":
+                camera_id = recording_camera_id(path)
+                if camera_id is not None:
+                    deleted_cameras.add(camera_id)
+            return True
+
+        for category in RETENTION_CATEGORIES:
+            index = self._index[category]
+            max_days = float(self.config.get(f"{category}_max_days", 0) or 0)
+            if max_days > 0:
+                cutoff = now - max_days * 86400.0
+                while self._running:
+                    oldest = index.oldest()
+                    if oldest is None or oldest[1] >= cutoff:
+                        break
+                    delete_oldest(category)
+            max_bytes = self._limit_bytes(f"{category}_max_gb")
+            extra_bytes = index_bytes if category == "recordings" else 0
+            while self._running and max_bytes and index.total_bytes + extra_bytes > max_bytes:
+                if not delete_oldest(category):
+                    break
+
+        # Global limits: free space from continuous recordings before events.
+        max_total = self._limit_bytes("max_total_gb")
+        min_free = self._limit_bytes("min_free_gb")
+        for category in RETENTION_CATEGORIES:
+            while self._running and self._over_global_limit(max_total, min_free, index_bytes):
+                if not delete_oldest(category):
+                    break
+
+        for camera_id in deleted_cameras:
+            compact_segment_index(self.recording_path, camera_id)
+        if deleted_files:
+            self.pruned.emit(deleted_files, deleted_bytes)
+
+    def _over_global_limit(self, max_total: int, min_free: int, extra_bytes: int = 0) -> bool:
+        if max_total and sum(index.total_bytes for index in self._index.values()) + extra_bytes > max_total:
+            return True
+        if min_free:
+            try:
+                return shutil.disk_usage(self.recording_path).free < min_free
+            except OSError:
+                return False
+        return False
@@ -0,0 +1,107 @@
+"""Benchmark: capture in GUI-process threads vs. worker processes (stream.process_isolation).
+
+``--cameras`` captures decode the same generated MJPG file as fast as they
+can (a worst case for a busy GUI process) while a 5 ms QTimer stands in for
+the GUI event loop and frames are drained from a FrameMailbox like in the
+main window. Reported per mode: frames that reached the GUI, the timer's
+lateness (p50/p99) and the CPU time spent in the GUI process itself.
+
+    python scripts/bench_capture_process.py [--cameras 4] [--seconds 4] [--size 1280x720]
+"""
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+from PyQt6.QtCore import QCoreApplication, QTimer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from capture_process import ProcessCameraThread
+from frames import FrameMailbox
+from stream import CameraThread
+
+
+def make_clip(path, width, height, frames):
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 25, (width, height))
+    rng = np.random.default_rng(1)
+    noise = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    for i in range(frames):
+        writer.write(np.roll(noise, i * 8, axis=1))
+    writer.release()
+
+
+def cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def run(app, thread_class, clip, cameras, seconds):
+    mailbox = FrameMailbox()
+    config = {"stall_seconds": 0, "capture_mode": "read"}
+    threads = [thread_class(i + 1, clip, stream_config=config, mailbox=mailbox) for i in range(cameras)]
+    lateness = []
+    frames = [0]
+    last_tick = [None]
+
+    def tick():
+        now = time.perf_counter()
+        if last_tick[0] is not None:
+            lateness.append(max(0.0, now - last_tick[0] - 0.005))
+        last_tick[0] = now
+        frames[0] += len(mailbox.take_all())
+
+    for thread in threads:
+        thread.start()
+    # Warten bis alle Quellen liefern (Worker-Prozesse brauchen einen Moment zum Starten)
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline and len(mailbox.take_all()) < cameras:
+        app.processEvents()
+        time.sleep(0.01)
+
+    timer = QTimer()
+    timer.timeout.connect(tick)
+    timer.start(5)
+    cpu_start = cpu_seconds()
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        app.processEvents()
+        time.sleep(0.001)
+    cpu = cpu_seconds() - cpu_start
+    timer.stop()
+    for thread in threads:
+        thread.request_stop()
+    for thread in threads:
+        thread.wait(8000)
+
+    lateness.sort()
+    p50 = lateness[len(lateness) // 2] * 1000 if lateness else 0.0
+    p99 = lateness[int(len(lateness) * 0.99)] * 1000 if lateness else 0.0
+    return frames[0], p50, p99, cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cameras", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=4.0)
+    parser.add_argument("--size", default="1280x720")
+    parser.add_argument("--frames", type=int, default=3000, help="frames in the generated clip")
+    args = parser.parse_args()
+    width, height = (int(value) for value in args.size.lower().split("x"))
+
+    app = QCoreApplication(sys.argv[:1])
+    with tempfile.TemporaryDirectory() as tmp:
+        clip = os.path.join(tmp, "clip.avi")
+        make_clip(clip, width, height, args.frames)
+        for name, thread_class in (("threads", CameraThread), ("processes", ProcessCameraThread)):
+            frames, p50, p99, cpu = run(app, thread_class, clip, args.cameras, args.seconds)
+            print(f"{name:10s} frames to GUI {frames:5d}  timer lateness p50 {p50:6.2f} ms  p99 {p99:6.2f} ms  "
+                  f"GUI-process CPU {cpu / args.seconds * 100:5.0f} %")
+
+
+if __name__ == "__main__":
+    main()
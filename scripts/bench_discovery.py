@@ -0,0 +1,158 @@
+"""Benchmark: sequential vs. concurrent discovery port scan.
+
+Starts fake camera responders (TCP listeners answering like an RTSP server)
+on a few loopback addresses of 127.0.1.0/24 and "silent" hosts whose
+listeners drop every SYN (full accept queue), so connects to them run into
+the timeout like absent hosts on a LAN. The whole /24 is scanned with the
+old one-connect-after-the-other loop and with discovery.scan_hosts.
+
+    python scripts/bench_discovery.py [--cameras 6] [--silent 16] [--ports 15554,18000,18080,18554]
+    python scripts/bench_discovery.py --network 192.168.1.0/24 --ports 554,8000,80,8554
+
+The remaining loopback hosts refuse connections immediately; on a real LAN
+most of them would be silent as well (the sequential estimate is printed).
+"""
+import argparse
+import asyncio
+import ipaddress
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from discovery import scan_hosts
+
+
+def start_fake_cameras(addresses, port):
+    """Run fake RTSP responders in a background event loop; returns the loop."""
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+
+    async def handle(reader, writer):
+        writer.write(b"RTSP/1.0 200 OK\r\nCSeq: 1\r\nServer: fake-camera\r\n\r\n")
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve():
+        for address in addresses:
+            await asyncio.start_server(handle, address, port)
+        ready.set()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(serve())
+        loop.run_forever()
+
+    threading.Thread(target=run, daemon=True).start()
+    ready.wait(5)
+    return loop
+
+
+def start_silent_hosts(addresses, ports):
+    """Listeners with a full accept queue: the kernel drops further SYNs."""
+    sockets = []
+    for address in addresses:
+        for port in ports:
+            server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server.bind((address, port))
+            server.listen(0)
+            sockets.append(server)
+            for _ in range(2):
+                filler = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                filler.setblocking(False)
+                filler.connect_ex((address, port))
+                sockets.append(filler)
+    time.sleep(0.2)
+    return sockets
+
+
+def scan_ports_sequential(ip, ports, timeout):
+    """Baseline: the old scanner, one blocking connect after the other."""
+    open_ports = []
+    for port in ports:
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.settimeout(timeout)
+            result = sock.connect_ex((ip, port))
+            sock.close()
+            if result == 0:
+                open_ports.append(port)
+        except Exception:
+            pass
+    return open_ports
+
+
+def run_sequential(hosts, ports, timeout):
+    found = {}
+    for ip in hosts:
+        open_ports = scan_ports_sequential(str(ip), ports, timeout)
+        if open_ports:
+            found[str(ip)] = open_ports
+    return found
+
+
+def run_concurrent(hosts, ports, timeout, concurrency, rate):
+    found = {}
+    first_result = []
+    started = time.perf_counter()
+
+    async def on_host(ip, open_ports):
+        if open_ports:
+            found[ip] = open_ports
+            if not first_result:
+                first_result.append(time.perf_counter() - started)
+
+    asyncio.run(scan_hosts(hosts, ports, on_host, timeout=timeout, concurrency=concurrency,
+                           connects_per_second=rate))
+    return found, (first_result[0] if first_result else None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--network", default="", help="scan this network instead of the fake cameras")
+    parser.add_argument("--cameras", type=int, default=6)
+    parser.add_argument("--silent", type=int, default=16, help="hosts that let connects time out")
+    parser.add_argument("--ports", default="15554,18000,18080,18554")
+    parser.add_argument("--timeout", type=float, default=0.5)
+    parser.add_argument("--concurrency", type=int, default=512)
+    parser.add_argument("--rate", type=float, default=2000.0, help="connects per second, 0 = unlimited")
+    parser.add_argument("--skip-sequential", action="store_true")
+    args = parser.parse_args()
+    ports = [int(port) for port in args.ports.split(",") if port.strip()]
+
+    if args.network:
+        network = ipaddress.ip_network(args.network, strict=False)
+    else:
+        network = ipaddress.ip_network("127.0.1.0/24")
+        hosts = list(network.hosts())
+        step = max(1, len(hosts) // max(1, args.cameras))
+        cameras = [str(ip) for ip in hosts[::step][:args.cameras]]
+        start_fake_cameras(cameras, ports[0])
+        print(f"fake cameras on port {ports[0]}: {', '.join(cameras)}")
+        silent = [str(ip) for ip in hosts if str(ip) not in cameras][:args.silent]
+        _silent_sockets = start_silent_hosts(silent, ports)  # kept open
+        print(f"silent hosts: {len(silent)}")
+
+    hosts = list(network.hosts())
+    pairs = len(hosts) * len(ports)
+    print(f"scanning {len(hosts)} hosts x {len(ports)} ports = {pairs} connects")
+
+    if not args.skip_sequential:
+        started = time.perf_counter()
+        found = run_sequential(hosts, ports, args.timeout)
+        print(f"sequential  {time.perf_counter() - started:7.2f} s  found {len(found)}")
+
+    started = time.perf_counter()
+    found, first = run_concurrent(hosts, ports, args.timeout, args.concurrency, args.rate)
+    first_text = f", first result after {first:.2f} s" if first is not None else ""
+    print(f"concurrent  {time.perf_counter() - started:7.2f} s  found {len(found)}{first_text}")
+    print(f"sequential worst case with absent hosts (LAN): {pairs * args.timeout:.0f} s")
+
+
+if __name__ == "__main__":
+    main()
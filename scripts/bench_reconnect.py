@@ -0,0 +1,105 @@
+"""Simulation: fixed-delay reconnects vs. ReconnectScheduler after an outage.
+
+``--cameras`` camera loops lose their source at t=0; it comes back after
+``--outage`` seconds (the stub RTSP server from scripts/rtsp_stub_server.py,
+standing in for the switch or ReolinkProxy, starts answering). Every open attempt takes ``--open-time``
+seconds. Reported: open attempts during the outage, the peak number of
+simultaneous opens and how long after the end of the outage the last
+camera was connected again.
+
+    python scripts/bench_reconnect.py [--cameras 20] [--outage 8] [--delay 2]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from reconnect import ReconnectScheduler
+from rtsp_stub_server import StubRTSPServer
+
+HOST, PORT = "127.0.5.1", 15600
+
+
+class Source:
+    def __init__(self, outage, open_time):
+        self.started = time.monotonic()
+        self.up_at = self.started + outage
+        self.open_time = open_time
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.failed_opens = 0
+        self.recovered = []
+
+    def open(self) -> bool:
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.open_time)
+        with self.lock:
+            self.active -= 1
+            if time.monotonic() >= self.up_at:
+                self.recovered.append(time.monotonic() - self.up_at)
+                return True
+            self.failed_opens += 1
+            return False
+
+
+def bring_up_listener(source):
+    def run():
+        time.sleep(max(0.0, source.up_at - time.monotonic()))
+        source.server = StubRTSPServer(HOST, PORT).__enter__()
+    threading.Thread(target=run, daemon=True).start()
+
+
+def fixed_delay_camera(source, delay):
+    while not source.open():
+        time.sleep(delay)
+
+
+def scheduled_camera(source, scheduler, delay):
+    failures = 0
+    while True:
+        with scheduler.open_slot(lambda: True):
+            if source.open():
+                return
+        failures += 1
+        scheduler.wait(HOST, PORT, scheduler.next_delay(failures, delay), lambda: True)
+
+
+def run(name, target, args):
+    source = Source(args.outage, args.open_time)
+    bring_up_listener(source)
+    threads = [threading.Thread(target=target, args=(source,), daemon=True) for _ in range(args.cameras)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(f"{name:10s} opens during outage {source.failed_opens:4d}  peak parallel opens {source.peak:3d}  "
+          f"all connected {max(source.recovered):5.2f} s after recovery")
+    if getattr(source, "server", None):
+        source.server.__exit__(None, None, None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cameras", type=int, default=20)
+    parser.add_argument("--outage", type=float, default=8.0)
+    parser.add_argument("--delay", type=float, default=2.0, help="fixed delay / backoff base")
+    parser.add_argument("--open-time", type=float, default=0.3)
+    parser.add_argument("--max-opens", type=int, default=4)
+    parser.add_argument("--max-delay", type=float, default=30.0)
+    args = parser.parse_args()
+
+    run("fixed", lambda source: fixed_delay_camera(source, args.delay), args)
+    scheduler = ReconnectScheduler(max_concurrent_opens=args.max_opens, max_delay=args.max_delay)
+    run("scheduler", lambda source: scheduled_camera(source, scheduler, args.delay), args)
+    print(f"retries started early by the reachability probe: {scheduler.early_retries}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Micro-benchmark: preview rendering with and without LetterboxCanvas.
+
+Compares the old per-frame path of MainWindow._render_frame_to_label (resize,
+RGB copy, zeroed canvas, QImage.copy) with the cached canvas and reports time
+and the bytes allocated per frame (numpy and OpenCV's numpy allocator report
+to tracemalloc).
+
+    python scripts/bench_render_cache.py [--frames 300] [--size 2560x1440] [--label 1280x720]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from frames import LetterboxCanvas
+
+
+def render_uncached(frame, display_w, display_h):
+    src_h, src_w = frame.shape[:2]
+    scale = min(display_w / src_w, display_h / src_h)
+    new_w, new_h = max(1, int(src_w * scale)), max(1, int(src_h * scale))
+    rgb_small = cv2.cvtColor(cv2.resize(frame, (new_w, new_h)), cv2.COLOR_BGR2RGB)
+    rgb_frame = np.zeros((display_h, display_w, 3), dtype=np.uint8)
+    x, y = (display_w - new_w) // 2, (display_h - new_h) // 2
+    rgb_frame[y:y + new_h, x:x + new_w] = rgb_small
+    return rgb_frame.copy()  # stands in for QImage(...).copy()
+
+
+def measure(name, render, frames, display_w, display_h):
+    render(frames[0], display_w, display_h)  # warm-up (allocates the cached canvas)
+    tracemalloc.start()
+    frame_peak = 0
+    elapsed = 0.0
+    for frame in frames:
+        base, _peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        started = time.perf_counter()
+        render(frame, display_w, display_h)
+        elapsed += time.perf_counter() - started
+        frame_peak = max(frame_peak, tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+    print(f"{name:10s} {elapsed / len(frames) * 1000:7.2f} ms/frame  allocated per frame: {frame_peak / 1024:8.1f} KiB")
+    return frame_peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--size", default="2560x1440", help="source frame WxH")
+    parser.add_argument("--label", default="1280x720", help="label WxH")
+    args = parser.parse_args()
+    src_w, src_h = (int(v) for v in args.size.lower().split("x"))
+    display_w, display_h = (int(v) for v in args.label.lower().split("x"))
+
+    rng = np.random.default_rng(0)
+    sources = [rng.integers(0, 255, (src_h, src_w, 3), dtype=np.uint8) for _ in range(4)]
+    frames = [sources[index % len(sources)] for index in range(args.frames)]
+
+    canvas = LetterboxCanvas()
+    peak_old = measure("uncached", render_uncached, frames, display_w, display_h)
+    peak_new = measure("cached", canvas.render, frames, display_w, display_h)
+    print(f"canvas allocations: {canvas.allocations} (for {args.frames + 1} frames)")
+    print(f"per-frame allocation: {peak_old / 1024:.1f} KiB -> {peak_new / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark: RTSP health check by decoder open vs. OPTIONS/DESCRIBE probe.
+
+Without ``--url`` the stub RTSP server (scripts/rtsp_stub_server.py) is
+started and camera_utils.rtsp_probe checks a few typical camera states
+(ready, wrong path, wrong password, Digest with qop=auth, port closed), reporting codec,
+resolution and frame rate from the SDP. The stub does not stream, so a
+decoder open is only timed against a real camera:
+
+    python scripts/bench_rtsp_probe.py [--port 18554]
+    python scripts/bench_rtsp_probe.py --url rtsp://admin:pw@192.168.1.20:554/h264Preview_01_main
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from camera_utils import _build_rtsp_url, rtsp_probe
+from rtsp_stub_server import StubRTSPServer
+
+
+def open_check(url, open_timeout_ms):
+    cap = cv2.VideoCapture(url, cv2.CAP_FFMPEG, [
+        cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, open_timeout_ms,
+        cv2.CAP_PROP_READ_TIMEOUT_MSEC, open_timeout_ms,
+    ])
+    try:
+        return cap.isOpened()
+    finally:
+        cap.release()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="", help="real camera URL: time decoder open vs. probe")
+    parser.add_argument("--port", type=int, default=18554)
+    parser.add_argument("--open-timeout-ms", type=int, default=3000)
+    args = parser.parse_args()
+
+    if args.url:
+        started = time.perf_counter()
+        opened = open_check(args.url, args.open_timeout_ms)
+        print(f"decoder open  {(time.perf_counter() - started) * 1000:9.1f} ms  {'ok' if opened else 'failed'}")
+        probe = rtsp_probe(args.url, timeout=2.0)
+        print(f"rtsp_probe    {probe['total_ms']:9.1f} ms  {describe(probe)}  server={probe['server']!r}")
+        return
+
+    user, password = "admin", "secret"
+    cases = [
+        ("stream ready", "/h264Preview_01_main", password, args.port),
+        ("sub stream", "/h264Preview_01_sub", password, args.port),
+        ("wrong path", "/Preview_01_main", password, args.port),
+        ("wrong password", "/h264Preview_01_main", "wrong", args.port),
+        ("port closed", "/h264Preview_01_main", password, args.port + 1),
+    ]
+    with StubRTSPServer(port=args.port, username=user, password=password):
+        for name, path, pwd, port in cases:
+            probe = rtsp_probe(_build_rtsp_url("127.0.0.1", port, user, pwd, path), timeout=2.0)
+            print(f"{name:16} {probe['total_ms']:7.1f} ms  {describe(probe)}")
+    with StubRTSPServer(port=args.port, username=user, password=password, qop=True):
+        probe = rtsp_probe(_build_rtsp_url("127.0.0.1", args.port, user, password, cases[0][1]), timeout=2.0)
+        print(f"{'qop=auth':16} {probe['total_ms']:7.1f} ms  {describe(probe)}")
+
+
+def describe(probe):
+    if probe["ready"]:
+        return f"ready {probe['codec']} {probe['width']}x{probe['height']} @ {probe['fps']:g} fps"
+    return f"not ready ({probe['error']})"
+
+
+if __name__ == "__main__":
+    main()
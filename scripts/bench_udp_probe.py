@@ -0,0 +1,151 @@
+"""Benchmark: Reolink UDP discovery probe, sequential variants vs. one socket.
+
+Starts fake Reolink responders on loopback that only answer one of the 24
+probe variants (Search, big-endian header, port 2000 - the last one the old
+loop tried) and silent hosts that swallow every datagram. Both are probed
+with the previous per-variant loop and with camera_utils.udp_reolink_probe_many.
+The response parser is timed separately against the old byte-by-byte scan.
+
+    python scripts/bench_udp_probe.py [--cameras 2] [--silent 2] [--timeout 0.2]
+"""
+import argparse
+import json
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from camera_utils import REOLINK_UDP_PORTS, _parse_reolink_response, udp_reolink_probe_many
+
+
+def reolink_reply(name: str) -> bytes:
+    body = json.dumps([{"cmd": "Search", "code": 0, "value": {"SearchResult": {
+        "name": name, "model": "Fake E1", "serial": f"SN-{name}", "mac": "ec:71:db:00:00:01"}}}]).encode()
+    return b"\x00" * 20 + struct.pack(">2sHHHII", b"BC", 0, 1, 0, len(body), 0) + body
+
+
+def start_responders(addresses):
+    """Answer only big-endian 'Search' requests on the last port."""
+    port = REOLINK_UDP_PORTS[-1]
+    sockets = []
+    for address in addresses:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.bind((address, port))
+        sockets.append(sock)
+
+        def serve(sock=sock, address=address):
+            while True:
+                data, addr = sock.recvfrom(4096)
+                if data[:2] == b"BC" and struct.unpack(">I", data[8:12])[0] == len(data) - 16 and b"Search" in data[16:]:
+                    sock.sendto(reolink_reply(address), addr)
+
+        threading.Thread(target=serve, daemon=True).start()
+    return sockets
+
+
+def start_silent(addresses):
+    """Bound sockets that never answer (like a host that drops the probe)."""
+    sockets = []
+    for address in addresses:
+        for port in REOLINK_UDP_PORTS:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.bind((address, port))
+            sockets.append(sock)
+    return sockets
+
+
+def legacy_probe(ip, timeout):
+    """The previous implementation: one variant after the other, each waiting up to ``timeout``."""
+    payloads = [
+        [{"cmd": "GetDevInfo", "action": 0, "param": {}}],
+        {"cmd": "GetDevInfo", "action": 0, "param": {}},
+        [{"cmd": "Search", "action": 0, "param": {}}],
+        {"cmd": "Search", "action": 0, "param": {}},
+    ]
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+    sock.settimeout(timeout)
+    try:
+        for port in REOLINK_UDP_PORTS:
+            for cmd_data in payloads:
+                data = json.dumps(cmd_data).encode("utf-8")
+                for endian in ("<", ">"):
+                    sock.sendto(b"\x00" * 32, (ip, port))
+                    sock.sendto(struct.pack(endian + "2sHHHII", b"BC", 0, 1, 0, len(data), 0) + data, (ip, port))
+                    try:
+                        resp_data, _addr = sock.recvfrom(4096)
+                    except socket.timeout:
+                        continue
+                    info = legacy_parse(resp_data)
+                    if info:
+                        return info
+    finally:
+        sock.close()
+    return None
+
+
+def legacy_parse(resp_data):
+    idx = -1
+    for i in range(len(resp_data) - 1):
+        if resp_data[i:i + 2].lower() == b"bc":
+            for j in range(i + 2, min(i + 48, len(resp_data))):
+                if resp_data[j] in (ord("["), ord("{")):
+                    idx = j
+                    break
+            if idx != -1:
+                break
+    if idx == -1:
+        return None
+    content = resp_data[idx:].decode("utf-8", "ignore")
+    end = content.rfind("]") if content.startswith("[") else content.rfind("}")
+    try:
+        res = json.loads(content[:end + 1])
+        val = res[0].get("value", {}) if isinstance(res, list) else res.get("value", {})
+        return val.get("DevInfo") or val.get("SearchResult") or val
+    except Exception:
+        return None
+
+
+def bench_parse(rounds):
+    # Realistic noise in front of the header: lots of bytes without "bc"
+    packet = b"\x01\x02\x03" * 400 + reolink_reply("parse")
+    for name, parse in (("legacy", legacy_parse), ("struct", _parse_reolink_response)):
+        started = time.perf_counter()
+        for _ in range(rounds):
+            assert parse(packet)
+        print(f"parse {name:7s} {(time.perf_counter() - started) / rounds * 1e6:8.1f} us/packet")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cameras", type=int, default=2)
+    parser.add_argument("--silent", type=int, default=2)
+    parser.add_argument("--timeout", type=float, default=0.2)
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    cameras = [f"127.0.3.{index + 1}" for index in range(args.cameras)]
+    silent = [f"127.0.3.{index + 101}" for index in range(args.silent)]
+    _sockets = start_responders(cameras) + start_silent(silent)  # kept open
+    targets = cameras + silent
+
+    started = time.perf_counter()
+    found = [ip for ip in targets if legacy_probe(ip, args.timeout)]
+    print(f"sequential variants {time.perf_counter() - started:6.2f} s  found {len(found)}/{len(cameras)}")
+
+    started = time.perf_counter()
+    found = udp_reolink_probe_many(targets, timeout=args.timeout)
+    print(f"one socket, all     {time.perf_counter() - started:6.2f} s  found {len(found)}/{len(cameras)}")
+
+    started = time.perf_counter()
+    found = udp_reolink_probe_many(cameras, timeout=args.timeout * 10)
+    print(f"cameras only        {time.perf_counter() - started:6.2f} s  found {len(found)}/{len(cameras)} (returns once all answered)")
+
+    bench_parse(args.rounds)
+
+
+if __name__ == "__main__":
+    main()
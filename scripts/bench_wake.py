@@ -0,0 +1,93 @@
+"""Benchmark: waking several sleeping cameras one after the other vs. WakeScheduler.
+
+Fake battery cameras on loopback open their RTSP port ``--wake-delay``
+seconds after the first wake packet on UDP 9000 and fall asleep again
+between runs. The sequential run mirrors the previous per-thread wake loop
+(burst, HTTP ping, three TCP probes with sleeps) camera by camera, which is
+what streams starting behind each other amounted to; the scheduler wakes
+all of them from one event loop.
+
+    python scripts/bench_wake.py [--cameras 6] [--wake-delay 1.5] [--port 15554]
+"""
+import argparse
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from camera_utils import _tcp_probe, _udp_reolink_wake
+from wake import WakeScheduler
+
+
+class FakeBatteryCamera:
+    def __init__(self, address, rtsp_port, wake_delay):
+        self.address = address
+        self.rtsp_port = rtsp_port
+        self.wake_delay = wake_delay
+        self._server = None
+        self._udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._udp.bind((address, 9000))
+        threading.Thread(target=self._listen, daemon=True).start()
+
+    def _listen(self):
+        while True:
+            self._udp.recvfrom(4096)
+            if self._server is None:
+                self._server = "waking"
+                threading.Timer(self.wake_delay, self._open).start()
+
+    def _open(self):
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind((self.address, self.rtsp_port))
+        server.listen(16)
+        self._server = server
+
+    def sleep(self):
+        server, self._server = self._server, None
+        if isinstance(server, socket.socket):
+            server.close()
+
+
+def legacy_wake(host, port):
+    """The previous CameraThread loop (without the HTTP ping to port 8000)."""
+    for _attempt in range(10):
+        _udp_reolink_wake(host)
+        for _ in range(3):
+            ok, _ = _tcp_probe(host, port, timeout=0.2)
+            if ok:
+                return True
+            time.sleep(0.3)
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cameras", type=int, default=6)
+    parser.add_argument("--wake-delay", type=float, default=1.5)
+    parser.add_argument("--port", type=int, default=15554)
+    args = parser.parse_args()
+
+    cameras = [FakeBatteryCamera(f"127.0.4.{index + 1}", args.port, args.wake_delay) for index in range(args.cameras)]
+
+    started = time.perf_counter()
+    woken = sum(legacy_wake(camera.address, args.port) for camera in cameras)
+    print(f"sequential  {time.perf_counter() - started:6.2f} s  woke {woken}/{len(cameras)}")
+    for camera in cameras:
+        camera.sleep()
+
+    scheduler = WakeScheduler()
+    started = time.perf_counter()
+    tickets = [scheduler.request(camera.address, args.port) for camera in cameras]
+    for ticket in tickets:
+        ticket.wait()
+    print(f"scheduler   {time.perf_counter() - started:6.2f} s  woke {sum(t.ok for t in tickets)}/{len(cameras)}")
+    for host, entry in sorted(scheduler.stats().items()):
+        print(f"  {host}: time to wake {entry['last_seconds']:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
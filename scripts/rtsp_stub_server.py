@@ -0,0 +1,218 @@
+"""Minimal RTSP server stub for trying the RTSP probes without a camera.
+
+Answers OPTIONS and DESCRIBE (with Digest authentication like Reolink
+firmware) for the configured paths, with SDPs carrying real SPS NAL units
+so codec/resolution parsing can be checked; it does not stream. Unknown paths get
+404, or no answer at all with ``hang_unknown`` (as some firmware does).
+
+    python scripts/rtsp_stub_server.py [--port 18554] [--user admin --password secret]
+
+    from rtsp_stub_server import StubRTSPServer
+    with StubRTSPServer(port=18554, paths={"/h264Preview_01_main": sdp}) as server:
+        ...
+"""
+import argparse
+import base64
+import hashlib
+import re
+import socketserver
+import threading
+import time
+from urllib.parse import urlparse
+
+def h264_sps(width: int, height: int, profile_idc: int = 100, level_idc: int = 51) -> bytes:
+    """SPS NAL unit (High profile, 4:2:0, progressive) for ``width`` x ``height``."""
+    bits = []
+
+    def u(value, count):
+        bits.extend((value >> (count - 1 - i)) & 1 for i in range(count))
+
+    def ue(value):
+        value += 1
+        u(value, 2 * value.bit_length() - 1)
+
+    width_mbs, height_mbs = (width + 15) // 16, (height + 15) // 16
+    u(profile_idc, 8)
+    u(0, 8)  # constraint flags
+    u(level_idc, 8)
+    ue(0)  # seq_parameter_set_id
+    if profile_idc in (100, 110, 122, 244):
+        ue(1)  # chroma_format_idc 4:2:0
+        ue(0)
+        ue(0)  # bit depths
+        u(0, 1)  # qpprime_y_zero_transform_bypass_flag
+        u(0, 1)  # seq_scaling_matrix_present_flag
+    ue(0)  # log2_max_frame_num_minus4
+    ue(0)  # pic_order_cnt_type
+    ue(0)  # log2_max_pic_order_cnt_lsb_minus4
+    ue(1)  # max_num_ref_frames
+    u(0, 1)  # gaps_in_frame_num_value_allowed_flag
+    ue(width_mbs - 1)
+    ue(height_mbs - 1)
+    u(1, 1)  # frame_mbs_only_flag
+    u(1, 1)  # direct_8x8_inference_flag
+    crop_right, crop_bottom = (width_mbs * 16 - width) // 2, (height_mbs * 16 - height) // 2
+    u(1 if crop_right or crop_bottom else 0, 1)
+    if crop_right or crop_bottom:
+        ue(0)
+        ue(crop_right)
+        ue(0)
+        ue(crop_bottom)
+    u(0, 1)  # vui_parameters_present_flag
+    u(1, 1)  # rbsp_stop_one_bit
+    bits.extend([0] * (-len(bits) % 8))
+    rbsp = bytes(int("".join(map(str, bits[i:i + 8])), 2) for i in range(0, len(bits), 8))
+    nal = bytearray([0x67])
+    zeros = 0
+    for byte in rbsp:
+        if zeros >= 2 and byte <= 3:
+            nal.append(3)  # emulation prevention
+            zeros = 0
+        nal.append(byte)
+        zeros = zeros + 1 if byte == 0 else 0
+    return bytes(nal)
+
+
+def h264_sdp(width: int, height: int, fps: int = 25) -> str:
+    """SDP like a Reolink H.264 stream (video plus AAC audio)."""
+    sps = base64.b64encode(h264_sps(width, height)).decode()
+    return (
+        "v=0\r\n"
+        "o=- 1 1 IN IP4 0.0.0.0\r\n"
+        "s=Session streamed by stub\r\n"
+        "t=0 0\r\n"
+        "m=video 0 RTP/AVP 96\r\n"
+        "a=control:trackID=0\r\n"
+        "a=rtpmap:96 H264/90000\r\n"
+        "a=fmtp:96 packetization-mode=1;profile-level-id=640033;"
+        f"sprop-parameter-sets={sps},aO48sA==\r\n"
+        f"a=framerate:{fps}\r\n"
+        "m=audio 0 RTP/AVP 97\r\n"
+        "a=control:trackID=1\r\n"
+        "a=rtpmap:97 MPEG4-GENERIC/16000\r\n"
+    )
+
+
+# Reolink main and sub stream.
+REOLINK_H264_SDP = h264_sdp(2560, 1440)
+REOLINK_H264_SUB_SDP = h264_sdp(640, 360, fps=15)
+
+
+class StubRTSPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host="127.0.0.1", port=18554, paths=None, username="", password="",
+                 realm="BC Streaming Media", hang_unknown=False, delay=0.0, qop=False):
+        self.paths = dict(paths if paths is not None else {
+            "/h264Preview_01_main": REOLINK_H264_SDP,
+            "/h264Preview_01_sub": REOLINK_H264_SUB_SDP,
+        })
+        self.username = username
+        self.password = password
+        self.realm = realm
+        self.nonce = "6b1c2e4d8a9f"
+        self.qop = qop
+        self.hang_unknown = hang_unknown
+        self.delay = delay
+        self.requests = []
+        super().__init__((host, port), _Handler)
+        self._thread = None
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+    def authorized(self, method, header):
+        if not self.username:
+            return True
+        if not header.lower().startswith("digest"):
+            return False
+        params = dict(re.findall(r'(\w+)="?([^",]*)"?', header[6:]))
+        ha1 = hashlib.md5(f"{self.username}:{self.realm}:{self.password}".encode()).hexdigest()
+        ha2 = hashlib.md5(f"{method}:{params.get('uri', '')}".encode()).hexdigest()
+        if self.qop:
+            if params.get("qop") != "auth" or not params.get("cnonce"):
+                return False
+            expected = hashlib.md5(
+                f"{ha1}:{self.nonce}:{params.get('nc', '')}:{params['cnonce']}:auth:{ha2}".encode()
+            ).hexdigest()
+        else:
+            expected = hashlib.md5(f"{ha1}:{self.nonce}:{ha2}".encode()).hexdigest()
+        return params.get("username") == self.username and params.get("response") == expected
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        server = self.server
+        while True:
+            request_line = self.rfile.readline().decode("utf-8", "replace").strip()
+            if not request_line:
+                return
+            headers = {}
+            while True:
+                line = self.rfile.readline().decode("utf-8", "replace").strip()
+                if not line:
+                    break
+                name, _sep, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            method, url, _version = (request_line.split(" ") + ["", ""])[:3]
+            server.requests.append((method, url))
+            if server.delay:
+                time.sleep(server.delay)
+            cseq = headers.get("cseq", "0")
+            path = urlparse(url).path
+
+            if method == "OPTIONS":
+                self._reply(cseq, "200 OK", {"Public": "OPTIONS, DESCRIBE, SETUP, PLAY, TEARDOWN"})
+                continue
+            if method != "DESCRIBE":
+                self._reply(cseq, "501 Not Implemented")
+                continue
+            if not server.authorized(method, headers.get("authorization", "")):
+                self._reply(cseq, "401 Unauthorized", {
+                    "WWW-Authenticate": f'Digest realm="{server.realm}", nonce="{server.nonce}"'
+                    + (', qop="auth"' if server.qop else ""),
+                })
+                continue
+            sdp = server.paths.get(path)
+            if sdp is None:
+                if server.hang_unknown:
+                    time.sleep(30)
+                    return
+                self._reply(cseq, "404 Stream Not Found")
+                continue
+            self._reply(cseq, "200 OK", {"Content-Base": url + "/", "Content-Type": "application/sdp"}, sdp.encode())
+
+    def _reply(self, cseq, status, headers=None, body=b""):
+        lines = [f"RTSP/1.0 {status}", f"CSeq: {cseq}", "Server: stub"]
+        lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        if body:
+            lines.append(f"Content-Length: {len(body)}")
+        self.wfile.write(("\r\n".join(lines) + "\r\n\r\n").encode() + body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=18554)
+    parser.add_argument("--user", default="admin")
+    parser.add_argument("--password", default="secret")
+    args = parser.parse_args()
+    with StubRTSPServer(args.host, args.port, username=args.user, password=args.password) as server:
+        print(f"stub RTSP server on rtsp://{args.user}:{args.password}@{args.host}:{args.port}"
+              f"{next(iter(server.paths))}")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
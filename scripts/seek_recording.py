@@ -0,0 +1,160 @@
+"""Export a still frame at a wall-clock time via the recording segment index.
+
+Looks up the segment with recording.load_segment_index/find_segment, jumps
+to the keyframe from seek_keyframe and decodes forward to the requested
+time instead of scanning the recordings from the start:
+
+    python scripts/seek_recording.py --recordings ./recordings --camera 1 --at "2024-05-01 14:03:20" --out frame.jpg
+
+``--check`` records MJPG segments with a SegmentIndex into a temp folder,
+seeks to random times and verifies the decoded frame (each frame carries
+its number as brightness), timing index seeks against decoding from the
+start of the recording:
+
+    python scripts/seek_recording.py --check [--segments 3] [--seconds 4]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from recording import SegmentIndex, find_segment, load_segment_index, seek_keyframe
+
+
+def read_frame_at(recording_path, camera_id, wall_time, entries=None):
+    """Return (frame, entry, offset) for ``wall_time``; frame is None if nothing is recorded there."""
+    if entries is None:
+        entries = load_segment_index(recording_path, camera_id)
+    entry, offset = find_segment(entries, wall_time)
+    if entry is None:
+        return None, None, 0.0
+    cap = cv2.VideoCapture(os.path.join(recording_path, entry["file"]))
+    try:
+        if not cap.isOpened():
+            return None, entry, offset
+        fps = cap.get(cv2.CAP_PROP_FPS) or float(entry.get("fps") or 25.0)
+        keyframe = seek_keyframe(entry, offset)
+        if "frame" in keyframe:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, keyframe["frame"])
+            skip = 0
+        else:
+            # Auf den Keyframe springen und bis zum gesuchten Zeitpunkt vorwärts dekodieren
+            cap.set(cv2.CAP_PROP_POS_MSEC, keyframe["t"] * 1000.0)
+            skip = max(0, int(round((offset - keyframe["t"]) * fps)))
+        for _ in range(skip):
+            if not cap.grab():
+                break
+        ret, frame = cap.read()
+        return (frame if ret else None), entry, offset
+    finally:
+        cap.release()
+
+
+def parse_time(value):
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def make_recording(recording_path, camera_id, segments, seconds, fps=25, size=(320, 240)):
+    """MJPG segments whose frames encode their global number as brightness; returns the start time."""
+    index = SegmentIndex(recording_path, camera_id)
+    start = time.time() - segments * seconds
+    number = 0
+    for segment in range(segments):
+        filename = os.path.join(recording_path, f"camera_{camera_id}_{segment:03d}.avi")
+        writer = cv2.VideoWriter(filename, cv2.VideoWriter_fourcc(*"MJPG"), fps, size)
+        for _ in range(int(seconds * fps)):
+            writer.write(np.full((size[1], size[0], 3), number % 250, dtype=np.uint8))
+            number += 1
+        writer.release()
+        segment_start = start + segment * seconds
+        index.add(filename, segment_start, segment_start + seconds, intra_only=True, fps=fps)
+    index.flush()
+    return start, number
+
+
+def read_frame_linear(recording_path, entries, wall_time):
+    """Reference without seeking: decode every segment from the first one."""
+    for entry in entries:
+        cap = cv2.VideoCapture(os.path.join(recording_path, entry["file"]))
+        fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+        frame_time = entry["start"]
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if frame_time + 0.5 / fps >= wall_time:
+                cap.release()
+                return frame
+            frame_time += 1.0 / fps
+        cap.release()
+    return None
+
+
+def check(segments, seconds, seeks):
+    fps = 25
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        start, total = make_recording(tmp, 1, segments, seconds, fps=fps)
+        entries = load_segment_index(tmp, 1)
+        print(f"index: {len(entries)} segments, {total} frames")
+        errors = 0
+        indexed = linear = 0.0
+        for _ in range(seeks):
+            number = rng.randrange(total)
+            wall_time = start + number / fps
+            started = time.perf_counter()
+            frame, _entry, _offset = read_frame_at(tmp, 1, wall_time, entries)
+            indexed += time.perf_counter() - started
+            started = time.perf_counter()
+            reference = read_frame_linear(tmp, entries, wall_time)
+            linear += time.perf_counter() - started
+            got = int(round(float(frame.mean()))) if frame is not None else -1
+            if reference is None or abs(got - number % 250) > 2:
+                errors += 1
+                print(f"  frame {number}: expected brightness {number % 250}, got {got}")
+        past_end, _entry, _offset = read_frame_at(tmp, 1, start + segments * seconds + 60, entries)
+        if past_end is not None:
+            errors += 1
+            print("  time after the last segment returned a frame")
+        print(f"{seeks} seeks  index {indexed / seeks * 1000:7.2f} ms/seek  "
+              f"linear decode {linear / seeks * 1000:7.2f} ms/seek  errors {errors}")
+        return errors == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recordings", default="recordings")
+    parser.add_argument("--camera", default="1")
+    parser.add_argument("--at", help="wall-clock time (ISO format or Unix seconds)")
+    parser.add_argument("--out", default="frame.jpg")
+    parser.add_argument("--check", action="store_true", help="self-check against a generated recording")
+    parser.add_argument("--segments", type=int, default=3)
+    parser.add_argument("--seconds", type=float, default=4.0)
+    parser.add_argument("--seeks", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.check:
+        sys.exit(0 if check(args.segments, args.seconds, args.seeks) else 1)
+    if not args.at:
+        parser.error("--at is required (or use --check)")
+    frame, entry, offset = read_frame_at(args.recordings, args.camera, parse_time(args.at))
+    if frame is None:
+        print("no recording at that time" if entry is None else f"could not decode {entry['file']}")
+        sys.exit(1)
+    cv2.imwrite(args.out, frame)
+    print(f"{entry['file']} +{offset:.2f} s -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,288 @@
 import os
+import queue
 import threading
 import time
-from collections import deque
 from datetime import datetime
-from urllib.parse import urlparse
+from urllib.parse import unquote, urlparse
 
 import cv2
 import numpy as np
-import requests
 from PyQt6.QtCore import QThread, pyqtSignal
 
 from camera_utils import (
     _build_rtsp_url,
+    _is_substream_path,
     _normalize_rtsp_url,
     _parse_rtsp_url,
     _tcp_probe,
-    _udp_reolink_wake,
+    find_working_rtsp_url,
+    rtsp_probe,
 )
+from frames import FramePool
 from i18n import tr
+from metrics import CaptureMetrics
+from reconnect import DEFAULT_MAX_CONCURRENT_OPENS, DEFAULT_RECONNECT_MAX_SECONDS, shared_reconnect_scheduler
+from recording import (
+    DEFAULT_RECORDING_CONFIG,
+    ClipWriter,
+    PassthroughRecorder,
+    PreEventBuffer,
+    SegmentIndex,
+    find_ffmpeg,
+    find_ffprobe,
+    resolve_recording_engine,
+    segment_index_path,
+)
+from wake import shared_wake_scheduler
+
+
+DEFAULT_STREAM_CONFIG = {
+    # "grab" drains every packet with grab() but converts/copies (retrieve) only
+    # frames a consumer will use; "read" converts every frame.
+    "capture_mode": "grab",
+    # FFmpeg decoder threads per stream (0 = FFmpeg default).
+    "decoder_threads": 0,
+    # Recycle a main-stream capture that delivered no frame for this long
+    # (at least 10 frame intervals) instead of waiting for FFmpeg's read
+    # timeout; 0 = only the read timeout.
+    "stall_seconds": 2.0,
+    # Retry delays double per failed attempt (with jitter) up to this limit.
+    "reconnect_max_seconds": DEFAULT_RECONNECT_MAX_SECONDS,
+    # RTSP opens in flight at once across all cameras.
+    "max_concurrent_opens": DEFAULT_MAX_CONCURRENT_OPENS,
+    # Capture each camera in its own worker process (capture_process.py);
+    # frames come back through shared-memory rings of this many slots.
+    "process_isolation": False,
+    "process_ring_slots": 4,
+}
+
+_BASE_CAPTURE_OPTIONS = "rtsp_transport;tcp|loglevel;quiet"
+
+
+def _decoder_threads(stream_config: dict | None) -> int:
+    """Configured FFmpeg decoder threads; invalid values mean the default (0)."""
+    try:
+        return max(0, int((stream_config or {}).get("decoder_threads", 0) or 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def ffmpeg_capture_options(stream_config: dict | None) -> str:
+    """Build OPENCV_FFMPEG_CAPTURE_OPTIONS for the given stream config."""
+    options = _BASE_CAPTURE_OPTIONS
+    threads = _decoder_threads(stream_config)
+    if threads > 0:
+        options += f"|threads;{threads}"
+    return options
+
+
+def open_ffmpeg_capture(url: str, open_timeout_ms: int, read_timeout_ms: int, stream_config: dict | None = None):
+    # The options are read by OpenCV when the capture is opened.
+    os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"] = ffmpeg_capture_options(stream_config)
+    params = [
+        cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, open_timeout_ms,
+        cv2.CAP_PROP_READ_TIMEOUT_MSEC, read_timeout_ms,
+    ]
+    threads = _decoder_threads(stream_config)
+    if threads > 0 and hasattr(cv2, "CAP_PROP_N_THREADS"):
+        params += [cv2.CAP_PROP_N_THREADS, threads]
+    return cv2.VideoCapture(url, cv2.CAP_FFMPEG, params)
+
+
+def read_capture_frame(cap, pool: FramePool, grab_mode: bool, wanted):
+    """Read the next frame; returns (ok, frame) with frame None if it was only grabbed.
+
+    In grab mode every packet is pulled with grab() so FFmpeg's buffer never
+    backs up, and retrieve() (color conversion + copy) runs only when
+    ``wanted()`` says a consumer will use the frame.
+    """
+    if grab_mode:
+        if not cap.grab():
+            return False, None
+        if not wanted():
+            return True, None
+        buffer = pool.acquire()
+        ret, frame = cap.retrieve(buffer) if buffer is not None else cap.retrieve()
+    else:
+        buffer = pool.acquire()
+        ret, frame = cap.read(buffer) if buffer is not None else cap.read()
+    buffer = None
+    if not ret or frame is None:
+        return False, None
+    return True, pool.publish(frame)
+
+
+class SubstreamReader(threading.Thread):
+    """Second, low-resolution capture of a camera for grid tiles and detection.
+
+    Frames go to :meth:`CameraThread._handle_substream_frame`. After repeated
+    failures the reader is marked ``failed`` and the main stream feeds the
+    tiles again; it keeps retrying with the shared backoff and clears the
+    flag as soon as the substream delivers frames again.
+    """
+
+    def __init__(self, owner, url: str):
+        super().__init__(daemon=True, name=f"Substream-{owner.camera_id}")
+        self.owner = owner
+        self.url = url
+        self.running = True
+        self.active = False
+        self.failed = False
+        self.failures = 0
+        self.fps = 0.0
+        self._pool = FramePool(size=3)
+
+    def stop(self):
+        self.running = False
+
+    def _alive(self) -> bool:
+        return self.running and self.owner.running
+
+    def run(self):
+        scheduler = self.owner.reconnect_scheduler
+        while self._alive():
+            with scheduler.open_slot(self._alive) as acquired:
+                if not acquired:
+                    return
+                cap = open_ffmpeg_capture(self.url, 10000, 5000, self.owner.stream_config)
+            if not cap.isOpened():
+                cap.release()
+            else:
+                fps = float(cap.get(cv2.CAP_PROP_FPS))
+                self.fps = fps if 0 < fps <= 120 else 15.0
+                try:
+                    self._read_loop(cap)
+                finally:
+                    self.active = False
+                    # Released by the thread that opened it (see CameraThread.request_stop).
+                    cap.release()
+                    self._pool.clear()
+            if not self._alive():
+                return
+
+            # Ausfall: Hauptstream übernimmt die Kacheln, Substream wird weiter mit Backoff versucht
+            self.failures += 1
+            if self.failures >= 3:
+                self.failed = True
+            delay = scheduler.next_delay(self.failures, self.owner.reconnect_delay)
+            scheduler.wait(self.owner._host, int(self.owner._port or 554), delay, self._alive)
+
+    def _read_loop(self, cap):
+        failed_reads = 0
+        grab_mode = self.owner.grab_mode
+        while self._alive():
+            ret, frame = read_capture_frame(cap, self._pool, grab_mode, self.owner._substream_frame_wanted)
+            if not ret:
+                failed_reads += 1
+                if failed_reads >= 3:
+                    return
+                time.sleep(0.2)
+                continue
+            failed_reads = 0
+            if not self.active:
+                self.active = True
+                self.failures = 0
+                self.failed = False
+                if not self.owner.main_stream_active:
+                    self.owner.connection_status.emit(True, self.owner.camera_id, tr("camera.status.connected"))
+            if frame is not None:
+                self.owner._handle_substream_frame(frame)
+
+
+class CaptureStalled(Exception):
+    """The capture delivered no frame within the stall limit."""
+
+
+class CaptureReader(threading.Thread):
+    """Reads one opened VideoCapture on its own thread.
+
+    The stream loop takes results with a deadline; when a read hangs it
+    abandons the reader and reconnects instead of waiting for FFmpeg's read
+    timeout. The reader releases its capture itself once the blocked read
+    returns, so the capture is never released while another thread reads it.
+    """
+
+    def __init__(self, owner, cap, pool: FramePool, wanted):
+        super().__init__(daemon=True, name=f"Capture-{owner.camera_id}")
+        self.owner = owner
+        self.cap = cap
+        self.pool = pool
+        self.wanted = wanted
+        self.abandoned = False
+        self._results = queue.Queue(maxsize=2)
+
+    def abandon(self):
+        self.abandoned = True
+
+    def _alive(self) -> bool:
+        return not self.abandoned and self.owner.running
+
+    def next(self, timeout: float | None):
+        """Next (ok, frame); None once the stream stops, queue.Empty after ``timeout`` seconds."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.owner.running:
+            wait = 0.1 if deadline is None else min(0.1, deadline - time.monotonic())
+            if wait <= 0:
+                raise queue.Empty
+            try:
+                return self._results.get(timeout=wait)
+            except queue.Empty:
+                continue
+        return None
+
+    def run(self):
+        metrics = self.owner.metrics
+        failure_pause = 0.5 if self.owner._is_proxy_stream else 0.2
+        try:
+            while self._alive():
+                started = time.monotonic()
+                ret, frame = read_capture_frame(self.cap, self.pool, self.owner.grab_mode, self.wanted)
+                metrics.record_read(time.monotonic() - started, ret)
+                while self._alive():
+                    try:
+                        self._results.put((ret, frame), timeout=0.2)
+                        break
+                    except queue.Full:
+                        continue
+                frame = None
+                if not ret:
+                    time.sleep(failure_pause)
+        finally:
+            try:
+                self.cap.release()
+            except Exception:
+                pass
 
 
 class CameraThread(QThread):
     """Thread für einzelne Kamera mit OpenCV - optimiert für parallele Streams"""
     frame_ready = pyqtSignal(np.ndarray, int)
+    # Low-resolution frames for tiles/detection when a substream is configured.
+    substream_frame_ready = pyqtSignal(np.ndarray, int)
     connection_status = pyqtSignal(bool, int, str)
+    # (old_url, new_url) when a fallback path worked; persisted by the GUI.
+    rtsp_url_changed = pyqtSignal(str, str)
+    # Emitted (from writer threads) when a recording segment or event clip is complete.
+    file_closed = pyqtSignal(int, str)
     
-    def __init__(self, camera_id, rtsp_url, uid=""):
+    # Keep the main stream open this long after the last demand ended.
+    MAIN_STREAM_IDLE_SECONDS = 10.0
+    # Upper limits for UI frame delivery (see set_consumer_fps).
+    MAX_UI_FPS = 25.0
+    SUBSTREAM_UI_FPS = 15.0
+
+    def __init__(
+        self,
+        camera_id,
+        rtsp_url,
+        uid="",
+        recording_config=None,
+        substream_url=None,
+        stream_config=None,
+        mailbox=None,
+        wake_scheduler=None,
+        reconnect_scheduler=None,
+    ):
         super().__init__()
         self.camera_id = camera_id
         # Normalize URL to ensure explicit port (prevents FFmpeg TCP fallback errors)
@@ -34,16 +291,46 @@ class CameraThread(QThread):
         self.running = False
         self.recording = False
         self.video_writer = None
-        self.event_writer = None
-        self._event_clip_filename = None
-        self._event_clip_until = 0.0
-        self._event_clip_started = 0.0
+        self.passthrough_recorder = None
+        self._passthrough_started_at = 0.0
+        self._recording_output_path = None
+        self._writer_filename = None
+        self._writer_started_at = 0.0
+        self._writer_started_wall = 0.0
+        self._writer_fps = 25.0
+        self._writer_size = (640, 480)
+        self._segment_index = None
+        self.recording_config = {**DEFAULT_RECORDING_CONFIG, **(recording_config or {})}
+        self.stream_config = {**DEFAULT_STREAM_CONFIG, **(stream_config or {})}
+        self.grab_mode = str(self.stream_config.get("capture_mode", "grab")).lower() != "read"
+        self.clip_writer = None
         self._writer_lock = threading.Lock()
-        self._buffer_lock = threading.Lock()
-        self._frame_buffer = deque()
         self._frame_buffer_seconds = 12.0
+        self._pre_event_buffer = PreEventBuffer.from_config(self.recording_config, seconds=self._frame_buffer_seconds)
+        # Decoded frames are read-only and shared by UI, detection and writers.
+        self._frame_pool = FramePool(size=4)
+        self.substream_url = substream_url or None
+        self._substream_reader = None
+        self._substream_last_emit = 0.0
+        self._consumer_fps: dict[str, float] = {}
+        # Optional FrameMailbox: latest-frame slots instead of queued frame signals.
+        self.mailbox = mailbox
+        self.metrics = CaptureMetrics()
+        self.wake_scheduler = wake_scheduler or shared_wake_scheduler()
+        self.reconnect_scheduler = reconnect_scheduler or shared_reconnect_scheduler()
+        self._consecutive_failures = 0
+        self._main_demand = set()
+        self._main_active = False
+        self._pending_writer_filename = None
         self.cap = None
-        self.reconnect_delay = 5  # Mehr Zeit für Akku-Kameras
+        # (fps, width, height) of the open main-stream capture; the capture
+        # itself belongs to the CaptureReader while streaming.
+        self._capture_format = None
+        # Last known main-stream format; kept after the capture is released so
+        # event clips started in substream mode get the full resolution.
+        self._main_format = None
+        # Basis für den exponentiellen Backoff (mehr Zeit für Akku-Kameras)
+        self.reconnect_delay = 5
         self._host, self._port, self._user, self._password = _parse_rtsp_url(rtsp_url)
         self._is_proxy_stream = self._host in ("localhost", "127.0.0.1") and int(self._port or 0) == 8554
         if self._is_proxy_stream:
@@ -61,25 +348,93 @@ class CameraThread(QThread):
     def run(self):
         """Hauptschleife mit automatischem Retry"""
         self.running = True
+        if self.substream_url:
+            self._substream_reader = SubstreamReader(self, self.substream_url)
+            self._substream_reader.start()
         
+        attempts = 0
         while self.running:
+            # Passthrough-ffmpeg auch ohne Hauptstream-Dekodierung (Substream-Modus) überwachen
+            self._check_passthrough_recorder()
+            if not self._main_stream_needed():
+                # Tiles/detection run on the substream; wait for preview or recording demand.
+                attempts = 0
+                self.msleep(200)
+                continue
+            if attempts:
+                self.metrics.record_reconnect()
+            attempts += 1
             try:
                 self._connect_and_stream()
+            except CaptureStalled:
+                # Hängender Read: sofort neu verbinden statt auf das FFmpeg-Timeout zu warten
+                self.connection_status.emit(False, self.camera_id, tr("camera.status.stalled"))
+                if self._consecutive_failures == 0:
+                    self._consecutive_failures = 1
+                    continue
             except Exception as e:
                 self.connection_status.emit(False, self.camera_id, tr("error.prefix", error=str(e)))
             finally:
+                self.metrics.record_disconnected()
                 self._release_capture()
 
-            if self.running:
+            if self.running and self._main_stream_needed():
+                self._consecutive_failures += 1
+                delay = self.reconnect_scheduler.next_delay(self._consecutive_failures, self.reconnect_delay)
                 self.connection_status.emit(False, self.camera_id, tr("camera.preview.retrying"))
-                for _ in range(int(self.reconnect_delay * 10)):
-                    if not self.running:
-                        break
-                    self.msleep(100)
+                self.reconnect_scheduler.wait(self._host, int(self._port or 554), delay, lambda: self.running)
         
         self._cleanup()
 
+    @property
+    def substream_active(self) -> bool:
+        reader = self._substream_reader
+        return reader is not None and reader.active and not reader.failed
+
+    @property
+    def main_stream_active(self) -> bool:
+        return self._main_active
+
+    def set_main_stream_demand(self, reason: str, active: bool):
+        """Request (or release) decoding of the main stream, e.g. for the big preview."""
+        if active:
+            self._main_demand.add(reason)
+        else:
+            self._main_demand.discard(reason)
+
+    def set_consumer_fps(self, consumer: str, fps: float | None):
+        """Register the frame rate a UI/detection consumer wants (None removes it).
+
+        Main/substream frames are delivered (mailbox or frame signals) at the
+        highest requested rate (0 when nobody wants frames, e.g. minimized window);
+        without registered consumers the maximum rate is used.
+        """
+        if fps is None:
+            self._consumer_fps.pop(consumer, None)
+        else:
+            self._consumer_fps[consumer] = max(0.0, float(fps))
+
+    def _emit_interval(self, max_fps: float) -> float | None:
+        """Seconds between frame signals, or None if no consumer wants frames."""
+        requested = list(self._consumer_fps.values())
+        fps = min(max_fps, max(requested)) if requested else max_fps
+        return 1.0 / fps if fps > 0 else None
+
+    def _main_stream_needed(self) -> bool:
+        reader = self._substream_reader
+        if reader is None or reader.failed:
+            return True
+        if self._main_demand:
+            return True
+        # Event clips are written from the main stream once it is decoded.
+        if self.clip_writer is not None:
+            return True
+        # The OpenCV recording engine encodes decoded main-stream frames.
+        return self.recording and self.passthrough_recorder is None
+
     def _release_capture(self):
+        self._main_active = False
+        self._capture_format = None
         if self.cap:
             try:
                 self.cap.release()
@@ -89,12 +444,11 @@ class CameraThread(QThread):
 
     def _release_writer(self):
         with self._writer_lock:
-            if self.video_writer:
-                try:
-                    self.video_writer.release()
-                except Exception:
-                    pass
-                self.video_writer = None
+            self._pending_writer_filename = None
+            self._close_video_writer_locked()
+            if self.passthrough_recorder is not None:
+                self.passthrough_recorder.stop(wait=True)
+                self.passthrough_recorder = None
             self.recording = False
 
     def _wait_before_reconnect(self, seconds: float):
@@ -102,51 +456,81 @@ class CameraThread(QThread):
         while self.running and time.monotonic() < end_time:
             self.msleep(100)
 
+    def _fallback_urls(self) -> list[str]:
+        """Reolink-typische Pfad-Varianten der konfigurierten URL (ohne diese selbst)."""
+        try:
+            u = urlparse(self.rtsp_url)
+            urls = []
+            for path in self._alt_paths:
+                # Use _build_rtsp_url to properly encode credentials
+                test_url = _build_rtsp_url(
+                    host=u.hostname,
+                    port=u.port or 554,
+                    username=unquote(u.username or ''),
+                    password=unquote(u.password or ''),
+                    path=path,
+                    scheme=u.scheme
+                )
+                if test_url != self.rtsp_url and test_url not in urls:
+                    urls.append(test_url)
+            return urls
+        except Exception:
+            return []
+
+    def _adopt_working_url(self, url: str):
+        """Funktionierenden Pfad übernehmen; die GUI speichert ihn in der Kamera-Konfiguration."""
+        old_url = self.rtsp_url
+        self.rtsp_url = url
+        self.rtsp_url_changed.emit(old_url, url)
+
+    def _probe_rtsp(self, settle: float) -> dict:
+        """OPTIONS/DESCRIBE health probe of the configured URL.
+
+        A freshly woken camera accepts connections before it serves the
+        stream; for up to ``settle`` seconds the probe is repeated until
+        DESCRIBE answers 200 (or a definite 401/404).
+        """
+        deadline = time.monotonic() + settle
+        while True:
+            probe = rtsp_probe(self.rtsp_url, timeout=2.0)
+            if probe["ready"] or probe["status"] in (401, 404) or not self.running:
+                break
+            if time.monotonic() >= deadline:
+                break
+            self._wait_before_reconnect(0.3)
+        if probe["ready"]:
+            self.metrics.record_probe(probe)
+        return probe
+
     def _open_capture(self, rtsp_url: str, open_timeout_ms: int, read_timeout_ms: int):
         self._release_capture()
-        return cv2.VideoCapture(rtsp_url, cv2.CAP_FFMPEG, [
-            cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, open_timeout_ms,
-            cv2.CAP_PROP_READ_TIMEOUT_MSEC, read_timeout_ms
-        ])
+        # Globales Limit gleichzeitiger RTSP-Opens (z.B. alle Kameras nach einem Switch-Neustart)
+        with self.reconnect_scheduler.open_slot(lambda: self.running) as acquired:
+            if not acquired:
+                return cv2.VideoCapture()
+            return open_ffmpeg_capture(rtsp_url, open_timeout_ms, read_timeout_ms, self.stream_config)
     
     def _connect_and_stream(self):
         """Verbindung herstellen und streamen"""
         # Best-effort wake attempt for sleeping/battery cameras
+        wake_ok = False
         if self._host and not self._is_proxy_stream:
             # Intensiv-Weckphase (für Akku-Kameras wie Argus PT Ultra)
             # Wir wiederholen das Wecken und prüfen die Erreichbarkeit über mind. 10 Sek.
             self.connection_status.emit(False, self.camera_id, tr("camera.preview.waiting"))
             
-            wake_ok = False
-            for attempt in range(10):  # 10 Versuche alle ~1s = ca. 10s total
-                if not self.running:
-                    break
-                
-                # 1. UDP Wake Burst
-                _udp_reolink_wake(self._host, self.uid)
-                
-                # 2. Optionaler HTTP Ping
-                try:
-                    requests.get(f"http://{self._host}:8000/api.cgi?cmd=GetDevInfo", timeout=0.2)
-                except Exception:
+            # Weck-Bursts und RTSP-Erreichbarkeit laufen im gemeinsamen WakeScheduler,
+            # damit mehrere schlafende Kameras parallel geweckt werden.
+            ticket = self.wake_scheduler.request(self._host, int(self._port or 554), self.uid)
+            try:
+                while self.running and not ticket.wait(0.1):
                     pass
-                
-                # 3. RTSP Erreichbarkeit prüfen (Port 554)
-                for _ in range(3):
-                    if not self.running:
-                        break
-                    ok, _ = _tcp_probe(self._host, int(self._port or 554), timeout=0.2)
-                    if ok:
-                        wake_ok = True
-                        break
-                    time.sleep(0.3)
-                
-                if wake_ok:
-                    break
+            finally:
+                self.wake_scheduler.release(ticket)
+            wake_ok = ticket.ok
             
             if wake_ok:
                 self.connection_status.emit(True, self.camera_id, tr("camera.status.connected")) # Wach!
-                self._wait_before_reconnect(1.0)
             else:
                 # Auch wenn TCP Probe fehlschlägt, versuchen wir es trotzdem 
                 # (manchen Kameras antworten nicht auf Port-Checks, aber auf echte RTSP-Anfragen)
@@ -155,40 +539,51 @@ class CameraThread(QThread):
         open_timeout_ms = 20000 if self._is_proxy_stream else 3000
         read_timeout_ms = 10000 if self._is_proxy_stream else 3000
 
+        # RTSP-Healthcheck (OPTIONS/DESCRIBE) statt blindem Warten und Decoder-Open:
+        # nach dem Wecken bis zu 3 s auf DESCRIBE 200 warten
+        probe = None
+        if self._host and not self._is_proxy_stream:
+            probe = self._probe_rtsp(settle=3.0 if wake_ok else 0.0)
+
         # RTSP Stream öffnen (mit Fallback-Pfaden für native Reolink-RTSP-URLs)
         # Use TCP transport to reduce RTP packet loss warnings
-        self.cap = self._open_capture(self.rtsp_url, open_timeout_ms, read_timeout_ms)
+        if probe is None or probe["ready"] or (probe["reachable"] and probe["status"] != 404):
+            # Ohne auswertbare RTSP-Antwort wie bisher direkt öffnen. Ein 401 der Probe
+            # ist nicht endgültig (FFmpeg beherrscht mehr Auth-Varianten), also trotzdem öffnen.
+            self.cap = self._open_capture(self.rtsp_url, open_timeout_ms, read_timeout_ms)
+        else:
+            # Port zu oder Pfad unbekannt (404): kein Decoder-Open für diese URL
+            self._release_capture()
+            self.cap = cv2.VideoCapture()
         
         # Falls eine native Kamera nicht öffnet, probieren wir Reolink-typische Varianten.
         # Bei ReolinkProxy-URLs ist der Pfad absichtlich fix (<Name>/mainStream).
-        if not self.cap.isOpened() and not self._is_proxy_stream:
-            # Parse URL properly to rebuild with alternative paths
-            try:
-                u = urlparse(self.rtsp_url)
-                port = u.port or 554
-                
-                for path in self._alt_paths:
-                    # Use _build_rtsp_url to properly encode credentials
-                    test_url = _build_rtsp_url(
-                        host=u.hostname,
-                        port=port,
-                        username=u.username or '',
-                        password=u.password or '',
-                        path=path,
-                        scheme=u.scheme
-                    )
-                    if test_url == self.rtsp_url:
-                        continue
-                    
-                    self.connection_status.emit(False, self.camera_id, f"Prüfe Pfad: {path}...")
+        if not self.cap.isOpened() and not self._is_proxy_stream and (probe is None or probe["reachable"]):
+            candidates = self._fallback_urls()
+            if candidates:
+                # Alle Pfade parallel per RTSP DESCRIBE prüfen statt nacheinander Decoder zu öffnen
+                self.connection_status.emit(False, self.camera_id, tr("camera.status.probing_paths"))
+                working_url, all_missing = find_working_rtsp_url(candidates, timeout=2.0)
+                if working_url:
+                    candidates = [working_url]
+                elif all_missing:
+                    # Alle Pfade mit 404 beantwortet: keine weiteren Opens
+                    candidates = []
+                # Sonst (401, 503, keine Antwort, ...) wie bisher nacheinander öffnen
+                for test_url in candidates:
+                    if not self.running:
+                        break
                     self.cap = self._open_capture(test_url, open_timeout_ms, read_timeout_ms)
                     if self.cap.isOpened():
-                        self.rtsp_url = test_url
+                        # Substream-Pfade nur für diese Verbindung nutzen, nie als Haupt-URL speichern
+                        if not _is_substream_path(test_url):
+                            self._adopt_working_url(test_url)
                         break
-            except Exception:
-                pass
         
         if not self.cap.isOpened():
+            # Login-Fehler erst melden, wenn auch FFmpeg nicht öffnen konnte
+            if probe is not None and probe["status"] == 401:
+                raise Exception(tr("camera.error.auth_failed"))
             # Diagnostik: Wenn RTSP zu ist, aber Port 8000 offen, ist RTSP wahrscheinlich in der Kamera deaktiviert
             if self._host and not self._is_proxy_stream:
                 ok_api, _ = _tcp_probe(self._host, 8000, timeout=0.5)
@@ -202,116 +597,359 @@ class CameraThread(QThread):
             self.cap.set(cv2.CAP_PROP_FPS, 25)
         
         self.connection_status.emit(True, self.camera_id, tr("camera.status.connected"))
+        self._main_active = True
+        self.metrics.record_connected()
+        idle_since = None
         
         last_ui_emit = 0.0
-        ui_emit_interval = 1.0 / (15 if self._is_proxy_stream else 25)
+        max_ui_fps = self.SUBSTREAM_UI_FPS if self._is_proxy_stream else self.MAX_UI_FPS
         failed_reads = 0
         max_failed_reads = 4 if self._is_proxy_stream else 3
+
+        def ui_emit_due(now):
+            interval = self._emit_interval(max_ui_fps)
+            return interval is not None and now - last_ui_emit >= interval
+
+        def frame_wanted():
+            return (
+                ui_emit_due(time.monotonic())
+                or self._pre_event_buffer.wants_frame()
+                or self.clip_writer is not None
+                or (self.recording and (self.video_writer is not None or self._pending_writer_filename is not None))
+            )
         
-        while self.running:
-            ret, frame = self.cap.read()
-            
-            if not ret:
-                failed_reads += 1
-                if failed_reads >= max_failed_reads:
-                    raise Exception(tr("camera.error.stream_interrupted"))
-                self.msleep(500 if self._is_proxy_stream else 200)
-                continue
+        # Bis zum ersten Frame gilt das FFmpeg-Timeout, danach der Stall-Watchdog.
+        first_frame_limit = read_timeout_ms / 1000.0 + 1.0
+        self._capture_format = (
+            float(self.cap.get(cv2.CAP_PROP_FPS) or 0.0),
+            int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH) or 0),
+            int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT) or 0),
+        )
+        self._main_format = self._capture_format
+        stall_limit = self._stall_limit(self._capture_format[0])
+        # Der Reader besitzt ab hier die Capture und gibt sie selbst frei.
+        reader = CaptureReader(self, self.cap, self._frame_pool, frame_wanted)
+        self.cap = None
+        reader.start()
+        got_frame = False
+        stalled = False
+        try:
+            while self.running:
+                try:
+                    # stall_limit 0 = Watchdog aus: ohne Frist auf den nächsten Frame warten
+                    result = reader.next((stall_limit or None) if got_frame else first_frame_limit)
+                except queue.Empty:
+                    self.metrics.record_stall()
+                    stalled = True
+                    raise CaptureStalled()
+                if result is None:
+                    break
+                ret, frame = result
+                self.metrics.buffer_bytes = self._pre_event_buffer.nbytes
 
-            failed_reads = 0
-            self._remember_frame(frame)
-            
-            now = time.monotonic()
-            if now - last_ui_emit >= ui_emit_interval:
-                self.frame_ready.emit(frame.copy(), self.camera_id)
-                last_ui_emit = now
+                if not ret:
+                    failed_reads += 1
+                    if failed_reads >= max_failed_reads:
+                        raise Exception(tr("camera.error.stream_interrupted"))
+                    continue
+                if not got_frame:
+                    self._consecutive_failures = 0
+                got_frame = True
+                failed_reads = 0
+                now = time.monotonic()
+                if self._main_stream_needed():
+                    idle_since = None
+                elif idle_since is None:
+                    idle_since = now
+                elif now - idle_since >= self.MAIN_STREAM_IDLE_SECONDS:
+                    # Nobody needs full resolution any more; the substream keeps running.
+                    return
+
+                if frame is None:
+                    # Only grabbed: no consumer needs this frame.
+                    continue
+
+                self._remember_frame(frame)
+                if ui_emit_due(now):
+                    self._deliver_frame("main", frame)
+                    last_ui_emit = now
             
-            # Aufzeichnung (alle Frames)
-            with self._writer_lock:
-                if self.recording and self.video_writer is not None:
-                    try:
-                        self.video_writer.write(frame)
-                    except Exception:
-                        # Don't crash the streaming thread due to writer issues.
-                        pass
-                if self.event_writer is not None:
-                    try:
-                        self.event_writer.write(frame)
-                    except Exception:
-                        pass
-                    if time.monotonic() >= self._event_clip_until:
-                        self._release_event_writer_locked()
+                # Aufzeichnung (alle Frames; im Passthrough-Modus schreibt ffmpeg selbst)
+                self._check_passthrough_recorder()
+                with self._writer_lock:
+                    if self.recording and self._pending_writer_filename and self.video_writer is None:
+                        self._open_pending_video_writer_locked(frame)
+                    if self.recording and self.video_writer is not None:
+                        segment_seconds = self._segment_seconds()
+                        if segment_seconds and time.monotonic() - self._writer_started_at >= segment_seconds:
+                            self._rotate_video_writer_locked()
+                        try:
+                            if self.video_writer is not None:
+                                self.video_writer.write(frame)
+                        except Exception:
+                            # Don't crash the streaming thread due to writer issues.
+                            pass
+                    self._submit_clip_frame_locked(frame)
             
-            self.msleep(5 if self._is_proxy_stream else 10)
+                if not self.grab_mode:
+                    self.msleep(5 if self._is_proxy_stream else 10)
+        finally:
+            reader.abandon()
+            if not stalled:
+                reader.join(timeout=1.0)
+            if reader.is_alive():
+                # Read hängt noch: dessen Puffer nicht mit dem nächsten Reader teilen
+                self._frame_pool = FramePool(size=4)
+
+    def _stall_limit(self, fps: float) -> float:
+        """Seconds without a frame after which the capture counts as stalled (0 = off)."""
+        try:
+            seconds = float(self.stream_config.get("stall_seconds", 2.0) or 0.0)
+        except (TypeError, ValueError):
+            seconds = 0.0
+        if seconds <= 0:
+            return 0.0
+        if 0 < fps <= 120:
+            seconds = max(seconds, 10.0 / fps)
+        return seconds
 
     def _remember_frame(self, frame):
+        self._pre_event_buffer.append(frame)
+
+    def _submit_clip_frame_locked(self, frame):
+        clip_writer = self.clip_writer
+        if clip_writer is not None:
+            # Nur übergeben - geschrieben wird im ClipWriter-Thread.
+            clip_writer.submit(frame)
+            if time.monotonic() >= clip_writer.until:
+                self._release_clip_writer_locked()
+
+    def _deliver_frame(self, kind: str, frame):
+        self.metrics.record_emit()
+        mailbox = self.mailbox
+        if mailbox is not None:
+            mailbox.put((self, kind), frame)
+        elif kind == "sub":
+            self.substream_frame_ready.emit(frame, self.camera_id)
+        else:
+            self.frame_ready.emit(frame, self.camera_id)
+
+    def _substream_emit_due(self, now: float) -> bool:
+        interval = self._emit_interval(self.SUBSTREAM_UI_FPS)
+        return interval is not None and now - self._substream_last_emit >= interval
+
+    def _substream_frame_wanted(self) -> bool:
+        if self._substream_emit_due(time.monotonic()):
+            return True
+        if self._main_active:
+            return False
+        return self._pre_event_buffer.wants_frame() or self.clip_writer is not None
+
+    def _handle_substream_frame(self, frame):
+        """Called from the SubstreamReader thread for every substream frame."""
+        if not self._main_active:
+            # Without main-stream decoding, buffer and event clips use the substream.
+            self._remember_frame(frame)
+            with self._writer_lock:
+                self._submit_clip_frame_locked(frame)
         now = time.monotonic()
-        with self._buffer_lock:
-            self._frame_buffer.append((now, frame.copy()))
-            cutoff = now - self._frame_buffer_seconds
-            while self._frame_buffer and self._frame_buffer[0][0] < cutoff:
-                self._frame_buffer.popleft()
+        if self._substream_emit_due(now):
+            self._substream_last_emit = now
+            self._deliver_frame("sub", frame)
     
     def _cleanup(self):
         """Ressourcen freigeben"""
+        reader = self._substream_reader
+        if reader is not None:
+            reader.stop()
+            reader.join(timeout=5.0)
         self._release_capture()
         self._release_writer()
         with self._writer_lock:
-            self._release_event_writer_locked()
+            clip_writer = self._release_clip_writer_locked()
+        if clip_writer is not None:
+            clip_writer.join(timeout=5.0)
+        self._pre_event_buffer.clear()
+        self._frame_pool.clear()
 
-    def _release_event_writer_locked(self):
-        if self.event_writer:
-            try:
-                self.event_writer.release()
-            except Exception:
-                pass
-        self.event_writer = None
-        self._event_clip_filename = None
-        self._event_clip_until = 0.0
-        self._event_clip_started = 0.0
+    def _release_clip_writer_locked(self):
+        clip_writer = self.clip_writer
+        if clip_writer is not None:
+            clip_writer.close()
+        self.clip_writer = None
+        return clip_writer
     
-    def start_recording(self, output_path):
-        """Starte Aufzeichnung"""
-        if not (self.cap and self.cap.isOpened()):
+    def _recording_filename(self, output_path, extension):
+        os.makedirs(output_path, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return os.path.join(output_path, f"camera_{self.camera_id}_{timestamp}.{extension}")
+
+    def _segment_seconds(self):
+        try:
+            seconds = float(self.recording_config.get("segment_seconds", 0) or 0)
+        except (TypeError, ValueError):
+            return 0.0
+        return max(1.0, seconds) if seconds > 0 else 0.0
+
+    def _segment_index_for(self, output_path):
+        index = self._segment_index
+        if index is None or index.path != segment_index_path(output_path, self.camera_id):
+            ffprobe_path = find_ffprobe(self.recording_config.get("ffmpeg_path"))
+            index = SegmentIndex(output_path, self.camera_id, ffprobe_path=ffprobe_path)
+            self._segment_index = index
+        return index
+
+    def _make_segment_callback(self, output_path):
+        index = self._segment_index_for(output_path)
+
+        def on_segment(filename, start_wall, end_wall, intra_only=False, fps=0.0):
+            index.add(filename, start_wall, end_wall, intra_only=intra_only, fps=fps)
+            self.file_closed.emit(self.camera_id, filename)
+
+        return on_segment
+
+    def _start_passthrough_recorder_locked(self, output_path):
+        container = "mp4" if str(self.recording_config.get("container", "mkv")).lower() == "mp4" else "mkv"
+        ffmpeg_path = find_ffmpeg(self.recording_config.get("ffmpeg_path"))
+        if not ffmpeg_path:
+            return None
+        filename = self._recording_filename(output_path, container)
+        segment_seconds = self._segment_seconds()
+        output = filename
+        if segment_seconds:
+            # ffmpeg names each segment after its own start time (-strftime).
+            output = os.path.join(output_path, f"camera_{self.camera_id}_%Y%m%d_%H%M%S.{container}")
+        recorder = PassthroughRecorder(
+            self.rtsp_url,
+            output,
+            ffmpeg_path=ffmpeg_path,
+            container=container,
+            segment_seconds=segment_seconds,
+            on_segment=self._make_segment_callback(output_path),
+        )
+        if not recorder.start():
             return None
+        self.passthrough_recorder = recorder
+        self._passthrough_started_at = time.monotonic()
+        self._recording_output_path = output_path
+        self.recording = True
+        return filename
 
+    def _check_passthrough_recorder(self):
         with self._writer_lock:
-            if self.recording and self.video_writer is not None:
+            if self.recording and self.passthrough_recorder is not None:
+                if not self.passthrough_recorder.is_running():
+                    self._restart_passthrough_recorder_locked()
+
+    def _restart_passthrough_recorder_locked(self):
+        # ffmpeg ended on its own (camera reboot, network loss): continue in a new file.
+        if time.monotonic() - self._passthrough_started_at < self.reconnect_delay:
+            return
+        self.passthrough_recorder.stop()
+        self.passthrough_recorder = None
+        if self._start_passthrough_recorder_locked(self._recording_output_path) is None:
+            self.recording = False
+
+    def _stream_ready(self) -> bool:
+        return self._capture_format is not None or self.substream_active
+
+    def start_recording(self, output_path, callback=None):
+        """Starte Aufzeichnung.
+
+        Returns the filename (None if nothing was started); ``callback`` gets
+        the same value, like with ProcessCameraThread where it arrives later.
+        """
+        filename = self._start_recording(output_path)
+        if callback is not None:
+            callback(filename)
+        return filename
+
+    def _start_recording(self, output_path):
+        if not self._stream_ready():
+            return None
+
+        with self._writer_lock:
+            if self.recording and (self.video_writer is not None or self.passthrough_recorder is not None):
                 return None
 
+            if resolve_recording_engine(self.recording_config) == "passthrough":
+                filename = self._start_passthrough_recorder_locked(output_path)
+                if filename:
+                    return filename
+
             # Ensure any previous writer is closed before re-opening
-            if self.video_writer is not None:
-                try:
-                    self.video_writer.release()
-                except Exception:
-                    pass
-                self.video_writer = None
+            self._close_video_writer_locked()
+            self._recording_output_path = output_path
+
+            capture_format = self._capture_format
+            if capture_format is None:
+                # Substream mode: recording starts the main stream; the writer
+                # is opened with its first frame.
+                self._pending_writer_filename = self._recording_filename(output_path, "avi")
+                self.recording = True
+                return self._pending_writer_filename
 
-            fps = float(self.cap.get(cv2.CAP_PROP_FPS))
+            fps, width, height = capture_format
             if not fps or fps <= 0 or fps > 120:
                 fps = 25.0
-            width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
             if width <= 0 or height <= 0:
                 width, height = 640, 480
 
-            os.makedirs(output_path, exist_ok=True)
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-
-            # Some streams behave badly with MPEG4/XVID timestamping (invalid PTS).
-            # MJPG-in-AVI is usually more tolerant.
-            fourcc = cv2.VideoWriter_fourcc(*'MJPG')
-            filename = os.path.join(output_path, f"camera_{self.camera_id}_{timestamp}.avi")
-
-            vw = cv2.VideoWriter(filename, fourcc, fps, (width, height))
-            if not vw.isOpened():
+            self._writer_fps = fps
+            self._writer_size = (width, height)
+            filename = self._open_video_writer_locked()
+            if not filename:
                 return None
-
-            self.video_writer = vw
             self.recording = True
             return filename
         return None
 
+    def _open_pending_video_writer_locked(self, frame):
+        filename = self._pending_writer_filename
+        self._pending_writer_filename = None
+        fps = self._capture_format[0] if self._capture_format else 0.0
+        self._writer_fps = fps if 0 < fps <= 120 else 25.0
+        self._writer_size = (frame.shape[1], frame.shape[0])
+        if not self._open_video_writer_locked(filename):
+            self.recording = False
+
+    def _open_video_writer_locked(self, filename=None):
+        # Some streams behave badly with MPEG4/XVID timestamping (invalid PTS).
+        # MJPG-in-AVI is usually more tolerant.
+        fourcc = cv2.VideoWriter_fourcc(*'MJPG')
+        filename = filename or self._recording_filename(self._recording_output_path, "avi")
+        vw = cv2.VideoWriter(filename, fourcc, self._writer_fps, self._writer_size)
+        if not vw.isOpened():
+            return None
+        self.video_writer = vw
+        self._writer_filename = filename
+        self._writer_started_at = time.monotonic()
+        self._writer_started_wall = time.time()
+        return filename
+
+    def _close_video_writer_locked(self):
+        if self.video_writer is None:
+            return
+        try:
+            self.video_writer.release()
+        except Exception:
+            pass
+        self.video_writer = None
+        if self._writer_filename and self._recording_output_path:
+            self._make_segment_callback(self._recording_output_path)(
+                self._writer_filename,
+                self._writer_started_wall,
+                time.time(),
+                intra_only=True,
+                fps=self._writer_fps,
+            )
+        self._writer_filename = None
+
+    def _rotate_video_writer_locked(self):
+        self._close_video_writer_locked()
+        if not self._open_video_writer_locked():
+            self.recording = False
+
     def start_event_clip(
         self,
         output_path,
@@ -319,36 +957,57 @@ class CameraThread(QThread):
         pre_seconds: float = 8.0,
         post_seconds: float = 20.0,
         max_seconds: float = 180.0,
+        callback=None,
     ):
-        """Start a short event clip from the rolling frame buffer plus future frames."""
-        if not (self.cap and self.cap.isOpened()):
+        """Start a short event clip from the rolling frame buffer plus future frames.
+
+        Returns the clip filename (or None); ``callback`` gets the same value.
+        """
+        filename = self._start_event_clip(output_path, label, pre_seconds, post_seconds, max_seconds)
+        if callback is not None:
+            callback(filename)
+        return filename
+
+    def _start_event_clip(self, output_path, label, pre_seconds, post_seconds, max_seconds):
+        if not self._stream_ready():
             return None
 
         with self._writer_lock:
             now = time.monotonic()
             max_seconds = min(180.0, max(1.0, float(max_seconds)))
             post_seconds = max(1.0, min(float(post_seconds), max_seconds))
-            if self.event_writer is not None and now < self._event_clip_until:
-                max_until = (self._event_clip_started or now) + max_seconds
-                self._event_clip_until = min(max_until, max(self._event_clip_until, now + post_seconds))
-                return self._event_clip_filename
-
-            with self._buffer_lock:
-                buffered_items = [
-                    (frame_time, frame)
-                    for frame_time, frame in self._frame_buffer
-                    if frame_time >= now - max(0.0, min(float(pre_seconds), max_seconds))
-                ]
-            buffered = [frame for _frame_time, frame in buffered_items]
+            clip_writer = self.clip_writer
+            if clip_writer is not None and now < clip_writer.until:
+                clip_writer.extend(now, post_seconds, max_seconds)
+                return clip_writer.filename
+            if clip_writer is not None:
+                # Abgelaufen, aber ohne weiteren Frame nie geschlossen (Kamera offline/Hauptstream idle)
+                self._release_clip_writer_locked()
+
+            # Only references to the (compressed) backlog are taken here; the
+            # ClipWriter thread decodes and writes them.
+            buffered_items = self._pre_event_buffer.items_since(
+                now - max(0.0, min(float(pre_seconds), max_seconds))
+            )
             actual_pre_seconds = now - buffered_items[0][0] if buffered_items else 0.0
 
-            fps = float(self.cap.get(cv2.CAP_PROP_FPS))
+            # The clip has the main-stream format. In substream mode the clip
+            # starts main-stream decoding; until its first frame (and for the
+            # buffered seconds) substream frames are scaled up by the writer.
+            capture_format = self._capture_format if self._main_active else None
+            capture_format = capture_format or self._main_format
+            if capture_format is not None:
+                fps, width, height = capture_format
+            else:
+                # Main stream never opened yet: size the clip to the substream.
+                fps = self._substream_reader.fps if self._substream_reader is not None else 0.0
+                width = height = 0
             if not fps or fps <= 0 or fps > 120:
                 fps = 25.0
-            width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            if (width <= 0 or height <= 0) and buffered:
-                height, width = buffered[-1].shape[:2]
+            if (width <= 0 or height <= 0) and buffered_items:
+                last_frame = self._pre_event_buffer.decode(buffered_items[-1][1])
+                if last_frame is not None:
+                    height, width = last_frame.shape[:2]
             if width <= 0 or height <= 0:
                 width, height = 640, 480
 
@@ -362,27 +1021,34 @@ class CameraThread(QThread):
             if not vw.isOpened():
                 return None
 
-            for frame in buffered:
-                if frame.shape[1] != width or frame.shape[0] != height:
-                    frame = cv2.resize(frame, (width, height))
-                vw.write(frame)
-
-            self.event_writer = vw
-            self._event_clip_filename = filename
-            self._event_clip_started = now - max(0.0, actual_pre_seconds)
-            self._event_clip_until = min(self._event_clip_started + max_seconds, now + post_seconds)
+            started_at = now - max(0.0, actual_pre_seconds)
+            clip_writer = ClipWriter(
+                vw,
+                filename,
+                fps,
+                (width, height),
+                buffered_items,
+                self._pre_event_buffer.decode,
+                backlog_end=now,
+                started_at=started_at,
+                until=min(started_at + max_seconds, now + post_seconds),
+                queue_size=int(self.recording_config.get("clip_writer_queue", 48)),
+                on_closed=lambda name: self.file_closed.emit(self.camera_id, name),
+            )
+            clip_writer.start()
+            self.clip_writer = clip_writer
             return filename
     
     def stop_recording(self):
         """Stoppe Aufzeichnung"""
         with self._writer_lock:
             self.recording = False
-            if self.video_writer:
-                try:
-                    self.video_writer.release()
-                except Exception:
-                    pass
-                self.video_writer = None
+            self._pending_writer_filename = None
+            self._close_video_writer_locked()
+            if self.passthrough_recorder is not None:
+                # Finalizing happens in the background so the GUI does not wait for ffmpeg.
+                self.passthrough_recorder.stop()
+                self.passthrough_recorder = None
     
     def request_stop(self):
         """Signal the stream loop to stop.
@@ -399,3 +1065,99 @@ class CameraThread(QThread):
         if not self.wait(timeout_ms):
             return False
         return True
+
+
+class CaptureMultiplexer:
+    """One CameraThread per capture source, shared by all camera entries showing it.
+
+    Camera entries are grouped by :func:`camera_utils.capture_source_key`, so a
+    camera configured natively and through ReolinkProxy (or twice under
+    different paths) uses a single RTSP session and decoder. Every camera id
+    keeps its own signal connections; the thread is only stopped once the
+    last camera id is released. Recording, event clips and the pre-event
+    buffer belong to the shared source (files are named after the camera that
+    started the thread); the source is recorded while at least one of its
+    camera ids wants it (:meth:`set_recording`).
+    """
+
+    def __init__(self):
+        self._threads: dict[str, CameraThread] = {}
+        self._views: dict[int, tuple[str, list]] = {}
+        self._recording: dict[str, set[int]] = {}
+
+    def running_thread(self, key: str) -> "CameraThread | None":
+        thread = self._threads.get(key)
+        if thread is not None and not thread.isRunning():
+            # Stopped behind our back (e.g. stop_all_streams); start a fresh one.
+            return None
+        return thread
+
+    def attach(self, camera_id: int, key: str, thread: "CameraThread", connections: list):
+        """Register camera_id as a view of thread; connections are undone on detach."""
+        self.detach(camera_id)
+        if self._threads.get(key) is not thread:
+            # New thread for the source: it does not record yet.
+            self._recording.pop(key, None)
+        self._threads[key] = thread
+        self._views[int(camera_id)] = (key, list(connections))
+
+    def shared(self, camera_id: int) -> bool:
+        """True if other camera ids still use the thread of camera_id."""
+        view = self._views.get(int(camera_id))
+        if view is None:
+            return False
+        return any(other_key == view[0] for cid, (other_key, _c) in self._views.items() if cid != int(camera_id))
+
+    def siblings(self, camera_id: int) -> list[int]:
+        """All camera ids (including camera_id) that use the thread of camera_id."""
+        view = self._views.get(int(camera_id))
+        if view is None:
+            return [int(camera_id)]
+        return [cid for cid, (other_key, _c) in self._views.items() if other_key == view[0]]
+
+    def set_recording(self, camera_id: int, recording: bool) -> bool:
+        """Mark whether camera_id wants its source recorded.
+
+        Returns True if the shared recording has to start (first view asks
+        for it) or stop (last view lets go), False if nothing changes.
+        """
+        view = self._views.get(int(camera_id))
+        if view is None:
+            return bool(recording)
+        views = self._recording.setdefault(view[0], set())
+        was_recording = bool(views)
+        if recording:
+            views.add(int(camera_id))
+        else:
+            views.discard(int(camera_id))
+        if not views:
+            self._recording.pop(view[0], None)
+        return was_recording != bool(views)
+
+    def recording(self, camera_id: int) -> bool:
+        """True if any camera id sharing the source of camera_id wants it recorded."""
+        view = self._views.get(int(camera_id))
+        return view is not None and bool(self._recording.get(view[0]))
+
+    def detach(self, camera_id: int) -> "CameraThread | None":
+        """Drop a view; returns the thread if no other view uses it any more."""
+        view = self._views.pop(int(camera_id), None)
+        if view is None:
+            return None
+        key, connections = view
+        thread = self._threads.get(key)
+        views = self._recording.get(key)
+        if views is not None:
+            views.discard(int(camera_id))
+            if not views:
+                self._recording.pop(key, None)
+        for signal, connection in connections:
+            try:
+                signal.disconnect(connection)
+            except Exception:
+                pass
+        if any(other_key == key for other_key, _c in self._views.values()):
+            return None
+        self._threads.pop(key, None)
+        self._recording.pop(key, None)
+        return thread
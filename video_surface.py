@@ -0,0 +1,109 @@
+from PyQt6.QtCore import QRect, Qt
+from PyQt6.QtGui import QColor, QFont, QImage, QPainter, QPen
+
+try:
+    from PyQt6.QtOpenGLWidgets import QOpenGLWidget
+except Exception:  # PyQt6 built without OpenGL
+    QOpenGLWidget = None
+
+
+# Values of config["video_surface"]; only the grid tiles use the surface.
+VIDEO_SURFACES = ("label", "opengl")
+
+
+def opengl_surface_available() -> bool:
+    return QOpenGLWidget is not None
+
+
+def normalize_video_surface(value) -> str:
+    """Return a known video_surface value ("label" for anything else)."""
+    surface = str(value or "").strip().lower()
+    return surface if surface in VIDEO_SURFACES else "label"
+
+
+if QOpenGLWidget is not None:
+
+    class GLVideoSurface(QOpenGLWidget):
+        """OpenGL tile surface with the QLabel calls CameraWidget uses.
+
+        The BGR frame is wrapped in a QImage without a copy and drawn with the
+        OpenGL paint engine, which scales it on the GPU (or Mesa llvmpipe)
+        instead of cv2.resize + QPixmap per frame. Qt still converts the
+        BGR888 image to a texture format on the CPU before uploading it, at
+        the source resolution, so this pays off mostly for substream tiles.
+        """
+
+        def __init__(self, parent=None):
+            super().__init__(parent)
+            self._frame = None
+            self._image = None
+            self._text = ""
+            self._border_color = QColor("#555")
+            self._recording = False
+            self._fps = None
+
+        def set_frame(self, frame, fps: float | None = None, recording: bool = False):
+            height, width = frame.shape[:2]
+            # The QImage points into the (read-only, shared) frame; keep the frame alive.
+            self._frame = frame
+            self._image = QImage(frame.data, width, height, int(frame.strides[0]), QImage.Format.Format_BGR888)
+            self._fps = fps
+            self._recording = bool(recording)
+            self.update()
+
+        def set_border_color(self, color: str):
+            self._border_color = QColor(color)
+            self.update()
+
+        # QLabel compatibility
+        def setText(self, text: str):
+            self._text = str(text or "")
+            self._frame = None
+            self._image = None
+            self.update()
+
+        def setPixmap(self, pixmap):
+            if pixmap is None or pixmap.isNull():
+                self._frame = None
+                self._image = None
+                self.update()
+
+        def setAlignment(self, _alignment):
+            pass
+
+        def setScaledContents(self, _scaled: bool):
+            pass
+
+        def setStyleSheet(self, _style: str):
+            # Stylesheets do not apply to QOpenGLWidget; borders come from set_border_color().
+            pass
+
+        def paintGL(self):
+            painter = QPainter(self)
+            self.paint(painter, self.rect())
+            painter.end()
+
+        def paint(self, painter: QPainter, rect: QRect):
+            painter.fillRect(rect, Qt.GlobalColor.black)
+            if self._image is not None:
+                painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+                painter.drawImage(rect, self._image)
+                painter.setFont(QFont(painter.font().family(), 8, QFont.Weight.Bold))
+                if self._recording:
+                    painter.setPen(Qt.PenStyle.NoPen)
+                    painter.setBrush(QColor(255, 0, 0))
+                    painter.drawEllipse(12, 12, 16, 16)
+                    painter.setPen(QColor(255, 0, 0))
+                    painter.drawText(35, 25, "REC")
+                if self._fps is not None:
+                    painter.setPen(QColor(0, 255, 0))
+                    painter.drawText(rect.width() - 80, 25, f"{self._fps:.1f} FPS")
+            elif self._text:
+                painter.setPen(QColor(220, 220, 220))
+                painter.drawText(rect, int(Qt.AlignmentFlag.AlignCenter | Qt.TextFlag.TextWordWrap), self._text)
+            painter.setPen(QPen(self._border_color, 2))
+            painter.setBrush(Qt.BrushStyle.NoBrush)
+            painter.drawRect(QRect(1, 1, rect.width() - 2, rect.height() - 2))
+
+else:
+    GLVideoSurface = None
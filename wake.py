@@ -0,0 +1,200 @@
+import asyncio
+import socket
+import threading
+import time
+
+from camera_utils import REOLINK_WAKE_PORTS, reolink_wake_packets
+
+
+# Seconds a camera gets to open its RTSP port after the first wake burst.
+WAKE_TIMEOUT = 12.0
+
+
+class WakeTicket:
+    """Outcome of one wake request; shared by all threads waiting for the same host:port."""
+
+    def __init__(self, host: str, port: int, uid: str = ""):
+        self.host = host
+        self.port = int(port)
+        self.uid = uid
+        self.ok = False
+        self.seconds = None  # time to wake, if the port answered
+        self.cancelled = False
+        self.waiters = 0
+        self._event = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self._event.is_set()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until the wake job finished (True) or ``timeout`` passed (False)."""
+        return self._event.wait(timeout)
+
+    def _finish(self, ok: bool, seconds: float | None):
+        self.ok = ok
+        self.seconds = seconds
+        self._event.set()
+
+
+class WakeScheduler:
+    """Wakes sleeping (battery) cameras from one background event loop.
+
+    Each request sends Reolink wake bursts about once a second, an HTTP
+    ping and short TCP readiness probes on the RTSP port, all as coroutines,
+    so any number of cameras wake in parallel instead of one CameraThread
+    after the other blocking in sleeps. Requests for the same host:port
+    share one job; the ticket is set as soon as the port answers or the
+    timeout runs out. Time-to-wake is recorded per host (:meth:`stats`).
+    """
+
+    BURST_ROUNDS = 5
+    BURST_SPACING = 0.02
+    WAKE_INTERVAL = 1.0
+    PROBE_INTERVAL = 0.3
+    PROBE_TIMEOUT = 0.2
+    HTTP_PORT = 8000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs: dict[tuple[str, int], WakeTicket] = {}
+        self._stats: dict[str, dict] = {}
+        self._loop = None
+        self._thread = None
+        self._sock = None
+        self._tasks = set()
+
+    def _ensure_loop(self):
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._loop.run_forever, daemon=True, name="WakeScheduler")
+            self._thread.start()
+        return self._loop
+
+    def request(self, host: str, port: int = 554, uid: str = "", timeout: float = WAKE_TIMEOUT) -> WakeTicket:
+        """Start (or join) waking host until ``port`` accepts connections."""
+        key = (host, int(port or 554))
+        with self._lock:
+            ticket = self._jobs.get(key)
+            if ticket is None or ticket.done or ticket.cancelled:
+                ticket = WakeTicket(host, key[1], uid)
+                self._jobs[key] = ticket
+                asyncio.run_coroutine_threadsafe(self._wake(ticket, timeout), self._ensure_loop())
+            ticket.waiters += 1
+        return ticket
+
+    def release(self, ticket: WakeTicket):
+        """Drop interest in a ticket; the job stops early once nobody waits for it."""
+        with self._lock:
+            ticket.waiters -= 1
+            if ticket.waiters <= 0 and not ticket.done:
+                ticket.cancelled = True
+
+    def stats(self) -> dict[str, dict]:
+        """Per host: attempts, woken, failed and last/mean/max seconds to wake."""
+        with self._lock:
+            result = {}
+            for host, entry in self._stats.items():
+                entry = dict(entry)
+                woken = entry.get("woken", 0)
+                entry["mean_seconds"] = entry.pop("total_seconds", 0.0) / woken if woken else None
+                result[host] = entry
+            return result
+
+    def _record(self, host: str, ok: bool, seconds: float):
+        with self._lock:
+            entry = self._stats.setdefault(host, {
+                "attempts": 0, "woken": 0, "failed": 0,
+                "last_seconds": None, "max_seconds": None, "total_seconds": 0.0,
+            })
+            entry["attempts"] += 1
+            if ok:
+                entry["woken"] += 1
+                entry["last_seconds"] = seconds
+                entry["max_seconds"] = max(entry["max_seconds"] or 0.0, seconds)
+                entry["total_seconds"] += seconds
+            else:
+                entry["failed"] += 1
+
+    def _udp_socket(self):
+        if self._sock is None:
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._sock.setblocking(False)
+        return self._sock
+
+    def _spawn(self, coro):
+        # Referenz halten, sonst kann der Task vorzeitig eingesammelt werden
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _burst(self, ticket: WakeTicket):
+        packets = reolink_wake_packets(ticket.uid)
+        sock = self._udp_socket()
+        for _ in range(self.BURST_ROUNDS):
+            for port in REOLINK_WAKE_PORTS:
+                for packet in packets:
+                    try:
+                        sock.sendto(packet, (ticket.host, port))
+                    except OSError:
+                        pass
+            await asyncio.sleep(self.BURST_SPACING)
+
+    async def _http_ping(self, host: str):
+        try:
+            _reader, writer = await asyncio.wait_for(asyncio.open_connection(host, self.HTTP_PORT), self.PROBE_TIMEOUT)
+        except (OSError, asyncio.TimeoutError):
+            return
+        try:
+            writer.write(f"GET /api.cgi?cmd=GetDevInfo HTTP/1.0\r\nHost: {host}\r\n\r\n".encode())
+            await writer.drain()
+        except Exception:
+            pass
+        finally:
+            writer.close()
+
+    async def _port_open(self, host: str, port: int) -> bool:
+        try:
+            _reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), self.PROBE_TIMEOUT)
+        except (OSError, asyncio.TimeoutError):
+            return False
+        writer.close()
+        return True
+
+    async def _wake(self, ticket: WakeTicket, timeout: float):
+        started = time.monotonic()
+        deadline = started + timeout
+        next_wake = started
+        ok = False
+        try:
+            while not ticket.cancelled and time.monotonic() < deadline:
+                if time.monotonic() >= next_wake:
+                    next_wake = time.monotonic() + self.WAKE_INTERVAL
+                    self._spawn(self._burst(ticket))
+                    self._spawn(self._http_ping(ticket.host))
+                if await self._port_open(ticket.host, ticket.port):
+                    ok = True
+                    break
+                await asyncio.sleep(self.PROBE_INTERVAL)
+        except Exception:
+            pass
+        seconds = time.monotonic() - started
+        if not ticket.cancelled:
+            self._record(ticket.host, ok, seconds)
+        with self._lock:
+            if self._jobs.get((ticket.host, ticket.port)) is ticket:
+                del self._jobs[(ticket.host, ticket.port)]
+        ticket._finish(ok, seconds if ok else None)
+
+
+_shared_scheduler = None
+_shared_lock = threading.Lock()
+
+
+def shared_wake_scheduler() -> WakeScheduler:
+    """Process-wide scheduler used by all CameraThreads."""
+    global _shared_scheduler
+    with _shared_lock:
+        if _shared_scheduler is None:
+            _shared_scheduler = WakeScheduler()
+        return _shared_scheduler
@@ -13,8 +13,10 @@ from PyQt6.QtWidgets import (
     QWidget,
 )
 
+from frames import LetterboxCanvas
 from i18n import tr
 from ui_resources import load_svg_icon
+from video_surface import GLVideoSurface, opengl_surface_available
 
 
 class CameraListContainer(QWidget):
@@ -96,7 +98,7 @@ class CameraWidget(QWidget):
     selection_changed = pyqtSignal(int, bool)
     detection_toggled = pyqtSignal(int, bool)
 
-    def __init__(self, camera_id, camera_name="", is_battery=False):
+    def __init__(self, camera_id, camera_name="", is_battery=False, video_surface="label"):
         super().__init__()
         self.camera_id = camera_id
         self.camera_name = camera_name or tr("camera.default_name.id", id=camera_id)
@@ -146,8 +148,16 @@ class CameraWidget(QWidget):
         checkbox_layout.addStretch()
         layout.addLayout(checkbox_layout)
         
-        # Video Label
-        self.video_label = QLabel()
+        # Video Label (optional OpenGL-Fläche: Skalierung auf der GPU statt cv2.resize)
+        self.video_label = None
+        if video_surface == "opengl" and opengl_surface_available():
+            try:
+                self.video_label = GLVideoSurface()
+            except Exception:
+                self.video_label = None
+        self._gl_surface = self.video_label is not None
+        if self.video_label is None:
+            self.video_label = QLabel()
         self.video_label.setFixedSize(180, 120)
         self._apply_video_border_style()
         self.video_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
@@ -317,9 +327,10 @@ class CameraWidget(QWidget):
             self._video_drag_start_pos = None
             self._video_dragging = False
 
-    def update_frame(self, frame):
+    def update_frame(self, frame, remember: bool = True):
         """Frame aktualisieren mit FPS-Berechnung"""
-        self.last_frame = frame
+        if remember:
+            self.last_frame = frame
         if self.is_selected_for_view:
             return
 
@@ -327,6 +338,10 @@ class CameraWidget(QWidget):
         now = datetime.now()
         fps = 1.0 / (now - self.last_frame_time).total_seconds() if (now - self.last_frame_time).total_seconds() > 0 else 0
         self.last_frame_time = now
+
+        if self._gl_surface:
+            self.video_label.set_frame(frame, fps=fps, recording=self.recording)
+            return
         
         # Resize für Display
         display_w = max(1, self.video_label.width())
@@ -369,7 +384,11 @@ class CameraWidget(QWidget):
     
     def toggle_recording(self):
         """Aufnahme umschalten"""
-        self.recording = self.record_btn.isChecked()
+        self.set_recording(self.record_btn.isChecked())
+
+    def set_recording(self, active: bool):
+        """REC-Anzeige setzen, z.B. wenn ein Eintrag derselben Quelle aufnimmt"""
+        self.recording = bool(active)
         if self.recording:
             self.record_btn.setStyleSheet("background-color: #d32f2f; color: white; font-weight: bold;")
         else:
@@ -438,6 +457,8 @@ class CameraWidget(QWidget):
             border_color = "#4CAF50"
         else:
             border_color = "#ff9800" if self.is_battery else "#555"
+        if self._gl_surface:
+            self.video_label.set_border_color(border_color)
         self.video_label.setStyleSheet(f"border: 2px solid {border_color}; background-color: black;")
 
 
@@ -453,6 +474,7 @@ class PreviewLabel(QLabel):
         self._selection_origin = None
         self._selection_rect = QRect()
         self._frame_display_rect = QRect()
+        self.render_canvas = LetterboxCanvas()
 
     def set_selection_enabled(self, enabled: bool):
         self._selection_enabled = bool(enabled)